@@ -1,241 +1,302 @@
+"""Streamlit entry point: widgets, layout and per-session state over inventory_core.
+
+    streamlit run Inventory_Management_BI_System.py
+"""
+import os
+import uuid
+from functools import partial
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 
-PRIMARY_COLOR = "#006699"
-ACCENT_COLOR = "#ff9933"
+import inventory_core.data as core_data
+from inventory_core import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    Z_MAP,
+    alloc_policy_buffers,
+    apply_policy,
+    apply_policy_scenarios,
+    bootstrap_lead_time,
+    build_sku_index,
+    cached_policy,
+    cancel_export,
+    cancel_prefetch,
+    charts,
+    export_file_name,
+    export_status,
+    filter_view,
+    frame_chunks,
+    joint_replenishment,
+    location_aggregates,
+    location_base_frame,
+    log_risk_alerts,
+    new_export_worker,
+    new_policy_prefetcher,
+    new_risk_monitor,
+    optimize_orders,
+    policy_chunks,
+    policy_frame,
+    policy_kernel,
+    replenishment_plan,
+    rollup_cube,
+    scenario_summary,
+    schedule_prefetch,
+    search_sku_prefix,
+    sku_position,
+    simulate_receipts,
+    split_locations,
+    submit_export,
+    supplier_lead_time_profile,
+    update_risk_monitor,
+    view_aggregates,
+    with_lead_time_stats,
+)
+
 white_color = "#ffffff"
+LEAD_TIME_MODES = ["Fixed", "Supplier variability", "Empirical (receipts)"]
+EXPORT_DIR = "exports"
 
-COLOR_PALETTE = [
-    PRIMARY_COLOR,
-    ACCENT_COLOR,
-    "#004466",
-    "#ffb366",
-    "#3399cc",
-]
-
-RISK_COLOR_MAP = {
-    "Healthy": COLOR_PALETTE[0],
-    "Stock-out": COLOR_PALETTE[1],
-    "Below ROP": COLOR_PALETTE[1],
-    "Overstock": COLOR_PALETTE[2],
-}
-
-
-def style_fig(fig, height=320):
-    """Apply common white background + black text to all charts."""
-    fig.update_layout(
-        height=height,
-        margin=dict(l=10, r=10, t=40, b=10),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        font=dict(color="black"),
-        xaxis=dict(
-            title_font=dict(color="black"),
-            tickfont=dict(color="black"),
-        ),
-        yaxis=dict(
-            title_font=dict(color="black"),
-            tickfont=dict(color="black"),
-        ),
-        legend=dict(
-            title_font=dict(color="black"),
-            font=dict(color="black"),
-        ),
-    )
-    return fig
 
+# ================= DATA (CACHED PER PROCESS) =================
+# The data / policy / aggregate functions live in inventory_core; the page only
+# caches the catalog-level results across reruns and sessions. With
+# INVENTORY_CATALOG_DIR set, the catalog is the shared one published by
+# inventory_catalog.py, and everything derived from it is cached per version (the
+# SKU x location frame and the SKU index are mapped from the store, like the catalog).
+CATALOG_DIR = os.environ.get("INVENTORY_CATALOG_DIR")
 
-# ================= PAGE CONFIG =================
-st.set_page_config(
-    page_title="Inventory Management BI System",
-    layout="wide"
-)
-st.title("Inventory Management BI System")
-# ================= DATA GENERATION =================
-@st.cache_data
-def load_base_inventory(n_items: int = 150) -> pd.DataFrame:
-    rng = np.random.default_rng(42)
-
-    categories = ["Home Cleaning", "Personal Care", "Paper", "Kitchen"]
-    suppliers = ["Sano", "Unilever", "P&G", "Local Supplier A", "Local Supplier B"]
-
-    records = []
-    for i in range(n_items):
-        sku_id = f"SKU-{1000 + i}"
-        category = rng.choice(categories)
-        supplier = rng.choice(suppliers)
-
-        avg_daily_sales = float(rng.uniform(3, 80))  # units / day
-        demand_std = avg_daily_sales * rng.uniform(0.2, 0.6)
-        lead_time_days = int(rng.integers(3, 21))
-        current_stock = int(rng.integers(0, int(avg_daily_sales * 45)))
-
-        unit_cost = float(rng.uniform(5, 40))
-        unit_price = unit_cost * rng.uniform(1.2, 1.9)
-
-        annual_demand = avg_daily_sales * 365
-        order_cost = rng.uniform(80, 250)  # per order
-        holding_rate = rng.uniform(0.18, 0.32)  # 18–32% / year
-        holding_cost = unit_cost * holding_rate
-
-        stock_value = current_stock * unit_cost
-
-        records.append({
-            "sku_id": sku_id,
-            "category": category,
-            "supplier": supplier,
-            "avg_daily_sales": round(avg_daily_sales, 2),
-            "demand_std": round(demand_std, 2),
-            "lead_time_days": lead_time_days,
-            "current_stock": current_stock,
-            "unit_cost": round(unit_cost, 2),
-            "unit_price": round(unit_price, 2),
-            "annual_demand": round(annual_demand, 0),
-            "order_cost": round(order_cost, 2),
-            "holding_cost": round(holding_cost, 2),
-            "stock_value": round(stock_value, 2),
-        })
 
-    df = pd.DataFrame(records)
+def catalog_version() -> int:
+    """Current shared catalog version (re-read every rerun), or None for the generated catalog."""
+    if not CATALOG_DIR:
+        return None
+    import inventory_catalog
 
-    df["days_of_cover"] = np.where(
-        df["avg_daily_sales"] > 0,
-        df["current_stock"] / df["avg_daily_sales"],
-        np.nan
-    )
+    entry = inventory_catalog.current_version(CATALOG_DIR)
+    if entry is None:
+        raise LookupError(f"no catalog published in {CATALOG_DIR!r}; run inventory_catalog.py publish")
+    return entry["version"]
 
-    return df
 
+@st.cache_data
+def load_generated_inventory(n_items: int = 150) -> pd.DataFrame:
+    return core_data.load_base_inventory(n_items)
 
-def apply_policy(df_base: pd.DataFrame, z: float, holding_multiplier: float) -> pd.DataFrame:
-    """Calculate EOQ, safety stock, ROP, risk flags under a given policy."""
-    df = df_base.copy()
 
-    df["holding_cost_adj"] = df["holding_cost"] * holding_multiplier
+@st.cache_resource(max_entries=2)
+def load_shared_inventory(store_dir: str, version: int) -> pd.DataFrame:
+    """One version of the shared catalog, memory-mapped read-only (no per-worker copy)."""
+    import inventory_catalog
 
-    annual_demand = df["avg_daily_sales"] * 365
-    df["eoq"] = np.sqrt((2 * annual_demand * df["order_cost"]) / df["holding_cost_adj"])
+    return inventory_catalog.attach_catalog(store_dir, version)
 
-    safety_stock = z * df["demand_std"] * np.sqrt(df["lead_time_days"])
-    df["safety_stock"] = safety_stock.round().astype(int)
 
-    rop = df["avg_daily_sales"] * df["lead_time_days"] + df["safety_stock"]
-    df["rop"] = rop.round().astype(int)
+def load_base_inventory(n_items: int = 150, version: int = None) -> pd.DataFrame:
+    if version is None:
+        return load_generated_inventory(n_items)
+    return load_shared_inventory(CATALOG_DIR, version)
 
-    df["risk_flag"] = np.select(
-        [
-            df["current_stock"] <= 0,
-            df["current_stock"] < df["rop"],
-            df["days_of_cover"] > 7
-        ],
-        ["Stock-out", "Below ROP", "Overstock"],
-        default="Healthy"
-    )
 
-    df["recommended_order_qty"] = np.where(
-        df["current_stock"] < df["rop"],
-        np.maximum(df["eoq"].round().astype(int), df["rop"] - df["current_stock"]),
-        0
-    )
+@st.cache_resource(max_entries=2)
+def load_location_base(n_items: int = 150, version: int = None) -> pd.DataFrame:
+    """All stocked SKU-location pairs as a base frame, one per catalog (treat as read-only).
 
-    return df
+    A shared catalog publishes it with each version, so workers map it instead of building it.
+    """
+    if version is not None:
+        import inventory_catalog
 
+        return inventory_catalog.attach_locations(CATALOG_DIR, version)
+    df_base = load_base_inventory(n_items)
+    return location_base_frame(df_base, split_locations(df_base))
 
-base_df = load_base_inventory()
 
+@st.cache_resource(max_entries=2)
+def load_sku_index(n_items: int = 150, version: int = None) -> dict:
+    """SKU search index, one per catalog; mapped from the shared catalog when there is one."""
+    if version is not None:
+        import inventory_catalog
 
-# ================= SIDEBAR FILTERS & MODEL PARAMS =================
-st.sidebar.header("Filters")
-with st.sidebar.expander("Model parameters", expanded=True):
-    service_level = st.select_slider(
-        "Target service level",
-        options=[0.90, 0.95, 0.98, 0.99],
-        value=0.95,
-        format_func=lambda x: f"{int(x*100)}%"
-    )
-    holding_mult = st.slider(
-        "Holding cost adjustment",
-        min_value=0.8,
-        max_value=1.2,
-        value=1.0,
-        step=0.05,
-        help="1.0 = base holding cost. Increase to simulate higher capital cost."
-    )
+        sku_ids = load_base_inventory(version=version)["sku_id"]
+        return inventory_catalog.attach_sku_index(CATALOG_DIR, sku_ids, version)
+    return build_sku_index(load_base_inventory(n_items))
 
 
-with st.sidebar.expander("Inventory filters", expanded=True):
-    risk_view = st.radio(
-        "Risk view",
-        options=["All items", "At risk only", "Overstock only", "Custom"],
-        index=0
-    )
+@st.cache_data
+def load_lead_time_stats(lead_time_mode: str, n_items: int = 150, version: int = None):
+    """Actual / planned lead-time ratio stats per supplier for a lead-time mode (None when fixed)."""
+    if lead_time_mode == "Supplier variability":
+        return supplier_lead_time_profile()
+    if lead_time_mode == "Empirical (receipts)":
+        receipts = simulate_receipts(load_base_inventory(n_items, version))
+        return bootstrap_lead_time(receipts["supplier"], receipts["actual_days"] / receipts["planned_days"])
+    return None
+
+
+@st.cache_resource(max_entries=6)
+def load_policy_bases(lead_time_mode: str, n_items: int = 150, version: int = None) -> dict:
+    """Network and SKU x location base frames under a lead-time mode (treat as read-only)."""
+    bases = {
+        "network": load_base_inventory(n_items, version),
+        "locations": load_location_base(n_items, version),
+    }
+    stats = load_lead_time_stats(lead_time_mode, n_items, version)
+    if stats is None:
+        return bases
+    return {scope: with_lead_time_stats(df, stats) for scope, df in bases.items()}
+
+
+@st.cache_resource
+def load_policy_prefetcher() -> dict:
+    return new_policy_prefetcher()
+
+
+@st.cache_resource
+def load_export_worker():
+    return new_export_worker()
+
+
+@st.cache_resource
+def load_risk_monitor() -> dict:
+    return new_risk_monitor()
+
+
+@st.cache_resource
+def load_output_registry() -> dict:
+    """What this process last wrote to each working-directory output file: {path: key},
+    or {path: (key, export job)} for files written in the background.
+
+    Shared by all sessions, so an unchanged result is not written again by every rerun.
+    """
+    return {}
+
+
+def write_csv_if_changed(df: pd.DataFrame, path: str):
+    """Write `df` to the CSV at `path` unless the same rows were the last ones written there."""
+    registry = load_output_registry()
+    key = (tuple(df.columns), len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+    if registry.get(path) != key or not os.path.exists(path):
+        df.to_csv(path, index=False)
+        registry[path] = key
+
+
+def export_csv_if_changed(chunks, path: str, key: tuple) -> dict:
+    """Background CSV export of `chunks()` to `path`, started only when `key` (the inputs of
+    the rows) differs from the last export there, or that export failed or was cancelled."""
+    registry = load_output_registry()
+    last_key, job = registry.get(path, (None, None))
+    if job is not None and last_key == key:
+        status = export_status(job)
+        if status in ("queued", "running") or (status == "done" and os.path.exists(path)):
+            return job
+    if job is not None:
+        cancel_export(job)  # superseded before it finished
+    job = submit_export(load_export_worker(), chunks(), path, "csv")
+    registry[path] = (key, job)
+    return job
 
-    min_cov, max_cov = st.slider(
-        "Days of cover",
-        min_value=0,
-        max_value=120,
-        value=(0, 120)
-    )
-    category_filter = st.multiselect(
-        "Category",
-        options=sorted(base_df["category"].unique()),
-        default=sorted(base_df["category"].unique())
-    )
 
-    supplier_filter = st.multiselect(
-        "Supplier",
-        options=sorted(base_df["supplier"].unique()),
-        default=sorted(base_df["supplier"].unique())
-    )
+@st.cache_data
+def simulate_daily_demand(sku_id: str, avg: float, std: float, days: int = 60):
+    return core_data.simulate_daily_demand(sku_id, avg, std, days)
 
 
+# ================= SIDEBAR FILTERS & MODEL PARAMS =================
+def render_sidebar(categories: list, suppliers: list, locations: list = None,
+                   lead_time_modes: list = None) -> dict:
+    """Sidebar widgets; any change here reruns the whole page."""
+    st.sidebar.header("Filters")
+    with st.sidebar.expander("Model parameters", expanded=True):
+        service_level = st.select_slider(
+            "Target service level",
+            options=list(Z_MAP),
+            value=0.95,
+            format_func=lambda x: f"{int(x*100)}%"
+        )
+        holding_mult = st.slider(
+            "Holding cost adjustment",
+            min_value=0.8,
+            max_value=1.2,
+            value=1.0,
+            step=0.05,
+            help="1.0 = base holding cost. Increase to simulate higher capital cost."
+        )
+        lead_time_mode = None
+        if lead_time_modes is not None:
+            lead_time_mode = st.radio(
+                "Lead time",
+                options=lead_time_modes,
+                index=0,
+                help="Fixed uses the planned lead time. The other modes add lead-time variability per "
+                     "supplier (from the supplier profile, or bootstrapped from the receipts history) "
+                     "and size safety stock for the combined demand and lead-time variance."
+            )
 
-    if risk_view == "All items":
-        risk_filter = ["Stock-out", "Below ROP", "Healthy", "Overstock"]
-    elif risk_view == "At risk only":
-        risk_filter = ["Stock-out", "Below ROP"]
-    elif risk_view == "Overstock only":
-        risk_filter = ["Overstock"]
-    else:
-        risk_filter = st.multiselect(
-            "Risk status (custom)",
-            options=["Stock-out", "Below ROP", "Healthy", "Overstock"],
-            default=["Stock-out", "Below ROP", "Overstock"]
+    with st.sidebar.expander("Inventory filters", expanded=True):
+        risk_view = st.radio(
+            "Risk view",
+            options=["All items", "At risk only", "Overstock only", "Custom"],
+            index=0
         )
 
+        min_cov, max_cov = st.slider(
+            "Days of cover",
+            min_value=0,
+            max_value=120,
+            value=(0, 120)
+        )
+        category_filter = st.multiselect(
+            "Category",
+            options=categories,
+            default=categories
+        )
 
-# Map service level to z-score (approx)
-z_map = {0.90: 1.28, 0.95: 1.65, 0.98: 2.05, 0.99: 2.33}
-z_value = z_map[service_level]
+        supplier_filter = st.multiselect(
+            "Supplier",
+            options=suppliers,
+            default=suppliers
+        )
 
-df_policy = apply_policy(base_df, z=z_value, holding_multiplier=holding_mult)
+        location_filter = None
+        if locations is not None:
+            location_filter = st.multiselect(
+                "Location",
+                options=locations,
+                default=locations,
+                help="Select a subset to evaluate the policy per SKU x location instead of per SKU."
+            )
 
-# Apply filters
-df_f = df_policy.copy()
-if category_filter:
-    df_f = df_f[df_f["category"].isin(category_filter)]
-if supplier_filter:
-    df_f = df_f[df_f["supplier"].isin(supplier_filter)]
-if risk_filter:
-    df_f = df_f[df_f["risk_flag"].isin(risk_filter)]
 
-df_f = df_f[
-    (df_f["days_of_cover"] >= min_cov) &
-    (df_f["days_of_cover"] <= max_cov)
-]
 
+        if risk_view == "All items":
+            risk_filter = ["Stock-out", "Below ROP", "Healthy", "Overstock"]
+        elif risk_view == "At risk only":
+            risk_filter = ["Stock-out", "Below ROP"]
+        elif risk_view == "Overstock only":
+            risk_filter = ["Overstock"]
+        else:
+            risk_filter = st.multiselect(
+                "Risk status (custom)",
+                options=["Stock-out", "Below ROP", "Healthy", "Overstock"],
+                default=["Stock-out", "Below ROP", "Overstock"]
+            )
 
-# ================= TOP KPI BANNERS =================
-total_stock_value = df_f["stock_value"].sum()
-items_at_risk = (df_f["risk_flag"].isin(["Stock-out", "Below ROP"])).sum()
-overstock_items = (df_f["risk_flag"] == "Overstock").sum()
-avg_days_cover = df_f["days_of_cover"].mean()
-total_rec_qty = df_f["recommended_order_qty"].sum()
-rec_budget = (df_f["recommended_order_qty"] * df_f["unit_cost"]).sum()
+    return dict(
+        service_level=service_level,
+        holding_mult=holding_mult,
+        lead_time_mode=lead_time_mode,
+        risk_filter=risk_filter,
+        min_cov=min_cov,
+        max_cov=max_cov,
+        category_filter=category_filter,
+        supplier_filter=supplier_filter,
+        location_filter=location_filter,
+    )
 
 
+# ================= TOP KPI BANNERS =================
 def kpi_banner(title: str, value: str, color: str = "#006699"):
     st.markdown(
         f"""
@@ -261,263 +322,615 @@ def kpi_banner(title: str, value: str, color: str = "#006699"):
     )
 
 
-c1, c2, c3, c4 = st.columns(4)
-with c1:
-    kpi_banner("Total Stock Value", f"${total_stock_value:,.0f}", color=white_color)
-with c2:
-    kpi_banner("Items At Risk", f"{int(items_at_risk)}", color=white_color)
-with c3:
-    kpi_banner("Overstock Items", f"{int(overstock_items)}", color=white_color)
-with c4:
-    kpi_banner(
-        "Avg Days of Cover",
-        f"{avg_days_cover:,.1f}" if not np.isnan(avg_days_cover) else "N/A",
-        color=white_color,
-    )
 
-st.caption(
-    f"Policy: service level **{int(service_level*100)}%** "
-    f"(z = {z_value}) · holding cost x **{holding_mult:.2f}**"
-)
+
+def render_kpis(kpis: dict):
+    total_stock_value = kpis["total_stock_value"]
+    items_at_risk = kpis["items_at_risk"]
+    overstock_items = kpis["overstock_items"]
+    avg_days_cover = kpis["avg_days_cover"]
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        kpi_banner("Total Stock Value", f"${total_stock_value:,.0f}", color=white_color)
+    with c2:
+        kpi_banner("Items At Risk", f"{int(items_at_risk)}", color=white_color)
+    with c3:
+        kpi_banner("Overstock Items", f"{int(overstock_items)}", color=white_color)
+    with c4:
+        kpi_banner(
+            "Avg Days of Cover",
+            f"{avg_days_cover:,.1f}" if not pd.isna(avg_days_cover) else "N/A",
+            color=white_color,
+        )
+
+
+def render_risk_alerts(alerts: pd.DataFrame, n_new: int):
+    """Recent risk-flag transitions, newest first; expanded when SKUs just became at-risk.
+
+    `n_new`: how many of them this session has not shown yet.
+    """
+    if alerts is None or alerts.empty:
+        return
+    into_risk = alerts.head(n_new)["new_flag"].isin(["Stock-out", "Below ROP"]).sum()
+    label = f"🔔 Risk alerts · {n_new} new transitions ({into_risk} into Stock-out / Below ROP)"
+    with st.expander(label, expanded=bool(into_risk)):
+        st.dataframe(alerts, hide_index=True, width="stretch", height=240)
+
 
 # ================= TABS =================
-tab_overview, tab_planner, tab_sku = st.tabs(
-    ["📊 Overview", "📦 Replenishment Planner", "🔍 SKU Drilldown"]
-)
+# Each tab is a fragment: its own widgets rerun only that tab, reusing the
+# arguments from the last full run instead of recomputing the policy.
+
 # ---------- TAB 1: OVERVIEW ----------
-with tab_overview:
+def chart_cell(title: str, has_data: bool, build, *args):
+    """Markdown title + the figure from `build(*args)`, built only when there is data."""
+    st.markdown(f"**{title}**")
+    if has_data:
+        st.plotly_chart(build(*args), width="stretch")
+    else:
+        st.info("No data for current filters.")
+
+
+@st.fragment
+def render_overview(aggs: dict, loc_aggs: dict = None):
     st.subheader("Overview")
+    has_data = aggs["rows"] > 0
 
     # ===== ROW 1 (3 charts) =====
     col1, col2, col3 = st.columns(3)
-
-    # 1) Stock value by Category (colored by category)
     with col1:
-        st.markdown("**Stock Value by Category**")
-        if len(df_f) > 0:
-            by_cat = (
-                df_f.groupby("category", as_index=False)["stock_value"]
-                .sum()
-            )
-            fig1 = px.bar(
-                by_cat,
-                x="category",
-                y="stock_value",
-                color="category",
-                color_discrete_sequence=COLOR_PALETTE,
-                labels={"stock_value": "Stock value", "category": "Category"},
-            )
-            fig1 = style_fig(fig1, height=320)
-            st.plotly_chart(fig1, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
-
-    # 2) Demand vs Days of Cover (scatter bubble)
+        chart_cell("Stock Value by Category", has_data, charts.stock_value_by_category, aggs["by_category"])
     with col2:
-        st.markdown("**Demand vs Days of Cover**")
-        if len(df_f) > 0:
-            fig2 = px.scatter(
-                df_f,
-                x="avg_daily_sales",
-                y="days_of_cover",
-                color="risk_flag",
-                color_discrete_map=RISK_COLOR_MAP,
-                size="stock_value",
-                hover_data=["sku_id", "category", "supplier"],
-                labels={
-                    "avg_daily_sales": "Avg daily sales (units)",
-                    "days_of_cover": "Days of cover",
-                    "risk_flag": "Risk status",
-                },
-            )
-            fig2 = style_fig(fig2, height=320)
-            st.plotly_chart(fig2, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
-
-    # 3) Stock Value by Supplier (donut)
+        chart_cell("Demand vs Days of Cover", has_data, charts.demand_vs_cover, aggs["scatter"])
     with col3:
-        st.markdown("**Stock Value by Supplier (Donut)**")
-        if len(df_f) > 0:
-            by_sup = (
-                df_f.groupby("supplier", as_index=False)["stock_value"]
-                .sum()
-            )
-            fig3 = px.pie(
-                by_sup,
-                names="supplier",
-                values="stock_value",
-                hole=0.55,
-                color="supplier",
-                color_discrete_sequence=COLOR_PALETTE,
-            )
-            fig3.update_traces(textinfo="percent+label")
-            fig3 = style_fig(fig3, height=320)
-            st.plotly_chart(fig3, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
+        chart_cell("Stock Value by Supplier (Donut)", has_data, charts.stock_value_by_supplier, aggs["by_supplier"])
 
     st.markdown("---")
 
     # ===== ROW 2 (3 charts) =====
     col4, col5, col6 = st.columns(3)
-
-    # 4) Inventory Risk Distribution (bar)
     with col4:
-        st.markdown("**Inventory Risk Distribution**")
-        if len(df_f) > 0:
-            risk_counts = (
-                df_f.groupby("risk_flag", as_index=False)["sku_id"]
-                .count()
-                .rename(columns={"sku_id": "count"})
-            )
-            fig4 = px.bar(
-                risk_counts,
-                x="risk_flag",
-                y="count",
-                color="risk_flag",
-                color_discrete_map=RISK_COLOR_MAP,
-                labels={
-                    "risk_flag": "Risk status",
-                    "count": "Number of SKUs",
-                },
-            )
-            fig4 = style_fig(fig4, height=320)
-            st.plotly_chart(fig4, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
-
-    # 5) Number of SKUs by Category (LINE)
+        chart_cell("Inventory Risk Distribution", has_data, charts.risk_distribution, aggs["by_risk"])
     with col5:
-        st.markdown("**Number of SKUs by Category (Line)**")
-        if len(df_f) > 0:
-            by_cat_count = (
-                df_f.groupby("category", as_index=False)["sku_id"]
-                .count()
-                .rename(columns={"sku_id": "count"})
-            )
-            fig5 = px.line(
-                by_cat_count,
-                x="category",
-                y="count",
-                markers=True,
-                color_discrete_sequence=[PRIMARY_COLOR],
-                labels={
-                    "category": "Category",
-                    "count": "Number of SKUs",
-                },
-            )
-            fig5 = style_fig(fig5, height=320)
-            st.plotly_chart(fig5, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
-
-    # 6) Recommended order quantity by category (bar)
+        chart_cell("Number of SKUs by Category (Line)", has_data, charts.sku_count_by_category, aggs["by_category"])
     with col6:
-        st.markdown("**Recommended Order Qty by Category**")
-        if len(df_f) > 0:
-            by_cat_order = (
-                df_f.groupby("category", as_index=False)["recommended_order_qty"]
-                .sum()
-            )
-            fig6 = px.bar(
-                by_cat_order,
-                x="category",
-                y="recommended_order_qty",
-                color="category",
-                color_discrete_sequence=COLOR_PALETTE,
-                labels={
-                    "recommended_order_qty": "Recommended qty (units)",
-                    "category": "Category",
-                },
-            )
-            fig6 = style_fig(fig6, height=320)
-            st.plotly_chart(fig6, use_container_width=True)
-        else:
-            st.info("No data for current filters.")
+        chart_cell("Recommended Order Qty by Category", has_data, charts.rec_qty_by_category, aggs["by_category"])
+
+    if loc_aggs is None:
+        return
+
+    st.markdown("---")
+
+    # ===== ROW 3 (location roll-ups, SKU x location level) =====
+    col7, col8 = st.columns(2)
+    has_loc_data = loc_aggs["rows"] > 0
+    with col7:
+        chart_cell("Stock Value by Location", has_loc_data, charts.stock_value_by_location,
+                   loc_aggs["by_location_risk"])
+    with col8:
+        chart_cell("At-Risk SKUs by Location", has_loc_data, charts.at_risk_by_location, loc_aggs["at_risk"])
+
+
+def render_kpi_history(history: pd.DataFrame, policy: dict):
+    """KPI trend across the stored daily snapshots of one policy."""
+    if len(history) < 2:
+        return
+    st.markdown("---")
+    st.caption(
+        f"Daily snapshots at service level {int(policy['service_level']*100)}% · "
+        f"holding cost x {policy['holding_mult']:.2f} · lead time: {policy['lead_time_mode'].lower()}"
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        chart_cell("Total Stock Value over Time", True, charts.kpi_trend,
+                   history, "total_stock_value", "Stock value")
+    with col2:
+        chart_cell("Items At Risk over Time", True, charts.kpi_trend,
+                   history, "items_at_risk", "SKUs at risk", charts.ACCENT_COLOR)
+
 
 # ---------- TAB 2: REPLENISHMENT PLANNER ----------
-with tab_planner:
+@st.fragment
+def render_planner(df_f: pd.DataFrame, location_mode: bool, exports: dict = None):
     st.subheader("Replenishment Plan (Below ROP / Stock-out)")
-    plan_df = df_f[df_f["risk_flag"].isin(["Stock-out", "Below ROP"])].copy()
-    plan_df = plan_df[
-        [
-            "sku_id", "category", "supplier",
-            "current_stock", "rop", "eoq",
-            "recommended_order_qty", "days_of_cover",
-            "avg_daily_sales", "lead_time_days",
-            "unit_cost"
-        ]
-    ].sort_values("recommended_order_qty", ascending=False)
+    total_rec_qty = df_f["recommended_order_qty"].sum()
+    rec_budget = (df_f["recommended_order_qty"] * df_f["unit_cost"]).sum()
+
+    plan_df = replenishment_plan(df_f, location_mode)
 
     p1, p2 = st.columns(2)
     p1.metric("Total Recommended Quantity", int(total_rec_qty))
     p2.metric("Budget for Recommended Orders", f"${rec_budget:,.0f}")
 
+    optimize_mode = st.toggle(
+        "Optimize within a purchasing budget",
+        value=False,
+        help="Order the quantities (MOQ and case packs respected) that avoid the most expected stock-out cost per dollar."
+    )
+    if optimize_mode and len(plan_df) > 0:
+        o1, o2, o3 = st.columns(3)
+        budget_cap = o1.number_input(
+            "Purchasing budget ($)",
+            min_value=0.0,
+            value=float(round(rec_budget * 0.5, -2)),
+            step=1000.0,
+        )
+        moq = o2.number_input("Minimum order qty (MOQ)", min_value=0, value=0, step=10)
+        case_pack = o3.number_input("Case pack size", min_value=1, value=1, step=1)
+
+        with st.expander("Per-supplier caps ($, 0 = no cap)"):
+            plan_suppliers = sorted(plan_df["supplier"].unique())
+            cap_cols = st.columns(len(plan_suppliers))
+            supplier_caps = {
+                sup: col.number_input(sup, min_value=0.0, value=0.0, step=1000.0, key=f"cap_{sup}")
+                for sup, col in zip(plan_suppliers, cap_cols)
+            }
+
+        opt_df = optimize_orders(
+            df_f.loc[plan_df.index],
+            budget=budget_cap,
+            supplier_caps=supplier_caps,
+            moq=int(moq),
+            case_pack=int(case_pack),
+        )
+        plan_df["order_qty"] = opt_df["order_qty"]
+        plan_df["line_cost"] = opt_df["line_cost"]
+        plan_df["avoided_stockout_cost"] = opt_df["avoided_stockout_cost"].round(2)
+        plan_df = plan_df.sort_values(["order_qty", "avoided_stockout_cost"], ascending=False)
+
+        total_avoidable = optimize_orders(
+            df_f.loc[plan_df.index], budget=np.inf, moq=int(moq), case_pack=int(case_pack)
+        )["avoided_stockout_cost"].sum()
+
+        q1, q2, q3 = st.columns(3)
+        q1.metric("Lines funded", f"{int(opt_df['funded'].sum())} / {len(opt_df)}")
+        q2.metric("Budget used", f"${opt_df['line_cost'].sum():,.0f}")
+        q3.metric(
+            "Stock-out cost avoided",
+            f"${opt_df['avoided_stockout_cost'].sum():,.0f}",
+            help=f"Out of ${total_avoidable:,.0f} avoidable if every line were funded.",
+        )
+
     if len(plan_df) > 0:
-        st.dataframe(plan_df, use_container_width=True, height=420)
+        st.dataframe(plan_df, width="stretch", height=420)
     else:
         st.info("No SKUs currently below ROP under this policy and filters.")
 
+    render_exports({"Replenishment plan": (partial(frame_chunks, plan_df), len(plan_df)), **(exports or {})})
+
+    st.markdown("---")
+    st.subheader("Supplier POs (Joint Replenishment)")
+    po_cost = st.number_input(
+        "Fixed cost per supplier PO ($)",
+        min_value=0.0,
+        value=150.0,
+        step=10.0,
+        help="Shared cost of placing one consolidated PO; SKU order costs are added per line."
+    )
+    po_lines, po_summary = joint_replenishment(df_f, po_cost=po_cost)
+    write_csv_if_changed(po_summary, "inventory_supplier_po_summary.csv")
+    write_csv_if_changed(po_lines, "inventory_supplier_po_lines.csv")
+
+    if len(po_summary) > 0:
+        s1, s2, s3 = st.columns(3)
+        s1.metric("Supplier POs", len(po_summary))
+        s2.metric("Consolidated PO value", f"${po_summary['po_value'].sum():,.0f}")
+        s3.metric("Annual cost savings vs per-SKU orders", f"${po_summary['annual_savings'].sum():,.0f}")
+        st.dataframe(po_summary, width="stretch", hide_index=True)
+        with st.expander("PO lines"):
+            st.dataframe(po_lines, width="stretch", height=420, hide_index=True)
+    else:
+        st.info("No supplier POs needed under this policy and filters.")
+
+
+def render_exports(datasets: dict):
+    """Start background exports ({label: (chunk factory, row count)}) and follow their progress."""
+    with st.expander("Export"):
+        e1, e2, e3 = st.columns(3)
+        label = e1.selectbox("Data", list(datasets))
+        fmt = e2.selectbox("Format", list(EXPORT_FORMATS))
+        compression = e3.selectbox(
+            "Compression",
+            list(EXPORT_COMPRESSIONS),
+            format_func=lambda c: c or "none",
+            disabled=fmt == "xlsx",
+            help="Parquet compresses internally; XLSX is always zipped.",
+        )
+        if st.button("Start export"):
+            chunks, total_rows = datasets[label]
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            stem = f"{label.lower().replace(' ', '_')}_{pd.Timestamp.now():%Y%m%dT%H%M%S}"
+            path = os.path.join(EXPORT_DIR, export_file_name(stem, fmt, compression))
+            st.session_state.setdefault("exports", []).insert(
+                0, submit_export(load_export_worker(), chunks(), path, fmt, compression, total_rows)
+            )
+
+        jobs = st.session_state.get("exports", [])[:5]
+        if jobs:
+            active = any(export_status(job) in ("queued", "running") for job in jobs)
+            st.fragment(render_export_jobs, run_every=1.0 if active else None)(jobs)
+
+
+def _read_export(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
 
-# ---------- TAB 3: SKU DRILLDOWN ----------
-@st.cache_data
-def simulate_daily_demand(seed: int, avg: float, std: float, days: int = 60):
-    rng = np.random.default_rng(seed)
-    dates = pd.date_range(end=pd.Timestamp.today(), periods=days, freq="D")
-    demand = rng.normal(loc=avg, scale=std, size=days)
-    demand = np.clip(demand, 0, None)
-    return pd.DataFrame({"date": dates, "demand": demand})
 
+def render_export_jobs(jobs: list):
+    """Progress of running exports and downloads of finished ones (polled while any is running)."""
+    for job in jobs:
+        name = os.path.basename(job["path"])
+        status = export_status(job)
+        if status in ("queued", "running"):
+            c1, c2 = st.columns([5, 1])
+            total = job["total_rows"] or 0
+            c1.progress(
+                min(job["rows_done"] / total, 1.0) if total else 0.0,
+                text=f"{name}: {status} · {job['rows_done']:,} / {total:,} rows",
+            )
+            if c2.button("Cancel", key=f"cancel_{job['id']}"):
+                cancel_export(job)
+        elif status == "done":
+            st.download_button(
+                f"⬇️ {name} ({os.path.getsize(job['path']) / 1e6:,.1f} MB)",
+                data=partial(_read_export, job["path"]),  # read only when clicked (streamlit >= 1.52)
+                file_name=name,
+                mime=EXPORT_FORMATS[job["format"]],
+                key=f"download_{job['id']}",
+            )
+        elif status == "failed":
+            st.error(f"{name}: {job['future'].exception()}")
+        else:
+            st.caption(f"{name}: cancelled")
 
-with tab_sku:
+
+# ---------- TAB 3: SKU DRILLDOWN ----------
+@st.fragment
+def render_drilldown(
+    df_f: pd.DataFrame,
+    df_policy: pd.DataFrame,
+    df_loc_policy: pd.DataFrame,
+    sku_index: dict,
+    in_view: np.ndarray,
+):
     if len(df_f) == 0:
         st.info("No data for current filters.")
     else:
         st.subheader("SKU Drilldown")
 
+        sku_query = st.text_input("Search SKU", value="", placeholder="e.g. SKU-10")
+        sku_matches = search_sku_prefix(sku_index, sku_query, in_view)
+
         sku_choice = st.selectbox(
             "Select SKU",
-            options=sorted(df_f["sku_id"].unique())
+            options=sku_matches,
+            help="Showing the first 50 matches; keep typing to narrow the list."
         )
 
-        sku_row = df_f[df_f["sku_id"] == sku_choice].iloc[0]
+        if sku_choice is None:
+            st.info("No SKU in the current view matches this search.")
+        else:
+            sku_pos = sku_position(sku_index, sku_choice)
+            sku_row = df_policy.iloc[sku_pos]
+
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Current stock", int(sku_row["current_stock"]))
+            c2.metric("Reorder point (ROP)", int(sku_row["rop"]))
+            c3.metric("Recommended order qty", int(sku_row["recommended_order_qty"]))
+
+            c4, c5, c6 = st.columns(3)
+            c4.metric("Avg daily sales", f"{sku_row['avg_daily_sales']:.1f} units")
+            c5.metric("Days of cover", f"{sku_row['days_of_cover']:.1f}")
+            if "lead_time_std" in sku_row.index:
+                c6.metric("Lead time", f"{sku_row['lead_time_days']:.1f} ± {sku_row['lead_time_std']:.1f} days")
+            else:
+                c6.metric("Lead time", f"{int(sku_row['lead_time_days'])} days")
+
+            st.markdown(
+                f"**Risk status:** `{sku_row['risk_flag']}` · "
+                f"Supplier: `{sku_row['supplier']}` · "
+                f"Category: `{sku_row['category']}`"
+            )
 
-        c1, c2, c3 = st.columns(3)
-        c1.metric("Current stock", int(sku_row["current_stock"]))
-        c2.metric("Reorder point (ROP)", int(sku_row["rop"]))
-        c3.metric("Recommended order qty", int(sku_row["recommended_order_qty"]))
+            # CSR order: this SKU's locations are one contiguous block of df_loc_policy
+            lo, hi = np.searchsorted(df_loc_policy["sku_pos"].to_numpy(), [sku_pos, sku_pos + 1])
+            sku_locs = df_loc_policy.iloc[lo:hi]
+            st.markdown("**Stock by location**")
+            st.dataframe(
+                sku_locs[[
+                    "location", "current_stock", "avg_daily_sales", "lead_time_days",
+                    "days_of_cover", "rop", "risk_flag", "recommended_order_qty",
+                ]],
+                width="stretch",
+                hide_index=True,
+            )
 
-        c4, c5, c6 = st.columns(3)
-        c4.metric("Avg daily sales", f"{sku_row['avg_daily_sales']:.1f} units")
-        c5.metric("Days of cover", f"{sku_row['days_of_cover']:.1f}")
-        c6.metric("Lead time", f"{int(sku_row['lead_time_days'])} days")
+            st.markdown("---")
+            st.markdown("**Simulated last 60 days of demand**")
 
-        st.markdown(
-            f"**Risk status:** `{sku_row['risk_flag']}` · "
-            f"Supplier: `{sku_row['supplier']}` · "
-            f"Category: `{sku_row['category']}`"
-        )
+            sim_df = simulate_daily_demand(
+                sku_id=str(sku_row["sku_id"]),  # keyed by SKU, not by its row in the current view
+                avg=float(sku_row["avg_daily_sales"]),
+                std=float(sku_row["demand_std"])
+            )
+            st.plotly_chart(charts.demand_history(sim_df), width="stretch")
 
-        st.markdown("---")
-        st.markdown("**Simulated last 60 days of demand**")
 
-        sim_df = simulate_daily_demand(
-            seed=int(sku_row.name),
-            avg=float(sku_row["avg_daily_sales"]),
-            std=float(sku_row["demand_std"])
+# ---------- TAB 4: SCENARIO COMPARISON ----------
+@st.fragment
+def render_scenarios(base_df: pd.DataFrame, service_level: float, holding_mult: float,
+                     min_cov: float, max_cov: float):
+    st.subheader("Scenario Comparison")
+    st.caption(
+        "All scenarios are evaluated together over the network catalog; "
+        "deltas are relative to the first row. The days-of-cover range comes from the sidebar."
+    )
+
+    z_by_level = {f"{int(k*100)}%": v for k, v in Z_MAP.items()}
+    all_risks = ["Stock-out", "Below ROP", "Healthy", "Overstock"]
+    risk_views = {
+        "All items": all_risks,
+        "At risk only": ["Stock-out", "Below ROP"],
+        "Overstock only": ["Overstock"],
+    }
+    scenario_input = st.data_editor(
+        pd.DataFrame({
+            "name": ["Current", "High service", "Lean"],
+            "service_level": [f"{int(service_level*100)}%", "99%", "90%"],
+            "holding_mult": [holding_mult, holding_mult, 1.2],
+            "category": ["All", "All", "All"],
+            "supplier": ["All", "All", "All"],
+            "risk_view": ["All items", "All items", "All items"],
+        }),
+        num_rows="dynamic",
+        width="stretch",
+        hide_index=True,
+        column_config={
+            "service_level": st.column_config.SelectboxColumn(options=list(z_by_level), required=True),
+            "holding_mult": st.column_config.NumberColumn(min_value=0.5, max_value=2.0, step=0.05, required=True),
+            "category": st.column_config.SelectboxColumn(
+                options=["All"] + sorted(base_df["category"].unique()), required=True
+            ),
+            "supplier": st.column_config.SelectboxColumn(
+                options=["All"] + sorted(base_df["supplier"].unique()), required=True
+            ),
+            "risk_view": st.column_config.SelectboxColumn(options=list(risk_views), required=True),
+        },
+        key="scenario_editor",
+    ).dropna()
+
+    if len(scenario_input) == 0:
+        st.info("Add at least one scenario.")
+    else:
+        scenarios = scenario_input.assign(
+            name=scenario_input["name"].astype(str),
+            risk_filter=scenario_input["risk_view"].map(risk_views),
         )
+        stacked = apply_policy_scenarios(
+            base_df,
+            z_values=scenarios["service_level"].map(z_by_level).to_numpy(),
+            holding_mults=scenarios["holding_mult"].to_numpy(),
+        )
+        sc_kpis, sc_by_cat = scenario_summary(base_df, scenarios, stacked, min_cov, max_cov)
+
+        cols = st.columns(max(min(len(sc_kpis) - 1, 3), 1))
+        for col, row in zip(cols, sc_kpis.iloc[1:4].itertuples()):
+            col.metric(f"{row.scenario}: order budget", f"${row.order_budget:,.0f}",
+                       delta=f"{row.delta_order_budget:+,.0f}", delta_color="inverse")
+            col.metric(f"{row.scenario}: items at risk", int(row.items_at_risk),
+                       delta=int(row.delta_items_at_risk), delta_color="inverse")
+
+        st.dataframe(sc_kpis, width="stretch", hide_index=True)
+
+        deltas = sc_by_cat[sc_by_cat["scenario"] != scenarios["name"].iloc[0]]
+        d1, d2 = st.columns(2)
+        with d1:
+            chart_cell("Δ Order Budget by Category (vs first scenario)", True, charts.scenario_deltas,
+                       deltas, "delta_order_budget", "Δ order budget ($)")
+        with d2:
+            chart_cell("Δ Items At Risk by Category (vs first scenario)", True, charts.scenario_deltas,
+                       deltas, "delta_items_at_risk", "Δ items at risk")
 
-        fig_d = px.line(
-            sim_df,
-            x="date",
-            y="demand",
-            labels={"demand": "Units"},
+
+# ================= PAGE =================
+SNAPSHOT_DIR = "inventory_snapshots"  # daily policy history, see inventory_snapshots.py
+
+
+def main():
+    st.set_page_config(
+        page_title="Inventory Management BI System",
+        layout="wide"
+    )
+    st.title("Inventory Management BI System")
+
+    db_path = os.environ.get("INVENTORY_DB")
+    if db_path:
+        main_sql(db_path)
+        return
+
+    version = catalog_version()
+    base_df = load_base_inventory(version=version)
+    sku_index = load_sku_index(version=version)
+    locations = load_location_base(version=version).attrs["locations"]
+
+    params = render_sidebar(
+        sorted(base_df["category"].unique()),
+        sorted(base_df["supplier"].unique()),
+        locations,
+        LEAD_TIME_MODES,
+    )
+    service_level = params["service_level"]
+    holding_mult = round(params["holding_mult"], 2)  # slider floats -> the prefetch cache keys
+    lead_time_mode = params["lead_time_mode"]
+    location_filter = params["location_filter"]
+    z_value = Z_MAP[service_level]
+
+    bases = load_policy_bases(lead_time_mode, version=version)
+    base_df, loc_base = bases["network"], bases["locations"]
+    prefetcher = load_policy_prefetcher()
+    session = st.session_state.setdefault("prefetch_session", uuid.uuid4().hex)
+    cancel_prefetch(prefetcher, session)  # only this session's speculative work
+
+    # Per-session policy output buffers, overwritten in place on every rerun
+    buffers = st.session_state.setdefault("policy_buffers", {})
+    for key, n in [("network", len(base_df)), ("locations", len(loc_base))]:
+        if key not in buffers or len(buffers[key]["eoq"]) != n:
+            buffers[key] = alloc_policy_buffers(n)
+
+    # Prefetched neighbour state if the worker got there first, else compute into the session buffers
+    policy = {}
+    for key, df in bases.items():
+        b = cached_policy(prefetcher, ((key, lead_time_mode, version), len(df), z_value, holding_mult))
+        policy[key] = b if b is not None else policy_kernel(df, z_value, holding_mult, buffers[key])
+    df_policy = policy_frame(base_df, policy["network"])
+    df_loc_policy = policy_frame(loc_base, policy["locations"])
+
+    # Apply filters (network rows per SKU, or SKU x location rows when locations are narrowed)
+    view_filters = dict(
+        category_filter=params["category_filter"],
+        supplier_filter=params["supplier_filter"],
+        risk_filter=params["risk_filter"],
+        min_cov=params["min_cov"],
+        max_cov=params["max_cov"],
+    )
+    loc_rows = loc_base["location"].isin(location_filter).to_numpy()
+    df_loc_f = filter_view(df_loc_policy[loc_rows], **view_filters)
+    location_mode = set(location_filter) != set(locations)
+    df_f = df_loc_f if location_mode else filter_view(df_policy, **view_filters)
+    # Rows of df_policy in the view, built once per rerun so drilldown keystrokes stay O(matches)
+    in_view = np.zeros(len(df_policy), dtype=bool)
+    in_view[df_f["sku_pos"].to_numpy() if location_mode else df_f.index.to_numpy()] = True
+
+    # Exports recompute the policy chunk by chunk, so they never read the session buffers
+    policy_rows = partial(policy_chunks, base_df, z_value, holding_mult)
+    view_rows = partial(policy_chunks, loc_base, z_value, holding_mult, view_filters, loc_rows) \
+        if location_mode else partial(policy_chunks, base_df, z_value, holding_mult, view_filters)
+
+    # First run of the day stores the reference policy (not this session's sidebar
+    # policy) in the snapshot history, so the KPI trend compares like with like
+    import inventory_snapshots
+    reference = inventory_snapshots.REFERENCE_POLICY
+    if inventory_snapshots.snapshot_due(SNAPSHOT_DIR, reference):
+        reference_base = load_policy_bases(reference["lead_time_mode"], version=version)["network"]
+        inventory_snapshots.save_snapshot(
+            SNAPSHOT_DIR,
+            apply_policy(reference_base, Z_MAP[reference["service_level"]], reference["holding_mult"]),
+            per_day=True,
+            policy=reference,
         )
-        fig_d.update_traces(line=dict(color=PRIMARY_COLOR))
-        fig_d = style_fig(fig_d, height=350)
-        st.plotly_chart(fig_d, use_container_width=True)
+
+    # Network view: KPIs and Overview groupbys come from the roll-up cube of this policy
+    # state unless the days-of-cover range splits a cube cell
+    cube = None
+    if not location_mode:
+        cube_state = st.session_state.get("rollup_cube")
+        policy_state = (z_value, holding_mult, lead_time_mode, version)
+        if cube_state is None or cube_state["policy"] != policy_state:
+            cube_state = {"policy": policy_state, "cube": rollup_cube(df_policy)}
+            st.session_state["rollup_cube"] = cube_state
+        cube = cube_state["cube"]
+    kpis, aggs = view_aggregates(df_f, view_filters, cube)
+
+    render_kpis(kpis)
+    st.caption(
+        f"Policy: service level **{int(service_level*100)}%** "
+        f"(z = {z_value}) · holding cost x **{holding_mult:.2f}**"
+        + (f" · lead time: **{lead_time_mode.lower()}**" if lead_time_mode != LEAD_TIME_MODES[0] else "")
+        + (f" · locations: **{', '.join(location_filter)}** (per SKU x location)" if location_mode else "")
+        + (f" · shared catalog **v{version}**" if version is not None else "")
+    )
+
+    # Risk-flag transitions when a new catalog version arrives, under this policy state;
+    # detected and logged once per process, shown to every session under that state
+    risk_monitor, risk_state = load_risk_monitor(), (z_value, holding_mult, lead_time_mode)
+    transitions = update_risk_monitor(
+        risk_monitor, risk_state, version, base_df["sku_id"], policy["network"]["risk_code"]
+    )
+    log_risk_alerts(transitions)
+    n_alerts, alerts = risk_monitor["alerts"].get(risk_state, (0, None))
+    seen = st.session_state.setdefault("risk_alerts_seen", {})
+    render_risk_alerts(alerts, n_alerts - seen.get(risk_state, 0))
+    seen[risk_state] = n_alerts
+
+    tab_overview, tab_planner, tab_sku, tab_scenarios = st.tabs(
+        ["📊 Overview", "📦 Replenishment Planner", "🔍 SKU Drilldown", "🧪 Scenarios"]
+    )
+    with tab_overview:
+        render_overview(aggs, location_aggregates(df_loc_f))
+        render_kpi_history(inventory_snapshots.kpi_history(SNAPSHOT_DIR, reference), reference)
+    with tab_planner:
+        render_planner(df_f, location_mode, {
+            "Filtered view": (view_rows, len(df_f)),
+            "Policy (all SKUs)": (policy_rows, len(base_df)),
+        })
+    with tab_sku:
+        render_drilldown(df_f, df_policy, df_loc_policy, sku_index, in_view)
+    with tab_scenarios:
+        render_scenarios(base_df, service_level, holding_mult, params["min_cov"], params["max_cov"])
+
+    # Policy / filtered-view CSVs for the batch tools, written in the background and only
+    # when the policy, catalog version or view they hold changes
+    policy_key = (z_value, holding_mult, lead_time_mode, version)
+    view_key = policy_key + (
+        tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in view_filters.items()),
+        tuple(location_filter),
+    )
+    st.session_state["auto_exports"] = [
+        export_csv_if_changed(policy_rows, "inventory_policy_data.csv", policy_key),
+        export_csv_if_changed(view_rows, "inventory_filtered_data.csv", view_key),
+    ]
+
+    schedule_prefetch(
+        prefetcher, {(key, lead_time_mode, version): df for key, df in bases.items()}, service_level, holding_mult,
+        session,
+    )
+
+
+
+@st.cache_resource
+def load_catalog_db(db_path: str):
+    import inventory_sql
+
+    return inventory_sql.connect(db_path)
+
+
+def main_sql(db_path: str):
+    """Same page backed by a DuckDB catalog file: filters, KPIs and groupbys run as SQL."""
+    import inventory_sql
+
+    con = load_catalog_db(db_path).cursor()  # one cursor per rerun; sessions share the file handle
+
+    params = render_sidebar(
+        inventory_sql.sql_distinct(con, "category"),
+        inventory_sql.sql_distinct(con, "supplier"),
+    )
+    service_level = params["service_level"]
+    holding_mult = params["holding_mult"]
+    z_value = Z_MAP[service_level]
+    policy_filters = dict(
+        z=z_value,
+        holding_mult=holding_mult,
+        category_filter=params["category_filter"],
+        supplier_filter=params["supplier_filter"],
+        risk_filter=params["risk_filter"],
+        min_cov=params["min_cov"],
+        max_cov=params["max_cov"],
+    )
+
+    render_kpis(inventory_sql.sql_kpi_values(con, **policy_filters))
+    st.caption(
+        f"Policy: service level **{int(service_level*100)}%** "
+        f"(z = {z_value}) · holding cost x **{holding_mult:.2f}** · catalog: DuckDB `{db_path}`"
+    )
+
+    tab_overview, tab_planner = st.tabs(["📊 Overview", "📦 Replenishment Planner"])
+    with tab_overview:
+        render_overview(inventory_sql.sql_overview_aggregates(con, **policy_filters))
+    with tab_planner:
+        # Only the Stock-out / Below ROP rows are materialized for the planner
+        render_planner(inventory_sql.sql_rows(con, risk_only=True, **policy_filters), location_mode=False)
 
 
-df_policy.to_csv("inventory_policy_data.csv", index=False)
-df_f.to_csv("inventory_filtered_data.csv", index=False)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""HTTP API over the inventory policy engine (ROP / EOQ / risk flags).
+
+Serves the same policy results as the dashboard to other services:
+
+    GET  /health
+    GET  /policy?service_level=0.95&holding_mult=1.0&category=Paper&risk=Below ROP&format=ndjson
+    GET  /kpis?service_level=0.95&supplier=Sano
+    GET  /export?format=csv&compression=gzip&risk=Stock-out&risk=Below ROP
+    POST /skus   {"skus": ["SKU-1000", "SKU-1001"], "service_level": 0.95, "holding_mult": 1.0}
+
+Filter params (category, supplier, risk, sku) can be repeated. /policy streams its rows
+in chunks as NDJSON (default) or Arrow IPC (format=arrow), so large results are never
+serialized in one piece. /export streams the same rows as a file download (csv, parquet,
+xlsx or jsonl; compression=gzip|zstd), encoded chunk by chunk.
+
+Run locally with:  python inventory_api.py --port 8600
+"""
+import argparse
+import io
+import json
+import math
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from inventory_core import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    Z_MAP,
+    apply_policy,
+    build_sku_index,
+    export_file_name,
+    filter_view,
+    frame_chunks,
+    iter_export,
+    load_base_inventory,
+)
+
+STREAM_CHUNK_ROWS = 10_000
+
+
+# ================= CACHED POLICY RESULTS =================
+@lru_cache(maxsize=None)
+def catalog() -> pd.DataFrame:
+    """The served catalog, loaded once per worker (read-only)."""
+    return load_base_inventory()
+
+
+@lru_cache(maxsize=None)
+def sku_index() -> dict:
+    return build_sku_index(catalog())
+
+
+@lru_cache(maxsize=16)
+def policy_for(service_level: float, holding_mult: float) -> pd.DataFrame:
+    """Policy frame for one (service level, holding multiplier) pair, cached across requests."""
+    return apply_policy(catalog(), z=Z_MAP[service_level], holding_multiplier=holding_mult)
+
+
+def parse_policy_params(params) -> tuple:
+    service_level = float(params.get("service_level", 0.95))
+    if service_level not in Z_MAP:
+        raise ValueError(f"service_level must be one of {sorted(Z_MAP)}")
+    holding_mult = round(float(params.get("holding_mult", 1.0)), 4)
+    if not math.isfinite(holding_mult) or holding_mult <= 0:
+        raise ValueError("holding_mult must be a positive number")
+    return service_level, holding_mult
+
+
+def parse_filters(params) -> dict:
+    """Optional SKU / category / supplier / risk / days-of-cover filters of a query string."""
+    getlist = params.getlist if hasattr(params, "getlist") else lambda k: params.get(k, [])
+    bounds = {}
+    for key, default in [("min_cov", -np.inf), ("max_cov", np.inf)]:
+        try:
+            bounds[key] = float(params.get(key, default))
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be a number") from None
+    return dict(
+        skus=getlist("sku"),
+        category_filter=getlist("category"),
+        supplier_filter=getlist("supplier"),
+        risk_filter=getlist("risk"),
+        **bounds,
+    )
+
+
+def query_policy(df_policy: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Apply the filters of parse_filters()."""
+    filters = dict(filters)
+    skus = filters.pop("skus")
+    if skus:
+        positions = sku_index()["pos"].get_indexer(skus)
+        df_policy = df_policy.iloc[positions[positions >= 0]]
+    return filter_view(df_policy, **filters)
+
+
+async def filtered_policy(params) -> pd.DataFrame:
+    """Policy rows for a request's params (ValueError on a bad param), computed off the event loop."""
+    service_level, holding_mult = parse_policy_params(params)
+    filters = parse_filters(params)
+    df_policy = await run_in_threadpool(policy_for, service_level, holding_mult)
+    return await run_in_threadpool(query_policy, df_policy, filters)
+
+
+# ================= STREAMING ENCODERS =================
+# Sync generators: StreamingResponse iterates them in the threadpool, so encoding a
+# chunk never blocks the event loop
+def iter_ndjson(df: pd.DataFrame):
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        chunk = df.iloc[start:start + STREAM_CHUNK_ROWS]
+        yield chunk.to_json(orient="records", lines=True) + "\n"
+
+
+def iter_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for start in range(0, len(df), STREAM_CHUNK_ROWS):
+            chunk = df.iloc[start:start + STREAM_CHUNK_ROWS]
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # end-of-stream marker
+
+
+# ================= ROUTES =================
+async def health(request):
+    return JSONResponse({"status": "ok", "cached_policies": policy_for.cache_info().currsize})
+
+
+async def policy(request):
+    try:
+        df = await filtered_policy(request.query_params)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    if request.query_params.get("format", "ndjson") == "arrow":
+        return StreamingResponse(iter_arrow(df), media_type="application/vnd.apache.arrow.stream")
+    return StreamingResponse(iter_ndjson(df), media_type="application/x-ndjson")
+
+
+async def export(request):
+    """The filtered policy rows as a downloadable file, streamed as it is encoded."""
+    params = request.query_params
+    fmt = params.get("format", "csv")
+    compression = params.get("compression") or None
+    try:
+        if fmt not in EXPORT_FORMATS or compression not in EXPORT_COMPRESSIONS:
+            raise ValueError(f"format must be one of {list(EXPORT_FORMATS)}, "
+                             f"compression one of {[c for c in EXPORT_COMPRESSIONS if c]}")
+        df = await filtered_policy(params)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    name = export_file_name("inventory_policy", fmt, compression)
+    return StreamingResponse(
+        iter_export(frame_chunks(df), fmt, compression),  # sync generator: runs in the threadpool
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
+
+
+async def kpis(request):
+    try:
+        df = await filtered_policy(request.query_params)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    return JSONResponse({
+        "skus": int(len(df)),
+        "total_stock_value": float(df["stock_value"].sum()),
+        "items_at_risk": int(df["risk_flag"].isin(["Stock-out", "Below ROP"]).sum()),
+        "overstock_items": int((df["risk_flag"] == "Overstock").sum()),
+        "avg_days_cover": None if len(df) == 0 else float(df["days_of_cover"].mean()),
+        "total_rec_qty": int(df["recommended_order_qty"].sum()),
+        "rec_budget": float((df["recommended_order_qty"] * df["unit_cost"]).sum()),
+    })
+
+
+async def skus(request):
+    """Batch SKU lookup; unknown SKUs are listed under `missing`."""
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        service_level, holding_mult = parse_policy_params(body)
+        sku_ids = body["skus"]
+        if not isinstance(sku_ids, list) or not all(isinstance(sku, str) for sku in sku_ids):
+            raise ValueError("skus must be a list of SKU ids")
+    except (ValueError, KeyError, TypeError) as exc:
+        return JSONResponse({"error": f"invalid request body: {exc}"}, status_code=400)
+
+    df_policy = await run_in_threadpool(policy_for, service_level, holding_mult)
+    positions = sku_index()["pos"].get_indexer(sku_ids)
+    found = df_policy.iloc[positions[positions >= 0]]
+    return JSONResponse({
+        "items": json.loads(found.to_json(orient="records")),
+        "missing": [sku for sku, pos in zip(sku_ids, positions) if pos < 0],
+    })
+
+
+app = Starlette(routes=[
+    Route("/health", health),
+    Route("/policy", policy),
+    Route("/kpis", kpis),
+    Route("/export", export),
+    Route("/skus", skus, methods=["POST"]),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Inventory policy HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,222 @@
+"""Benchmarks for the policy engine hot paths.
+
+    python inventory_bench.py policy-memory --n-items 5000000
+    python inventory_bench.py policy-kernel --n-items 5000000
+    python inventory_bench.py lead-time --n-items 1000000
+    python inventory_bench.py validation --n-items 10000000
+    python inventory_bench.py generation --n-items 10000000 --workers 1 4
+
+policy-memory compares one dashboard rerun (policy + sidebar filters) done the original
+way (frame copy, chained column expressions, copy before filtering) against the buffered
+kernel (apply_policy with reused buffers + single-mask filter_view). It reports wall time,
+peak traced memory (tracemalloc sees every NumPy data allocation) and minor page faults.
+NumPy has no allocation counter, so fresh pages faulted in are used as the allocation
+proxy: reused buffers fault nothing, each new temporary faults in its full size.
+
+lead-time times the policy kernel with fixed lead times against stochastic ones
+(lead-time std from bootstrapped receipts), plus the bootstrap itself.
+
+validation times reading a catalog file (CSV and Parquet) against validating what was read.
+
+generation times the synthetic catalog per worker-process count and checks that every
+count produces the same catalog.
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from inventory_core import (
+    Z_MAP, alloc_policy_buffers, apply_policy, bootstrap_lead_time, filter_view, load_base_inventory,
+    load_fused_kernel, parquet_column_stats, policy_kernel, simulate_receipts, validate_catalog,
+    with_lead_time_stats,
+)
+
+BENCH_FILTERS = dict(
+    category_filter=["Home Cleaning", "Paper", "Kitchen"],
+    supplier_filter=["Sano", "Unilever", "P&G", "Local Supplier A"],
+    risk_filter=["Stock-out", "Below ROP", "Overstock"],
+    min_cov=0,
+    max_cov=120,
+)
+
+
+def make_catalog(n_items: int) -> pd.DataFrame:
+    """Generated catalog of n_items rows, built across all cores (same data for any core count)."""
+    return load_base_inventory(n_items, workers=os.cpu_count() or 1)
+
+
+def _rerun_original(base_df: pd.DataFrame, z: float, holding_mult: float) -> pd.DataFrame:
+    """The pre-kernel rerun: copy, pandas column chain, copy again, chained filters."""
+    df = base_df.copy()
+    df["holding_cost_adj"] = df["holding_cost"] * holding_mult
+    annual_demand = df["avg_daily_sales"] * 365
+    df["eoq"] = np.sqrt((2 * annual_demand * df["order_cost"]) / df["holding_cost_adj"])
+    safety_stock = z * df["demand_std"] * np.sqrt(df["lead_time_days"])
+    df["safety_stock"] = safety_stock.round().astype(int)
+    rop = df["avg_daily_sales"] * df["lead_time_days"] + df["safety_stock"]
+    df["rop"] = rop.round().astype(int)
+    df["risk_flag"] = np.select(
+        [df["current_stock"] <= 0, df["current_stock"] < df["rop"], df["days_of_cover"] > 7],
+        ["Stock-out", "Below ROP", "Overstock"],
+        default="Healthy"
+    )
+    df["recommended_order_qty"] = np.where(
+        df["current_stock"] < df["rop"],
+        np.maximum(df["eoq"].round().astype(int), df["rop"] - df["current_stock"]),
+        0
+    )
+
+    df_f = df.copy()
+    df_f = df_f[df_f["category"].isin(BENCH_FILTERS["category_filter"])]
+    df_f = df_f[df_f["supplier"].isin(BENCH_FILTERS["supplier_filter"])]
+    df_f = df_f[df_f["risk_flag"].isin(BENCH_FILTERS["risk_filter"])]
+    return df_f[(df_f["days_of_cover"] >= BENCH_FILTERS["min_cov"]) &
+                (df_f["days_of_cover"] <= BENCH_FILTERS["max_cov"])]
+
+
+def _measure(fn) -> dict:
+    tracemalloc.start()
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    t0 = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t0
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 2**20, 1),
+            "page_faults": faults, "rows_out": len(result)}
+
+
+def bench_policy_memory(n_items: int = 5_000_000, service_level: float = 0.95) -> pd.DataFrame:
+    base_df = make_catalog(n_items)
+    z = Z_MAP[service_level]
+    buffers = alloc_policy_buffers(n_items)
+
+    def rerun_kernel():
+        df_policy = apply_policy(base_df, z=z, holding_multiplier=1.0, buffers=buffers)
+        return filter_view(df_policy, **BENCH_FILTERS)
+
+    rows = []
+    for name, fn in [("original", lambda: _rerun_original(base_df, z, 1.0)), ("kernel", rerun_kernel)]:
+        fn()  # warm-up (first kernel call also fills the buffers)
+        rows.append({"path": name, **_measure(fn)})
+    return pd.DataFrame(rows)
+
+
+def bench_policy_kernel(n_items: int = 5_000_000, repeats: int = 5) -> pd.DataFrame:
+    """Best-of-N time for the fused JIT kernel vs the NumPy ufunc kernel (same buffers)."""
+    base_df = make_catalog(n_items)
+    buffers = alloc_policy_buffers(n_items)
+
+    rows = []
+    for engine in ["jit", "numpy"]:
+        if engine == "jit" and load_fused_kernel() is None:
+            continue
+        times = []
+        for _ in range(repeats + 1):  # first call compiles / warms up
+            t0 = time.perf_counter()
+            policy_kernel(base_df, Z_MAP[0.95], 1.0, buffers, engine=engine)
+            times.append(time.perf_counter() - t0)
+        rows.append({"engine": engine, "best_seconds": round(min(times[1:]), 4)})
+    return pd.DataFrame(rows)
+
+
+def bench_lead_time(n_items: int = 1_000_000, repeats: int = 5) -> pd.DataFrame:
+    """Best-of-N policy kernel time with fixed vs stochastic lead times, per engine."""
+    base_df = make_catalog(n_items)
+    t0 = time.perf_counter()
+    receipts = simulate_receipts(base_df)
+    stats = bootstrap_lead_time(receipts["supplier"], receipts["actual_days"] / receipts["planned_days"])
+    bootstrap_seconds = time.perf_counter() - t0
+    stochastic_df = with_lead_time_stats(base_df, stats)
+    buffers = alloc_policy_buffers(n_items)
+
+    rows = []
+    for engine in ["jit", "numpy"]:
+        if engine == "jit" and load_fused_kernel() is None:
+            continue
+        for lead_time, df in [("fixed", base_df), ("stochastic", stochastic_df)]:
+            times = []
+            for _ in range(repeats + 1):  # first call compiles / warms up
+                t0 = time.perf_counter()
+                policy_kernel(df, Z_MAP[0.95], 1.0, buffers, engine=engine)
+                times.append(time.perf_counter() - t0)
+            rows.append({"engine": engine, "lead_time": lead_time, "best_seconds": round(min(times[1:]), 4)})
+    rows.append({"engine": "bootstrap", "lead_time": "receipts", "best_seconds": round(bootstrap_seconds, 4)})
+    return pd.DataFrame(rows)
+
+
+def bench_validation(n_items: int = 10_000_000) -> pd.DataFrame:
+    """Read time of a catalog file vs the ingest validation of the frame read."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(make_catalog(n_items), preserve_index=False)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, write, read, file_stats in [
+            ("parquet", pq.write_table, pd.read_parquet, parquet_column_stats),
+            ("csv", pa_csv.write_csv, pd.read_csv, lambda path: None),
+        ]:
+            path = os.path.join(tmp, f"catalog.{fmt}")
+            write(table, path)
+            t0 = time.perf_counter()
+            df = read(path)
+            read_seconds = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            validate_catalog(df, stats=file_stats(path))  # as read_catalog does
+            validate_seconds = time.perf_counter() - t0
+            rows.append({"format": fmt, "read_seconds": round(read_seconds, 3),
+                         "validate_seconds": round(validate_seconds, 3),
+                         "overhead_pct": round(100 * validate_seconds / read_seconds, 1)})
+            del df
+    return pd.DataFrame(rows)
+
+
+def bench_generation(n_items: int = 10_000_000, workers: list = (1, 4)) -> pd.DataFrame:
+    """Catalog generation time per worker count; `identical` compares with the first count."""
+    rows, reference = [], None
+    for w in workers:
+        t0 = time.perf_counter()
+        df = load_base_inventory(n_items, workers=w)
+        seconds = time.perf_counter() - t0
+        digest = pd.util.hash_pandas_object(df, index=False).sum()
+        reference = digest if reference is None else reference
+        rows.append({"workers": w, "seconds": round(seconds, 3), "identical": bool(digest == reference)})
+        del df
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory policy benchmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_mem = sub.add_parser("policy-memory", help="peak memory / page faults per rerun")
+    p_mem.add_argument("--n-items", type=int, default=5_000_000)
+    p_kernel = sub.add_parser("policy-kernel", help="fused JIT kernel vs NumPy kernel")
+    p_kernel.add_argument("--n-items", type=int, default=5_000_000)
+    p_lead = sub.add_parser("lead-time", help="policy kernel with fixed vs stochastic lead times")
+    p_lead.add_argument("--n-items", type=int, default=1_000_000)
+    p_valid = sub.add_parser("validation", help="catalog file read time vs ingest validation")
+    p_valid.add_argument("--n-items", type=int, default=10_000_000)
+    p_gen = sub.add_parser("generation", help="synthetic catalog generation per worker count")
+    p_gen.add_argument("--n-items", type=int, default=10_000_000)
+    p_gen.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    if args.cmd == "policy-memory":
+        print(bench_policy_memory(args.n_items).to_string(index=False))
+    elif args.cmd == "policy-kernel":
+        print(bench_policy_kernel(args.n_items).to_string(index=False))
+    elif args.cmd == "lead-time":
+        print(bench_lead_time(args.n_items).to_string(index=False))
+    elif args.cmd == "validation":
+        print(bench_validation(args.n_items).to_string(index=False))
+    elif args.cmd == "generation":
+        print(bench_generation(args.n_items, args.workers).to_string(index=False))
@@ -0,0 +1,213 @@
+"""Shared, versioned catalog for multi-worker deployments.
+
+A catalog server publishes the base catalog as an Arrow IPC file in a shared directory
+(by default under /dev/shm, i.e. POSIX shared memory). Workers memory-map the current
+version and wrap its buffers as a read-only DataFrame without copying, so every worker
+shares one physical copy of the catalog through the page cache.
+
+Each version is written to its own file and renamed into place before the CURRENT
+pointer is swapped with an atomic rename, so a worker sees either the old or the new
+version, never a half-written one. Old files are unlinked after `keep` newer versions;
+workers that still map them keep reading until they attach the new version.
+
+Next to each catalog version the server publishes what the dashboard derives from it:
+the SKU x location base frame and the sorted SKU search index. Workers map those too,
+so per-worker memory does not grow with the catalog, whichever views are in use.
+
+    python inventory_catalog.py publish --n-items 1000000
+    python inventory_catalog.py serve --source catalog.parquet --interval 30
+    python inventory_catalog.py status
+
+Start the dashboard workers with INVENTORY_CATALOG_DIR pointing at the same directory.
+Source files are validated before they are published (inventory_core.validate_catalog);
+rejected rows are left out and written to <source>.quarantine.csv.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DEFAULT_STORE_DIR = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "inventory_catalog"
+)
+
+
+def current_version(store_dir: str) -> dict:
+    """The CURRENT pointer ({"version", "file", "rows", "published_at"}), or None."""
+    try:
+        with open(os.path.join(store_dir, "CURRENT")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+PARTS = ("catalog", "locations", "sku-index")  # files published per version
+
+
+def _part_file(part: str, version: int) -> str:
+    return f"{part}-{version:06d}.arrow"
+
+
+def _write_table(path: str, table: pa.Table):
+    """Write `table` as one record batch, so every column is one contiguous buffer in the file."""
+    table = table.combine_chunks()
+    for i, f in enumerate(table.schema):  # from_pandas turns NaN into nulls; keep NaN, so floats map as is
+        if pa.types.is_floating(f.type) and table.column(i).null_count:
+            table = table.set_column(i, f, pc.fill_null(table.column(i), float("nan")))
+    table = table.cast(pa.schema([  # large_string: what Arrow-backed pandas strings wrap as is
+        f.with_type(pa.large_string()) if pa.types.is_string(f.type) else f for f in table.schema
+    ], metadata=table.schema.metadata))
+    with pa.OSFile(path + ".tmp", "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(path + ".tmp", path)
+
+
+def publish_catalog(store_dir: str, df_base: pd.DataFrame, keep: int = 2) -> dict:
+    """Write `df_base` and its derived frames as the next catalog version and make it current.
+
+    One publisher per store (the catalog server); any number of readers.
+    """
+    from inventory_core import build_sku_index, location_base_frame, split_locations
+
+    os.makedirs(store_dir, exist_ok=True)
+    current = current_version(store_dir)
+    version = 1 if current is None else current["version"] + 1
+
+    loc_inv = split_locations(df_base)
+    sku_index = build_sku_index(df_base)
+    tables = {
+        "catalog": pa.Table.from_pandas(df_base, preserve_index=False),
+        "locations": pa.Table.from_pandas(location_base_frame(df_base, loc_inv), preserve_index=False)
+        .replace_schema_metadata({"locations": json.dumps(list(loc_inv["locations"]))}),
+        "sku-index": pa.table({k: sku_index[k] for k in ("sorted_keys", "sorted_ids", "sorted_pos")}),
+    }
+    for part, table in tables.items():
+        _write_table(os.path.join(store_dir, _part_file(part, version)), table)
+
+    entry = {"version": version, "file": _part_file("catalog", version), "rows": len(df_base),
+             "published_at": pd.Timestamp.now().isoformat(timespec="seconds")}
+    pointer = os.path.join(store_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        json.dump(entry, f)
+    os.replace(pointer + ".tmp", pointer)  # the version swap
+
+    for old in range(1, version - keep + 1):
+        for part in PARTS:
+            try:
+                os.remove(os.path.join(store_dir, _part_file(part, old)))
+            except FileNotFoundError:
+                pass
+    return entry
+
+
+def _single_chunk(col: pa.ChunkedArray) -> pa.Array:
+    return col.chunk(0) if col.num_chunks == 1 else col.combine_chunks()
+
+
+def _zero_copy_frame(table: pa.Table) -> pd.DataFrame:
+    """Wrap the table's single-chunk columns as a DataFrame without copying them."""
+    from inventory_core import ARROW_STR
+
+    columns = {}
+    for name, col in zip(table.column_names, table.columns):
+        if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+            columns[name] = pd.array(col, dtype=ARROW_STR)  # shares the buffers, on pandas 2.2 too
+        else:
+            columns[name] = _single_chunk(col).to_numpy(zero_copy_only=True)  # read-only view
+    return pd.DataFrame(columns, copy=False)
+
+
+def _attach_table(store_dir: str, part: str, version: int = None) -> tuple:
+    """Memory-map `part` of catalog `version` (current when None): (table, version)."""
+    for _ in range(3):
+        entry = current_version(store_dir)
+        if entry is None:
+            raise LookupError(f"no catalog published in {store_dir!r}")
+        mapped = entry["version"] if version is None else version
+        try:
+            source = pa.memory_map(os.path.join(store_dir, _part_file(part, mapped)))
+        except FileNotFoundError:
+            if version is not None:
+                raise LookupError(f"catalog version {version} is no longer in {store_dir!r}")
+            continue  # superseded and removed between reading CURRENT and opening it
+        return pa.ipc.open_file(source).read_all(), mapped
+    raise LookupError(f"catalog in {store_dir!r} keeps changing; try again")
+
+
+def attach_catalog(store_dir: str, version: int = None) -> pd.DataFrame:
+    """Memory-map catalog `version` (current when None) as a read-only, zero-copy frame."""
+    table, version = _attach_table(store_dir, "catalog", version)
+    df = _zero_copy_frame(table)
+    df.attrs["catalog_version"] = version
+    return df
+
+
+def attach_locations(store_dir: str, version: int = None) -> pd.DataFrame:
+    """The SKU x location base frame of catalog `version` (see location_base_frame), mapped read-only."""
+    table, version = _attach_table(store_dir, "locations", version)
+    df = _zero_copy_frame(table)
+    df.attrs.update(catalog_version=version, locations=json.loads(table.schema.metadata[b"locations"]))
+    return df
+
+
+def attach_sku_index(store_dir: str, sku_ids, version: int = None) -> dict:
+    """The SKU search index of catalog `version` (see build_sku_index), mapped read-only.
+
+    `sku_ids` is the attached catalog's sku_id column, for the exact-id lookup Index.
+    """
+    table, _ = _attach_table(store_dir, "sku-index", version)
+    return {
+        "pos": pd.Index(sku_ids),
+        "sorted_keys": _single_chunk(table["sorted_keys"]),
+        "sorted_ids": _single_chunk(table["sorted_ids"]),
+        "sorted_pos": _single_chunk(table["sorted_pos"]).to_numpy(zero_copy_only=True),
+    }
+
+
+def _read_source(source: str) -> pd.DataFrame:
+    """The validated catalog rows of `source`; rejected rows go to <source>.quarantine.csv."""
+    from inventory_core import read_catalog
+
+    result = read_catalog(source, quarantine_path=f"{source}.quarantine.csv")
+    if len(result["quarantine"]):
+        print(f"{len(result['quarantine']):,} rows quarantined to {source}.quarantine.csv", flush=True)
+        print(result["report"].to_string(index=False), flush=True)
+    return result["clean"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared, versioned catalog for dashboard workers")
+    parser.add_argument("--store-dir", default=os.environ.get("INVENTORY_CATALOG_DIR", DEFAULT_STORE_DIR))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_publish = sub.add_parser("publish", help="publish one catalog version")
+    p_publish.add_argument("--source", help="catalog CSV / Parquet (default: generated catalog)")
+    p_publish.add_argument("--n-items", type=int, default=150, help="size of the generated catalog")
+    p_serve = sub.add_parser("serve", help="publish --source, then republish whenever it changes")
+    p_serve.add_argument("--source", required=True, help="catalog CSV / Parquet")
+    p_serve.add_argument("--interval", type=float, default=30.0, help="seconds between source checks")
+    for p in (p_publish, p_serve):
+        p.add_argument("--keep", type=int, default=2, help="older versions kept for attached workers")
+    sub.add_parser("status", help="show the current version")
+    args = parser.parse_args()
+
+    if args.cmd == "status":
+        print(json.dumps(current_version(args.store_dir), indent=1))
+    else:
+        from inventory_core import load_base_inventory
+
+        df_base = _read_source(args.source) if args.source else load_base_inventory(args.n_items)
+        entry = publish_catalog(args.store_dir, df_base, keep=args.keep)
+        print(f"v{entry['version']}: {entry['rows']:,} SKUs in {args.store_dir}", flush=True)
+        mtime = os.path.getmtime(args.source) if args.source else None
+        while args.cmd == "serve":
+            time.sleep(args.interval)
+            if os.path.getmtime(args.source) != mtime:
+                mtime = os.path.getmtime(args.source)
+                entry = publish_catalog(args.store_dir, _read_source(args.source), keep=args.keep)
+                print(f"v{entry['version']}: {entry['rows']:,} SKUs", flush=True)
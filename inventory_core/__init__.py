@@ -0,0 +1,79 @@
+"""Core of the Inventory Management BI System: catalog data, policy engine, aggregates.
+
+Imports only NumPy and pandas, so API workers, batch jobs and benchmarks start fast.
+Figures live in inventory_core.charts (plotly loads on the first figure) and Numba is
+loaded on the first policy call; the Streamlit page is a thin shell over this package.
+"""
+from . import charts
+from .aggregates import (
+    CUBE_DIMS,
+    cube_aggregates,
+    filter_view,
+    kpi_values,
+    location_aggregates,
+    overview_aggregates,
+    rollup_cube,
+    scatter_sample,
+    scenario_summary,
+    view_aggregates,
+)
+from .data import (
+    ARROW_STR,
+    CATALOG_SEED,
+    SUPPLIER_LEAD_TIME,
+    build_sku_index,
+    chunk_rng,
+    key_normals,
+    key_states,
+    load_base_inventory,
+    location_base_frame,
+    search_sku_prefix,
+    simulate_daily_demand,
+    simulate_demand,
+    simulate_receipts,
+    sku_position,
+    split_locations,
+    supplier_lead_time_profile,
+)
+from .export import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    cancel_export,
+    export_file_name,
+    export_status,
+    frame_chunks,
+    iter_export,
+    new_export_worker,
+    policy_chunks,
+    submit_export,
+    write_export,
+)
+from .planning import expected_shortage, joint_replenishment, optimize_orders, replenishment_plan
+from .policy import (
+    ALERT_LOG_PATH,
+    POLICY_COLUMNS,
+    RISK_FLAGS,
+    Z_MAP,
+    alloc_policy_buffers,
+    apply_policy,
+    apply_policy_scenarios,
+    bootstrap_lead_time,
+    lead_time_demand_std,
+    load_fused_kernel,
+    log_risk_alerts,
+    new_risk_monitor,
+    policy_frame,
+    policy_kernel,
+    risk_transitions,
+    update_risk_codes,
+    update_risk_monitor,
+    with_lead_time_stats,
+)
+from .prefetch import (
+    cached_policy,
+    cancel_prefetch,
+    neighbour_policies,
+    new_policy_prefetcher,
+    schedule_prefetch,
+)
+from .validation import CATALOG_SCHEMA, parquet_column_stats, read_catalog, validate_catalog
@@ -0,0 +1,215 @@
+"""Filtered views and the reductions behind the KPI banners, Overview charts and scenarios."""
+import numpy as np
+import pandas as pd
+
+from .policy import RISK_FLAGS
+
+
+def filter_view(
+    df: pd.DataFrame,
+    category_filter: list,
+    supplier_filter: list,
+    risk_filter: list,
+    min_cov: float,
+    max_cov: float,
+) -> pd.DataFrame:
+    """Apply the sidebar filters to a policy frame (one combined mask, one row gather)."""
+    cov = df["days_of_cover"].to_numpy()
+    mask = cov >= min_cov
+    mask &= cov <= max_cov
+    if category_filter:
+        mask &= df["category"].isin(category_filter).to_numpy()
+    if supplier_filter:
+        mask &= df["supplier"].isin(supplier_filter).to_numpy()
+    if risk_filter:
+        mask &= df["risk_flag"].isin(risk_filter).to_numpy()
+
+    return df[mask]
+
+
+def kpi_values(df_f: pd.DataFrame) -> dict:
+    """KPI banner reductions over the filtered rows."""
+    return {
+        "total_stock_value": df_f["stock_value"].sum(),
+        "items_at_risk": (df_f["risk_flag"].isin(["Stock-out", "Below ROP"])).sum(),
+        "overstock_items": (df_f["risk_flag"] == "Overstock").sum(),
+        "avg_days_cover": df_f["days_of_cover"].mean(),
+    }
+
+
+def overview_aggregates(df_f: pd.DataFrame, scatter_rows: int = 5000) -> dict:
+    """Small frames behind the Overview charts (plus a capped row sample for the scatter)."""
+    by_category = df_f.groupby("category", as_index=False).agg(
+        stock_value=("stock_value", "sum"),
+        sku_count=("sku_id", "count"),
+        recommended_order_qty=("recommended_order_qty", "sum"),
+    )
+    return {
+        "rows": len(df_f),
+        "by_category": by_category,
+        "by_supplier": df_f.groupby("supplier", as_index=False)["stock_value"].sum(),
+        "by_risk": (
+            df_f.groupby("risk_flag", as_index=False)["sku_id"]
+            .count()
+            .rename(columns={"sku_id": "count"})
+        ),
+        "scatter": scatter_sample(df_f, scatter_rows),
+    }
+
+
+def scatter_sample(df_f: pd.DataFrame, scatter_rows: int = 5000) -> pd.DataFrame:
+    return df_f if len(df_f) <= scatter_rows else df_f.sample(scatter_rows, random_state=0)
+
+
+def view_aggregates(df_f: pd.DataFrame, view_filters: dict, cube: dict = None) -> tuple:
+    """(kpis, overview aggregates) of a filtered view.
+
+    Answered from the roll-up cube when one is given and the days-of-cover range does
+    not split its cells; otherwise by scanning df_f.
+    """
+    answer = cube_aggregates(cube, **view_filters) if cube is not None else None
+    if answer is None:
+        return kpi_values(df_f), overview_aggregates(df_f)
+    kpis, aggs = answer
+    aggs["scatter"] = scatter_sample(df_f)
+    return kpis, aggs
+
+
+def location_aggregates(df_loc_f: pd.DataFrame) -> dict:
+    """Per-location roll-ups behind the location charts (SKU x location rows)."""
+    return {
+        "rows": len(df_loc_f),
+        "by_location_risk": (
+            df_loc_f.groupby(["location", "risk_flag"], as_index=False)["stock_value"]
+            .sum()
+        ),
+        "at_risk": (
+            df_loc_f.assign(at_risk=df_loc_f["risk_flag"].isin(["Stock-out", "Below ROP"]))
+            .groupby("location", as_index=False)["at_risk"]
+            .sum()
+        ),
+    }
+
+
+# ================= ROLL-UP CUBE =================
+CUBE_DIMS = ["category", "supplier", "risk_flag"]
+
+
+def rollup_cube(df_policy: pd.DataFrame) -> dict:
+    """category x supplier x risk cells (a few dozen) as arrays: counts, sums, cover range.
+
+    Built once per policy state; cube_aggregates() then never touches the rows.
+    """
+    cells = df_policy.groupby(CUBE_DIMS, as_index=False).agg(
+        sku_count=("sku_id", "count"),
+        stock_value=("stock_value", "sum"),
+        recommended_order_qty=("recommended_order_qty", "sum"),
+        cover_sum=("days_of_cover", "sum"),
+        cover_count=("days_of_cover", "count"),
+        cover_min=("days_of_cover", "min"),
+        cover_max=("days_of_cover", "max"),
+    )
+    return {col: cells[col].to_numpy() for col in cells.columns}
+
+
+def _cube_sum(cube: dict, mask: np.ndarray, dim: str, cols: list) -> pd.DataFrame:
+    keys, group = np.unique(cube[dim][mask], return_inverse=True)
+    out = {dim: keys}
+    for col in cols:
+        total = np.bincount(group, weights=cube[col][mask], minlength=len(keys))
+        out[col] = total if cube[col].dtype.kind == "f" else total.round().astype(np.int64)
+    return pd.DataFrame(out)
+
+
+def cube_aggregates(
+    cube: dict,
+    category_filter: list,
+    supplier_filter: list,
+    risk_filter: list,
+    min_cov: float,
+    max_cov: float,
+):
+    """(kpis, overview aggregates without the scatter) answered from the cube.
+
+    Same filter rules as filter_view. Returns None when the days-of-cover range cuts
+    through a selected cell (or a cell has missing cover); the caller then scans rows.
+    """
+    mask = np.ones(len(cube["sku_count"]), dtype=bool)
+    for col, values in zip(CUBE_DIMS, [category_filter, supplier_filter, risk_filter]):
+        if values:
+            mask &= np.isin(cube[col], values)
+    if np.any((cube["cover_count"][mask] < cube["sku_count"][mask])
+              | (cube["cover_min"][mask] < min_cov) | (cube["cover_max"][mask] > max_cov)):
+        return None
+
+    count = cube["sku_count"][mask]
+    risk = cube["risk_flag"][mask]
+    cover_count = cube["cover_count"][mask].sum()
+    kpis = {
+        "total_stock_value": cube["stock_value"][mask].sum(),
+        "items_at_risk": count[(risk == "Stock-out") | (risk == "Below ROP")].sum(),
+        "overstock_items": count[risk == "Overstock"].sum(),
+        "avg_days_cover": cube["cover_sum"][mask].sum() / cover_count if cover_count else float("nan"),
+    }
+    aggs = {
+        "rows": int(count.sum()),
+        "by_category": _cube_sum(cube, mask, "category", ["stock_value", "sku_count", "recommended_order_qty"]),
+        "by_supplier": _cube_sum(cube, mask, "supplier", ["stock_value"]),
+        "by_risk": _cube_sum(cube, mask, "risk_flag", ["sku_count"]).rename(columns={"sku_count": "count"}),
+    }
+    return kpis, aggs
+
+
+# ================= SCENARIOS =================
+def scenario_summary(df_base: pd.DataFrame, scenarios: pd.DataFrame, stacked: dict,
+                     min_cov: float, max_cov: float):
+    """Per-scenario KPIs and category breakdowns from the stacked policy arrays.
+
+    `scenarios` has one row per scenario with `category`, `supplier` ("All" or a value)
+    and `risk_filter` (list of labels). Returns (kpis, by_category), both long frames.
+    """
+    k = len(scenarios)
+    cov = df_base["days_of_cover"].to_numpy()
+    in_range = (cov >= min_cov) & (cov <= max_cov)
+
+    mask = np.empty(stacked["rop"].shape, dtype=bool)
+    for i, sc in enumerate(scenarios.itertuples(index=False)):
+        m = in_range.copy()
+        if sc.category != "All":
+            m &= df_base["category"].to_numpy() == sc.category
+        if sc.supplier != "All":
+            m &= df_base["supplier"].to_numpy() == sc.supplier
+        m &= np.isin(stacked["risk_code"][i], np.flatnonzero(np.isin(RISK_FLAGS, sc.risk_filter)))
+        mask[i] = m
+
+    value = df_base["stock_value"].to_numpy() * mask
+    at_risk = (stacked["risk_code"] <= 1) & mask
+    budget = stacked["recommended_order_qty"] * df_base["unit_cost"].to_numpy() * mask
+
+    kpis = pd.DataFrame({
+        "scenario": scenarios["name"].to_numpy(),
+        "skus": mask.sum(axis=1),
+        "stock_value": value.sum(axis=1).round(2),
+        "items_at_risk": at_risk.sum(axis=1),
+        "overstock_items": ((stacked["risk_code"] == 2) & mask).sum(axis=1),
+        "order_budget": budget.sum(axis=1).round(2),
+    })
+    for col in ["stock_value", "items_at_risk", "overstock_items", "order_budget"]:
+        kpis[f"delta_{col}"] = (kpis[col] - kpis[col].iloc[0]).round(2)
+
+    # (scenario, category) sums in one bincount over flattened group ids
+    cat_codes, cats = pd.factorize(df_base["category"], sort=True)
+    group = (np.arange(k)[:, None] * len(cats) + cat_codes).ravel()
+    size = k * len(cats)
+    by_category = pd.DataFrame({
+        "scenario": np.repeat(scenarios["name"].to_numpy(), len(cats)),
+        "category": np.tile(cats, k),
+        "order_budget": np.bincount(group, weights=budget.ravel(), minlength=size),
+        "items_at_risk": np.bincount(group, weights=at_risk.ravel(), minlength=size).astype(int),
+    })
+    base_rows = by_category.iloc[: len(cats)]
+    for col in ["order_budget", "items_at_risk"]:
+        by_category[f"delta_{col}"] = np.round(
+            by_category[col].to_numpy() - np.tile(base_rows[col].to_numpy(), k), 2
+        )
+    return kpis, by_category
@@ -0,0 +1,210 @@
+"""Plotly figures for the dashboard, built from the aggregate frames (no Streamlit).
+
+plotly.express is imported when the first figure is built, not with the package.
+"""
+PRIMARY_COLOR = "#006699"
+ACCENT_COLOR = "#ff9933"
+
+COLOR_PALETTE = [
+    PRIMARY_COLOR,
+    ACCENT_COLOR,
+    "#004466",
+    "#ffb366",
+    "#3399cc",
+]
+
+RISK_COLOR_MAP = {
+    "Healthy": COLOR_PALETTE[0],
+    "Stock-out": COLOR_PALETTE[1],
+    "Below ROP": COLOR_PALETTE[1],
+    "Overstock": COLOR_PALETTE[2],
+}
+
+
+def _px():
+    import plotly.express as px
+
+    return px
+
+
+def style_fig(fig, height=320):
+    """Apply common white background + black text to all charts."""
+    fig.update_layout(
+        height=height,
+        margin=dict(l=10, r=10, t=40, b=10),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font=dict(color="black"),
+        xaxis=dict(
+            title_font=dict(color="black"),
+            tickfont=dict(color="black"),
+        ),
+        yaxis=dict(
+            title_font=dict(color="black"),
+            tickfont=dict(color="black"),
+        ),
+        legend=dict(
+            title_font=dict(color="black"),
+            font=dict(color="black"),
+        ),
+    )
+    return fig
+
+
+# ================= OVERVIEW =================
+def stock_value_by_category(by_category):
+    fig = _px().bar(
+        by_category,
+        x="category",
+        y="stock_value",
+        color="category",
+        color_discrete_sequence=COLOR_PALETTE,
+        labels={"stock_value": "Stock value", "category": "Category"},
+    )
+    return style_fig(fig, height=320)
+
+
+def demand_vs_cover(scatter):
+    """Bubble scatter of demand vs days of cover, sized by stock value."""
+    fig = _px().scatter(
+        scatter,
+        x="avg_daily_sales",
+        y="days_of_cover",
+        color="risk_flag",
+        color_discrete_map=RISK_COLOR_MAP,
+        size="stock_value",
+        hover_data=["sku_id", "category", "supplier"],
+        labels={
+            "avg_daily_sales": "Avg daily sales (units)",
+            "days_of_cover": "Days of cover",
+            "risk_flag": "Risk status",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def stock_value_by_supplier(by_supplier):
+    """Donut of stock value by supplier."""
+    fig = _px().pie(
+        by_supplier,
+        names="supplier",
+        values="stock_value",
+        hole=0.55,
+        color="supplier",
+        color_discrete_sequence=COLOR_PALETTE,
+    )
+    fig.update_traces(textinfo="percent+label")
+    return style_fig(fig, height=320)
+
+
+def risk_distribution(by_risk):
+    fig = _px().bar(
+        by_risk,
+        x="risk_flag",
+        y="count",
+        color="risk_flag",
+        color_discrete_map=RISK_COLOR_MAP,
+        labels={
+            "risk_flag": "Risk status",
+            "count": "Number of SKUs",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def sku_count_by_category(by_category):
+    fig = _px().line(
+        by_category,
+        x="category",
+        y="sku_count",
+        markers=True,
+        color_discrete_sequence=[PRIMARY_COLOR],
+        labels={
+            "category": "Category",
+            "sku_count": "Number of SKUs",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def rec_qty_by_category(by_category):
+    fig = _px().bar(
+        by_category,
+        x="category",
+        y="recommended_order_qty",
+        color="category",
+        color_discrete_sequence=COLOR_PALETTE,
+        labels={
+            "recommended_order_qty": "Recommended qty (units)",
+            "category": "Category",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def stock_value_by_location(by_location_risk):
+    """Stacked bar of stock value per location, split by risk status."""
+    fig = _px().bar(
+        by_location_risk,
+        x="location",
+        y="stock_value",
+        color="risk_flag",
+        color_discrete_map=RISK_COLOR_MAP,
+        labels={
+            "stock_value": "Stock value",
+            "location": "Location",
+            "risk_flag": "Risk status",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def at_risk_by_location(at_risk):
+    fig = _px().bar(
+        at_risk,
+        x="location",
+        y="at_risk",
+        color="location",
+        color_discrete_sequence=COLOR_PALETTE,
+        labels={
+            "at_risk": "SKUs at risk",
+            "location": "Location",
+        },
+    )
+    return style_fig(fig, height=320)
+
+
+def kpi_trend(history, kpi: str, label: str, color: str = PRIMARY_COLOR):
+    """One KPI across the stored policy snapshots."""
+    fig = _px().line(
+        history, x="at", y=kpi, markers=True,
+        color_discrete_sequence=[color],
+        labels={"at": "Snapshot", kpi: label},
+    )
+    return style_fig(fig, height=280)
+
+
+# ================= DRILLDOWN / SCENARIOS =================
+def demand_history(sim_df):
+    fig = _px().line(
+        sim_df,
+        x="date",
+        y="demand",
+        labels={"demand": "Units"},
+    )
+    fig.update_traces(line=dict(color=PRIMARY_COLOR))
+    return style_fig(fig, height=350)
+
+
+def scenario_deltas(by_category, delta: str, label: str):
+    """Grouped bars of one per-category delta for each scenario."""
+    fig = _px().bar(
+        by_category,
+        x="category",
+        y=delta,
+        color="scenario",
+        barmode="group",
+        color_discrete_sequence=COLOR_PALETTE,
+        labels={delta: label, "category": "Category"},
+    )
+    return style_fig(fig, height=320)
@@ -0,0 +1,357 @@
+"""Catalog data: the generated SKU catalog, its SKU x location split, the SKU index and
+simulated demand.
+
+Plain functions without caching; the Streamlit app and the API cache them per process.
+Generation and simulation take a `workers` count for process parallelism; their
+results do not depend on it.
+"""
+from bisect import bisect_left
+from operator import methodcaller
+
+import numpy as np
+import pandas as pd
+
+# Arrow-backed strings with NaN for missing values: pandas 3's "str" default, spelled out
+# so that on pandas 2.2 (where "str" is still object) string columns stay in Arrow buffers.
+try:
+    ARROW_STR = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:  # pandas < 2.3
+    ARROW_STR = pd.StringDtype("pyarrow_numpy")
+
+
+# ================= RANDOM STREAMS =================
+# Every random draw comes from a stream derived with SeedSequence spawning, addressed by
+# what is generated (a fixed-size chunk of the catalog, the hash of a SKU key) rather
+# than by the order of the work, so results are bit-identical whatever the number of workers.
+CATALOG_SEED = 42
+DEMAND_SEED = 2024
+CATALOG_CHUNK_ROWS = 65_536  # part of the catalog's definition: changing it changes the data
+STREAM_CATALOG, STREAM_DEMAND = 0, 1
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def chunk_rng(seed: int, stream: int, chunk: int) -> np.random.Generator:
+    """Generator of chunk `chunk` in `stream`: SeedSequence(seed).spawn(...)[stream].spawn(...)[chunk]."""
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(stream, chunk))))
+
+
+def _mix64(z: np.ndarray) -> np.ndarray:
+    """SplitMix64 output function, in place on a uint64 array."""
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def key_states(seed: int, stream: int, keys) -> np.ndarray:
+    """Stream state per key (e.g. a sku_id) in `stream`, hashed in bulk from the key's bytes,
+    so a key's draws do not move when rows are filtered or reordered."""
+    salt = np.random.SeedSequence(seed, spawn_key=(stream,)).generate_state(1, np.uint64)[0]
+    hashes = pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False)  # SipHash, fixed key
+    return _mix64(hashes ^ salt)
+
+
+def key_normals(states: np.ndarray, size: int) -> np.ndarray:
+    """(len(states), size) standard normals, row i from the SplitMix64 sequence of states[i]
+    (Box-Muller on pairs of draws), so a row depends on its own state only."""
+    pairs = -(-size // 2)
+    bits = states[:, None] + np.arange(1, 2 * pairs + 1, dtype=np.uint64) * _GOLDEN_GAMMA
+    u = (_mix64(bits) >> np.uint64(11)) * 2.0**-53  # [0, 1)
+    radius = np.sqrt(-2.0 * np.log1p(-u[:, 0::2]))
+    angle = 2 * np.pi * u[:, 1::2]
+    z = np.empty((len(states), 2 * pairs))
+    z[:, 0::2] = radius * np.cos(angle)
+    z[:, 1::2] = radius * np.sin(angle)
+    return z[:, :size]
+
+
+def _run_parallel(fn, tasks: list, workers: int) -> list:
+    """[fn(*task) for task in tasks], across `workers` processes when workers > 1."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(*task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(fn, *zip(*tasks)))
+
+
+# ================= DATA GENERATION =================
+CATEGORIES = ["Home Cleaning", "Personal Care", "Paper", "Kitchen"]
+SUPPLIERS = ["Sano", "Unilever", "P&G", "Local Supplier A", "Local Supplier B"]
+
+
+def _uniform_int(u: np.ndarray, low, high) -> np.ndarray:
+    """Integers in [low, high) from uniforms in [0, 1)."""
+    return np.minimum(low + (u * (high - low)).astype(np.int64), high - 1)
+
+
+def _catalog_chunk(seed: int, chunk: int, n: int = CATALOG_CHUNK_ROWS) -> pd.DataFrame:
+    """The first `n` rows of one catalog chunk, from that chunk's own stream.
+
+    Row i is built from draws 10i .. 10i+9 of the stream alone, so a shorter chunk is
+    exactly the first rows of the full one.
+    """
+    u = chunk_rng(seed, STREAM_CATALOG, chunk).random((n, 10))
+
+    category = pd.array(CATEGORIES, dtype=ARROW_STR).take(_uniform_int(u[:, 0], 0, len(CATEGORIES)))
+    supplier = pd.array(SUPPLIERS, dtype=ARROW_STR).take(_uniform_int(u[:, 1], 0, len(SUPPLIERS)))
+    avg_daily_sales = 3 + 77 * u[:, 2]  # units / day
+    demand_std = avg_daily_sales * (0.2 + 0.4 * u[:, 3])
+    lead_time_days = _uniform_int(u[:, 4], 3, 21)
+    current_stock = _uniform_int(u[:, 5], 0, (avg_daily_sales * 45).astype(np.int64))
+
+    unit_cost = 5 + 35 * u[:, 6]
+    unit_price = unit_cost * (1.2 + 0.7 * u[:, 7])
+    order_cost = 80 + 170 * u[:, 8]  # per order
+    holding_cost = unit_cost * (0.18 + 0.14 * u[:, 9])  # 18–32% / year
+
+    return pd.DataFrame({
+        "category": category,
+        "supplier": supplier,
+        "avg_daily_sales": np.round(avg_daily_sales, 2),
+        "demand_std": np.round(demand_std, 2),
+        "lead_time_days": lead_time_days,
+        "current_stock": current_stock,
+        "unit_cost": np.round(unit_cost, 2),
+        "unit_price": np.round(unit_price, 2),
+        "annual_demand": np.round(avg_daily_sales * 365, 0),
+        "order_cost": np.round(order_cost, 2),
+        "holding_cost": np.round(holding_cost, 2),
+        "stock_value": np.round(current_stock * unit_cost, 2),
+    })
+
+
+def _sku_ids(numbers: np.ndarray):
+    """"SKU-<n>" strings, formatted in Arrow (several times faster than astype(str))."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    return pd.array(pc.binary_join_element_wise("SKU-", pc.cast(pa.array(numbers), pa.string()), ""), dtype=ARROW_STR)
+
+
+def load_base_inventory(n_items: int = 150, seed: int = CATALOG_SEED, workers: int = 1) -> pd.DataFrame:
+    """Synthetic catalog of SKU-1000 .. SKU-(999 + n_items).
+
+    Generated in chunks of CATALOG_CHUNK_ROWS, each from its own spawned stream, so the
+    result is the same for any `workers` (processes), and a smaller catalog is a prefix
+    of a larger one with the same seed.
+    """
+    n_chunks = max(-(-n_items // CATALOG_CHUNK_ROWS), 1)
+    tasks = [(seed, c, min(CATALOG_CHUNK_ROWS, n_items - c * CATALOG_CHUNK_ROWS)) for c in range(n_chunks)]
+    df = pd.concat(_run_parallel(_catalog_chunk, tasks, workers), ignore_index=True)
+    df.insert(0, "sku_id", _sku_ids(np.arange(n_items) + 1000))
+
+    df["days_of_cover"] = np.where(
+        df["avg_daily_sales"] > 0,
+        df["current_stock"] / df["avg_daily_sales"],
+        np.nan
+    )
+
+    return df
+
+
+# ================= LEAD-TIME RELIABILITY =================
+# Per supplier: (mean actual / planned lead time, coefficient of variation of that ratio)
+SUPPLIER_LEAD_TIME = {
+    "Sano": (1.10, 0.30),
+    "Unilever": (1.00, 0.10),
+    "P&G": (1.00, 0.12),
+    "Local Supplier A": (1.20, 0.40),
+    "Local Supplier B": (1.25, 0.45),
+}
+
+
+def supplier_lead_time_profile() -> pd.DataFrame:
+    """SUPPLIER_LEAD_TIME as actual/planned ratio stats (the columns bootstrap_lead_time returns)."""
+    return pd.DataFrame(
+        SUPPLIER_LEAD_TIME.values(),
+        index=pd.Index(list(SUPPLIER_LEAD_TIME), name="key"),
+        columns=["lead_time_mean", "lead_time_std"],
+    )
+
+
+def simulate_receipts(df_base: pd.DataFrame, n_receipts: int = 5000, seed: int = 11) -> dict:
+    """Receipts history of random SKUs: supplier, planned and actual lead time (whole days).
+
+    Actual lead times are lognormal around each supplier's SUPPLIER_LEAD_TIME profile.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(df_base), size=n_receipts)
+    supplier = df_base["supplier"].take(rows).to_numpy(dtype=str)
+    planned = df_base["lead_time_days"].to_numpy()[rows]
+
+    profile = supplier_lead_time_profile()
+    pos = profile.index.get_indexer(supplier)
+    mean_ratio = np.where(pos >= 0, profile["lead_time_mean"].to_numpy()[pos], 1.0)
+    cv = np.where(pos >= 0, profile["lead_time_std"].to_numpy()[pos], 0.0)
+    sigma2 = np.log1p(cv * cv)
+    ratio = rng.lognormal(np.log(mean_ratio) - sigma2 / 2, np.sqrt(sigma2))
+
+    return {
+        "supplier": supplier,
+        "planned_days": planned,
+        "actual_days": np.maximum(np.round(planned * ratio), 1).astype(int),
+    }
+
+
+# ================= LOCATIONS (SKU x LOCATION) =================
+def split_locations(base: pd.DataFrame) -> dict:
+    """Split each SKU's network stock and demand across the locations that carry it.
+
+    Pairs are stored CSR-style: SKU i owns entries indptr[i]:indptr[i+1] of the pair
+    arrays, so memory grows with stocked SKU-location pairs, not SKUs x locations.
+    Per-location stock adds up exactly to the SKU's network current_stock.
+    """
+    rng = np.random.default_rng(7)
+    locations = np.array(["Central DC", "North Store", "South Store", "East Store"])
+    lead_time_offset = np.array([0, 2, 2, 3])  # extra days from DC to store
+
+    n = len(base)
+
+    stocked = rng.random((n, len(locations))) < 0.6
+    stocked[:, 0] = True  # the DC carries every SKU
+    row_len = stocked.sum(axis=1)
+    indptr = np.concatenate([[0], np.cumsum(row_len)])
+    sku_pos, loc_idx = np.nonzero(stocked)  # row-major -> already in CSR order
+
+    # Random demand share per pair (Dirichlet via normalized gamma draws)
+    weight = rng.gamma(1.0, size=len(loc_idx))
+    share = weight / np.add.reduceat(weight, indptr[:-1])[sku_pos]
+
+    stock_total = base["current_stock"].to_numpy()
+    stock = np.floor(stock_total[sku_pos] * share).astype(int)
+    stock[indptr[:-1]] += stock_total - np.add.reduceat(stock, indptr[:-1])  # remainder to the DC
+
+    return {
+        "locations": locations,
+        "indptr": indptr,
+        "sku_pos": sku_pos,
+        "loc_idx": loc_idx,
+        "current_stock": stock,
+        "avg_daily_sales": np.round(base["avg_daily_sales"].to_numpy()[sku_pos] * share, 2),
+        "demand_std": np.round(base["demand_std"].to_numpy()[sku_pos] * np.sqrt(share), 2),
+        "lead_time_days": base["lead_time_days"].to_numpy()[sku_pos] + lead_time_offset[loc_idx],
+    }
+
+
+def location_base_frame(df_base: pd.DataFrame, loc_inv: dict, locations: list = None) -> pd.DataFrame:
+    """Expand SKU attributes onto the stocked SKU-location pairs (optionally for some locations)."""
+    keep = np.ones(len(loc_inv["loc_idx"]), dtype=bool)
+    if locations is not None:
+        keep = np.isin(loc_inv["locations"][loc_inv["loc_idx"]], locations)
+    sku_pos = loc_inv["sku_pos"][keep]
+
+    df = df_base.iloc[sku_pos].reset_index(drop=True)
+    df.insert(3, "location", loc_inv["locations"][loc_inv["loc_idx"][keep]])
+    for col in ["current_stock", "avg_daily_sales", "demand_std", "lead_time_days"]:
+        df[col] = loc_inv[col][keep]
+
+    df["annual_demand"] = np.round(df["avg_daily_sales"] * 365, 0)
+    df["stock_value"] = np.round(df["current_stock"] * df["unit_cost"], 2)
+    df["days_of_cover"] = np.where(
+        df["avg_daily_sales"] > 0,
+        df["current_stock"] / df["avg_daily_sales"],
+        np.nan
+    )
+    df["sku_pos"] = sku_pos
+    df.attrs["locations"] = list(loc_inv["locations"])  # every location of the split, in order
+    return df
+
+
+# ================= SKU INDEX =================
+def build_sku_index(df_base: pd.DataFrame) -> dict:
+    """Sorted, case-insensitive prefix index of the SKU ids over Arrow strings (build once per
+    catalog), plus a SKU -> row position Index whose hash table is built on its first lookup."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    sku_ids = pa.chunked_array(pa.array(df_base["sku_id"].array)).combine_chunks()
+    # prefix search ignores case; lookups by exact id do not
+    keys = pc.utf8_upper(sku_ids)
+    order = pc.sort_indices(keys)  # stable
+    return {
+        "pos": pd.Index(df_base["sku_id"]),  # bulk get_indexer (API)
+        "sorted_keys": keys.take(order),
+        "sorted_ids": sku_ids.take(order),
+        "sorted_pos": order.to_numpy(),
+    }
+
+
+def _key_range(sorted_keys, lo_key: str, hi_key: str) -> tuple:
+    """[lo, hi) of the sorted Arrow keys with lo_key <= key < hi_key, by binary search."""
+    as_py = methodcaller("as_py")
+    return bisect_left(sorted_keys, lo_key, key=as_py), bisect_left(sorted_keys, hi_key, key=as_py)
+
+
+def _upper(text: str) -> str:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    return pc.utf8_upper(pa.scalar(text, pa.large_string())).as_py()  # the index's case folding
+
+
+def sku_position(sku_index: dict, sku_id: str) -> int:
+    """Row position of `sku_id` (exact case) in O(log n); KeyError when absent."""
+    key = _upper(sku_id)
+    lo, hi = _key_range(sku_index["sorted_keys"], key, key + "\0")
+    for i in range(lo, hi):
+        if sku_index["sorted_ids"][i].as_py() == sku_id:
+            return int(sku_index["sorted_pos"][i])
+    raise KeyError(sku_id)
+
+
+def search_sku_prefix(sku_index: dict, prefix: str, in_view: np.ndarray, limit: int = 50) -> list:
+    """Return up to `limit` SKU ids starting with `prefix` (any case) whose rows are in the current view."""
+    sorted_ids = sku_index["sorted_ids"]
+    sorted_pos = sku_index["sorted_pos"]
+    prefix = _upper(prefix.strip())
+    lo, hi = _key_range(sku_index["sorted_keys"], prefix, prefix + "\uffff")
+
+    # Scan the matching range in blocks so a short prefix never touches the whole catalog
+    matches = []
+    block = max(limit * 4, 256)
+    while lo < hi and len(matches) < limit:
+        stop = min(lo + block, hi)
+        keep = in_view[sorted_pos[lo:stop]]
+        ids = sorted_ids.slice(lo, stop - lo).to_numpy(zero_copy_only=False)
+        matches.extend(ids[keep][: limit - len(matches)].tolist())
+        lo = stop
+    return matches
+
+
+# ================= DEMAND SIMULATION =================
+def _demand_paths(seed: int, sku_ids, avg, std, days: int) -> np.ndarray:
+    """One row of daily demand per SKU, each drawn from the SKU's own key stream."""
+    out = key_normals(key_states(seed, STREAM_DEMAND, sku_ids), days)
+    out = out * np.asarray(std, float)[:, None] + np.asarray(avg, float)[:, None]
+    return np.clip(out, 0, None, out=out)
+
+
+def simulate_demand(
+    sku_ids,
+    avg,
+    std,
+    days: int = 60,
+    seed: int = DEMAND_SEED,
+    workers: int = 1,
+    chunk_skus: int = 20_000,
+) -> np.ndarray:
+    """Simulated daily demand, shape (SKUs, days); row i depends only on sku_ids[i], avg[i], std[i].
+
+    Work is split into chunks of SKUs across `workers` processes; the result does not
+    depend on the split.
+    """
+    sku_ids, avg, std = np.asarray(sku_ids, dtype=object), np.asarray(avg, float), np.asarray(std, float)
+    tasks = [(seed, sku_ids[i:i + chunk_skus], avg[i:i + chunk_skus], std[i:i + chunk_skus], days)
+             for i in range(0, len(sku_ids), chunk_skus)]
+    parts = _run_parallel(_demand_paths, tasks, workers)
+    return np.concatenate(parts) if parts else np.empty((0, days))
+
+
+def simulate_daily_demand(sku_id: str, avg: float, std: float, days: int = 60, seed: int = DEMAND_SEED):
+    """Last `days` days of simulated demand for one SKU (the SKU's row of simulate_demand)."""
+    dates = pd.date_range(end=pd.Timestamp.today(), periods=days, freq="D")
+    demand = _demand_paths(seed, [sku_id], [avg], [std], days)[0]
+    return pd.DataFrame({"date": dates, "demand": demand})
@@ -0,0 +1,242 @@
+"""Chunked exports of policy results: CSV, Parquet, XLSX or JSON Lines, optionally compressed.
+
+Rows are encoded one chunk at a time, so memory stays at about one chunk whatever the
+row count. iter_export yields the encoded bytes (for streaming HTTP responses),
+write_export writes them to a file atomically, and submit_export runs a write on a
+background worker with progress and cancellation.
+
+pyarrow (Parquet, zstd) and xlsxwriter (XLSX) are imported on first use.
+"""
+import os
+import tempfile
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import filter_view
+from .policy import alloc_policy_buffers, policy_frame, policy_kernel
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "jsonl": "application/x-ndjson",
+}
+EXPORT_COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}  # file suffix of CSV / JSON Lines
+EXPORT_CHUNK_ROWS = 50_000
+XLSX_SHEET_ROWS = 1_048_575  # Excel's row limit minus the header; longer exports continue on new sheets
+
+
+def export_file_name(stem: str, fmt: str, compression: str = None) -> str:
+    """File name for an export; Parquet compresses internally and XLSX is already zipped."""
+    if fmt in ("csv", "jsonl"):
+        return f"{stem}.{fmt}{EXPORT_COMPRESSIONS[compression]}"
+    return f"{stem}.{fmt}"
+
+
+# ================= ROW CHUNKS =================
+def frame_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), chunk_rows):  # an empty frame still yields its columns
+        yield df.iloc[start:start + chunk_rows]
+
+
+def policy_chunks(
+    df_base: pd.DataFrame,
+    z: float,
+    holding_multiplier: float,
+    view_filters: dict = None,
+    rows: np.ndarray = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+):
+    """The policy frame of `df_base`, recomputed chunk by chunk into one chunk-sized buffer.
+
+    Independent of any session's policy buffers, so a background export never sees them
+    change mid-way. `rows` (boolean mask over df_base) and `view_filters` (filter_view
+    arguments) narrow each chunk. A chunk is only valid until the next one is produced.
+    """
+    b = alloc_policy_buffers(min(chunk_rows, len(df_base)))
+    for start in range(0, max(len(df_base), 1), chunk_rows):
+        part = df_base.iloc[start:start + chunk_rows]
+        chunk = policy_frame(part, policy_kernel(part, z, holding_multiplier, {k: v[:len(part)] for k, v in b.items()}))
+        if rows is not None:
+            chunk = chunk[rows[start:start + chunk_rows]]
+        if view_filters is not None:
+            chunk = filter_view(chunk, **view_filters)
+        yield chunk
+
+
+# ================= ENCODERS =================
+def _compressor(compression: str):
+    """(compress(bytes) -> bytes, flush() -> bytes) for an incrementally compressed stream."""
+    if compression is None:
+        return (lambda data: data), (lambda: b"")
+    if compression == "gzip":
+        gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        return gz.compress, gz.flush
+    if compression == "zstd":
+        import pyarrow as pa
+
+        codec = pa.Codec("zstd")  # one frame per chunk; concatenated frames are one zstd stream
+        return (lambda data: codec.compress(data, asbytes=True)), (lambda: b"")
+    raise ValueError(f"compression must be one of {list(EXPORT_COMPRESSIONS)}")
+
+
+def _iter_text(chunks, fmt: str, compression: str):
+    compress, flush = _compressor(compression)
+    first = True
+    for chunk in chunks:
+        if fmt == "csv":
+            text = chunk.to_csv(index=False, header=first)
+        else:
+            text = chunk.to_json(orient="records", lines=True, date_format="iso") if len(chunk) else ""
+        first = False
+        data = compress(text.encode())
+        if data:
+            yield data
+    data = flush()
+    if data:
+        yield data
+
+
+def _iter_parquet(chunks, compression: str):
+    import io
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    writer, empty = None, None
+    for chunk in chunks:
+        if not len(chunk):
+            empty = chunk  # an empty chunk cannot type its object columns; wait for rows
+            continue
+        if writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(sink, schema, compression=compression or "snappy")
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.getvalue()  # each chunk becomes a row group; hand its bytes on right away
+        sink.seek(0)
+        sink.truncate()
+    if writer is None and empty is not None:
+        writer = pq.ParquetWriter(sink, pa.Schema.from_pandas(empty, preserve_index=False))
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()  # footer
+
+
+def _iter_xlsx(chunks):
+    """XLSX is a zip whose directory comes last, so the workbook is built in a temp file
+    (xlsxwriter constant_memory mode keeps one row in memory) and then streamed."""
+    import xlsxwriter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.xlsx")
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        sheet, row = None, 0
+        for chunk in chunks:
+            columns = list(chunk.columns)
+            values = chunk.astype(object).where(chunk.notna(), None).to_numpy()  # NaN -> blank cell
+            for record in values:
+                if sheet is None or row > XLSX_SHEET_ROWS:
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, columns)
+                    row = 1
+                sheet.write_row(row, 0, record)
+                row += 1
+        if sheet is None:
+            workbook.add_worksheet()
+        workbook.close()
+        with open(path, "rb") as f:
+            while data := f.read(1 << 20):
+                yield data
+
+
+def iter_export(chunks, fmt: str, compression: str = None):
+    """Encoded bytes of the row chunks in `fmt`, produced incrementally."""
+    if fmt in ("csv", "jsonl"):
+        return _iter_text(chunks, fmt, compression)
+    if fmt == "parquet":
+        return _iter_parquet(chunks, compression)
+    if fmt == "xlsx":
+        return _iter_xlsx(chunks)
+    raise ValueError(f"format must be one of {list(EXPORT_FORMATS)}")
+
+
+def write_export(chunks, path: str, fmt: str, compression: str = None, progress=None, cancel=None) -> int:
+    """Write the chunks to `path` (via a temp file, renamed when complete); returns the row count.
+
+    `progress(rows_done)` is called after each chunk. When the `cancel` event is set, the
+    write stops at the next chunk, the temp file is removed and None is returned.
+    """
+    done = 0
+
+    def counted():
+        nonlocal done
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                return
+            yield chunk
+            done += len(chunk)
+            if progress is not None:
+                progress(done)
+
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            for data in iter_export(counted(), fmt, compression):
+                f.write(data)
+        if cancel is not None and cancel.is_set():
+            os.remove(tmp)
+            return None
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return done
+
+
+# ================= BACKGROUND EXPORTS =================
+def new_export_worker() -> ThreadPoolExecutor:
+    """The background export thread (keep one per process); jobs run one at a time."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-export")
+
+
+def submit_export(worker: ThreadPoolExecutor, chunks, path: str, fmt: str, compression: str = None,
+                  total_rows: int = None) -> dict:
+    """Queue write_export on the worker; the returned job dict tracks its progress."""
+    job = {
+        "id": uuid.uuid4().hex,  # paths repeat (per-second names, auto exports); widget keys must not
+        "path": path,
+        "format": fmt,
+        "compression": compression,
+        "total_rows": total_rows,
+        "rows_done": 0,
+        "cancel": threading.Event(),
+    }
+
+    def progress(rows_done: int):
+        job["rows_done"] = rows_done
+
+    job["future"] = worker.submit(write_export, chunks, path, fmt, compression, progress, job["cancel"])
+    return job
+
+
+def export_status(job: dict) -> str:
+    """"queued", "running", "done", "cancelled" or "failed"."""
+    future = job["future"]
+    if not future.done():
+        return "running" if future.running() else "queued"
+    if future.cancelled() or (future.exception() is None and future.result() is None):
+        return "cancelled"
+    return "failed" if future.exception() is not None else "done"
+
+
+def cancel_export(job: dict):
+    """Drop a queued job; a running one stops at its next chunk."""
+    job["cancel"].set()
+    job["future"].cancel()
@@ -0,0 +1,62 @@
+"""Numba-compiled fused policy kernel (optional; needs `pip install numba`).
+
+One parallel pass per SKU computes holding_cost_adj, EOQ, safety stock, ROP, the risk
+code and the recommended qty; with `stochastic`, lead time is a float mean with a std.
+The arithmetic follows apply_policy's operation order and rounding (rint = round half
+to even), and fastmath stays off, so the outputs are bit-identical to the NumPy kernel. Imported lazily by policy.load_fused_kernel().
+
+Streamlit runs each session's script in its own thread. Numba's built-in workqueue
+threading layer is used (no TBB/OpenMP runtime needed), and since it does not allow
+concurrent launches, run_fused_policy() serializes them with a lock; each launch
+already uses every core.
+"""
+import threading
+
+import numpy as np
+from numba import config, njit, prange
+
+config.THREADING_LAYER = "workqueue"
+_launch_lock = threading.Lock()
+
+
+@njit(parallel=True, cache=True)
+def fused_policy(
+    holding_cost, order_cost, sales, demand_std, lead_time, lead_time_std, stock, days_of_cover,
+    z, holding_mult, stochastic,
+    out_holding_cost_adj, out_eoq, out_safety_stock, out_rop, out_risk_code, out_recommended,
+):
+    for i in prange(sales.shape[0]):
+        hc_adj = holding_cost[i] * holding_mult
+        eoq = np.sqrt(((sales[i] * 365.0) * 2.0) * order_cost[i] / hc_adj)
+        if stochastic:
+            sales_var = sales[i] * lead_time_std[i]
+            lt_var = (demand_std[i] * demand_std[i]) * lead_time[i] + sales_var * sales_var
+            safety_stock = np.int64(np.rint(np.sqrt(lt_var) * z))
+        else:
+            safety_stock = np.int64(np.rint((demand_std[i] * z) * np.sqrt(np.float64(lead_time[i]))))
+        rop = np.int64(np.rint(sales[i] * lead_time[i] + safety_stock))
+
+        if stock[i] <= 0:
+            code = 0
+        elif stock[i] < rop:
+            code = 1
+        elif days_of_cover[i] > 7:
+            code = 2
+        else:
+            code = 3
+
+        recommended = 0
+        if stock[i] < rop:
+            recommended = max(np.int64(np.rint(eoq)), rop - stock[i])
+
+        out_holding_cost_adj[i] = hc_adj
+        out_eoq[i] = eoq
+        out_safety_stock[i] = safety_stock
+        out_rop[i] = rop
+        out_risk_code[i] = code
+        out_recommended[i] = recommended
+
+
+def run_fused_policy(*args):
+    with _launch_lock:
+        fused_policy(*args)
@@ -0,0 +1,201 @@
+"""Order planning: budget-constrained order optimizer and joint replenishment POs."""
+import numpy as np
+import pandas as pd
+
+from .policy import lead_time_demand_std
+
+
+# ================= REPLENISHMENT PLAN =================
+def replenishment_plan(df_f: pd.DataFrame, location_mode: bool = False) -> pd.DataFrame:
+    """Stock-out / Below ROP lines of the view, largest recommended qty first."""
+    plan_df = df_f[df_f["risk_flag"].isin(["Stock-out", "Below ROP"])].copy()
+    return plan_df[
+        [
+            "sku_id", "category", "supplier",
+        ] + (["location"] if location_mode else []) + [
+            "current_stock", "rop", "eoq",
+            "recommended_order_qty", "days_of_cover",
+            "avg_daily_sales", "lead_time_days",
+            "unit_cost"
+        ]
+    ].sort_values("recommended_order_qty", ascending=False)
+
+
+# ================= BUDGET OPTIMIZER =================
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz-Stegun erf approximation, |error| < 1.5e-7)."""
+    t = 1.0 / (1.0 + 0.3275911 * np.abs(x) / np.sqrt(2))
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-(x ** 2) / 2)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def expected_shortage(stock: np.ndarray, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+    """Expected units short when `stock` has to cover normally distributed demand."""
+    std = np.maximum(std, 1e-9)
+    k = (stock - mean) / std
+    pdf = np.exp(-(k ** 2) / 2) / np.sqrt(2 * np.pi)
+    return std * (pdf - k * (1 - _normal_cdf(k)))
+
+
+def _grouped_cummin(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Running minimum of `values` within each group, in array order."""
+    return pd.Series(values).groupby(groups).cummin().to_numpy()
+
+
+def optimize_orders(
+    df_lines: pd.DataFrame,
+    budget: float,
+    supplier_caps: dict = None,
+    moq: int = 0,
+    case_pack: int = 1,
+    max_rounds: int = 8,
+    steps: int = 8,
+) -> pd.DataFrame:
+    """Choose order quantities that avoid the most stock-out cost within a purchasing budget.
+
+    Each line may order nothing, or between its MOQ and its recommended quantity, in
+    whole case packs. That range is cut into a first step (the MOQ, rounded up to case
+    packs) and up to `steps` more case-pack increments. Every step is scored by the
+    stock-out cost it avoids per dollar. Because expected shortage is convex in stock,
+    a line's later steps never score higher than its earlier ones. Steps are funded
+    greedily across all lines, a line's steps in order. Later rounds back-fill leftover
+    budget and supplier caps with steps that still fit.
+    """
+    df = df_lines.copy()
+    pack = max(int(case_pack), 1)
+
+    rec = df["recommended_order_qty"].to_numpy()
+    q_min = np.ceil(max(int(moq), 1) / pack) * pack
+    q_max = np.where(rec > 0, np.maximum(np.ceil(rec / pack) * pack, q_min), 0)
+
+    # Steps per line: [0, q_min], then increments of a whole number of packs up to q_max
+    inc = np.maximum(np.ceil((q_max - q_min) / steps / pack), 1) * pack
+    n_steps = np.where(q_max > 0, 1 + np.ceil(np.maximum(q_max - q_min, 0) / inc), 0).astype(int)
+    line = np.repeat(np.arange(len(df)), n_steps)
+    k = np.arange(len(line)) - np.repeat(np.cumsum(n_steps) - n_steps, n_steps)  # step number within the line
+    upto = np.minimum(q_min + k * inc[line], q_max[line])
+    qty_before = np.where(k > 0, np.minimum(q_min + (k - 1) * inc[line], q_max[line]), 0)
+    step_qty = upto - qty_before
+
+    # Demand over the replenishment lead time, with and without each step arriving
+    lt_mean = (df["avg_daily_sales"] * df["lead_time_days"]).to_numpy()
+    lt_std = np.asarray(lead_time_demand_std(df), dtype=float)
+    stock = df["current_stock"].to_numpy()
+    margin = (df["unit_price"] - df["unit_cost"]).to_numpy()
+    unit_cost = df["unit_cost"].to_numpy()
+
+    short_before = expected_shortage(stock[line] + qty_before, lt_mean[line], lt_std[line])
+    short_after = expected_shortage(stock[line] + upto, lt_mean[line], lt_std[line])
+    step_cost = step_qty * unit_cost[line]
+    score = np.where(step_cost > 0, (short_before - short_after) * margin[line] / np.maximum(step_cost, 1e-9),
+                     -np.inf)
+    score = _grouped_cummin(score, line)  # guard the convexity order against rounding noise
+    rank = np.argsort(-score, kind="stable")  # steps are laid out line by line: ties keep step order
+
+    supplier_codes, supplier_names = pd.factorize(df["supplier"])
+    caps = np.full(len(supplier_names), np.inf)
+    for sup, cap in (supplier_caps or {}).items():
+        if sup in supplier_names and cap is not None and cap > 0:
+            caps[supplier_names.get_loc(sup)] = cap
+    step_sup = supplier_codes[line]
+
+    funded = np.zeros(len(line), dtype=bool)
+    spent_total = 0.0
+    spent_sup = np.zeros(len(supplier_names))
+    candidates = rank[step_cost[rank] > 0]
+
+    for _ in range(max_rounds):
+        if len(candidates) == 0:
+            break
+        cost = step_cost[candidates]
+        codes = step_sup[candidates]
+
+        # Supplier caps: running spend per supplier along the ranking
+        sup_cum = pd.Series(cost).groupby(codes).cumsum().to_numpy() + spent_sup[codes]
+        ok_sup = sup_cum <= caps[codes]
+
+        # Global budget over the steps that passed their supplier cap
+        tot_cum = np.cumsum(np.where(ok_sup, cost, 0)) + spent_total
+        take = ok_sup & (tot_cum <= budget)
+        # A step needs every earlier step of its line; dropping steps only frees budget
+        take = _grouped_cummin(take, line[candidates]).astype(bool)
+        if not take.any():
+            break
+
+        chosen = candidates[take]
+        funded[chosen] = True
+        spent_total += step_cost[chosen].sum()
+        np.add.at(spent_sup, step_sup[chosen], step_cost[chosen])
+
+        # Back-fill: unfunded steps that still fit both remaining budgets, in line order
+        rest = candidates[~take]
+        fits = (step_cost[rest] <= budget - spent_total) & (
+            step_cost[rest] <= caps[step_sup[rest]] - spent_sup[step_sup[rest]]
+        )
+        candidates = rest[_grouped_cummin(fits, line[rest]).astype(bool)]
+
+    order_qty = np.bincount(line, weights=np.where(funded, step_qty, 0), minlength=len(df)).astype(int)
+    short_without = expected_shortage(stock, lt_mean, lt_std)
+    short_with = expected_shortage(stock + order_qty, lt_mean, lt_std)
+
+    df["order_qty"] = order_qty
+    df["line_cost"] = order_qty * unit_cost
+    df["expected_shortage_units"] = short_with
+    df["avoided_stockout_cost"] = (short_without - short_with) * margin
+    df["funded"] = order_qty > 0
+    return df
+
+
+# ================= JOINT REPLENISHMENT =================
+def joint_replenishment(df_lines: pd.DataFrame, po_cost: float = 150.0):
+    """Consolidate below-ROP SKUs into one PO per supplier on a shared order cycle.
+
+    Each supplier's cycle is T = sqrt(2 * (po_cost + sum(order_cost)) / sum(annual_demand * h)),
+    the classic joint replenishment solution; every SKU then orders T worth of demand,
+    but never less than its gap to ROP. Returns (po_lines, po_summary).
+    """
+    lines = df_lines[df_lines["current_stock"] < df_lines["rop"]]
+    codes, suppliers = pd.factorize(lines["supplier"], sort=True)
+    n_sup = len(suppliers)
+
+    annual_demand = lines["avg_daily_sales"].to_numpy() * 365
+    h = lines["holding_cost_adj"].to_numpy()
+    minor_cost = lines["order_cost"].to_numpy()
+    dh = annual_demand * h
+
+    # Grouped sums over supplier codes
+    n_lines = np.bincount(codes, minlength=n_sup)
+    sum_minor = np.bincount(codes, weights=minor_cost, minlength=n_sup)
+    sum_dh = np.bincount(codes, weights=dh, minlength=n_sup)
+
+    cycle_years = np.sqrt(2 * (po_cost + sum_minor) / np.maximum(sum_dh, 1e-9))
+    joint_cost = np.sqrt(2 * (po_cost + sum_minor) * sum_dh)
+    independent_cost = np.bincount(
+        codes, weights=np.sqrt(2 * annual_demand * (po_cost + minor_cost) * h), minlength=n_sup
+    )
+
+    gap = (lines["rop"] - lines["current_stock"]).to_numpy()
+    po_qty = np.maximum(np.ceil(annual_demand * cycle_years[codes]), gap).astype(int)
+    po_value = po_qty * lines["unit_cost"].to_numpy()
+
+    id_cols = ["sku_id", "category", "supplier"] + (["location"] if "location" in lines else [])
+    po_lines = lines[id_cols + ["current_stock", "rop", "unit_cost"]].copy()
+    po_lines["cycle_days"] = np.round(cycle_years[codes] * 365, 1)
+    po_lines["po_qty"] = po_qty
+    po_lines["po_value"] = np.round(po_value, 2)
+    po_lines = po_lines.sort_values(["supplier", "po_value"], ascending=[True, False])
+
+    po_summary = pd.DataFrame({
+        "supplier": suppliers,
+        "po_lines": n_lines,
+        "cycle_days": np.round(cycle_years * 365, 1),
+        "po_qty": np.bincount(codes, weights=po_qty, minlength=n_sup).astype(int),
+        "po_value": np.round(np.bincount(codes, weights=po_value, minlength=n_sup), 2),
+        "annual_cost_joint": np.round(joint_cost, 2),
+        "annual_cost_independent": np.round(independent_cost, 2),
+    })
+    po_summary["annual_savings"] = (
+        po_summary["annual_cost_independent"] - po_summary["annual_cost_joint"]
+    ).round(2)
+    return po_lines, po_summary.sort_values("po_value", ascending=False, ignore_index=True)
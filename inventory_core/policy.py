@@ -0,0 +1,390 @@
+"""Replenishment policy: EOQ, safety stock, ROP, risk codes and recommended order qty."""
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Map service level to z-score (approx)
+Z_MAP = {0.90: 1.28, 0.95: 1.65, 0.98: 2.05, 0.99: 2.33}
+
+RISK_FLAGS = np.array(["Stock-out", "Below ROP", "Overstock", "Healthy"])  # risk code -> label
+
+POLICY_COLUMNS = ["holding_cost_adj", "eoq", "safety_stock", "rop", "risk_flag", "recommended_order_qty"]
+
+
+def alloc_policy_buffers(n: int) -> dict:
+    """Output arrays for policy_kernel, plus two scratch arrays; reuse them across reruns."""
+    return {
+        "holding_cost_adj": np.empty(n),
+        "eoq": np.empty(n),
+        "safety_stock": np.empty(n, dtype=np.int64),
+        "rop": np.empty(n, dtype=np.int64),
+        "risk_code": np.empty(n, dtype=np.int8),
+        "recommended_order_qty": np.empty(n, dtype=np.int64),
+        "_f64": np.empty(n),
+        "_mask": np.empty(n, dtype=bool),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_fused_kernel():
+    """The Numba fused kernel, or None without Numba (or with INVENTORY_JIT=0)."""
+    if os.environ.get("INVENTORY_JIT", "1") == "0":
+        return None
+    try:
+        from .jit import run_fused_policy
+    except ImportError:
+        return None
+    return run_fused_policy
+
+
+def stock_units(df_base: pd.DataFrame) -> np.ndarray:
+    """`current_stock` as int64 units for the policy engines (no copy when already int64).
+
+    Float or nullable stock holding whole numbers is converted; a fractional, missing or
+    infinite stock raises ValueError rather than being truncated.
+    """
+    stock = df_base["current_stock"].to_numpy()
+    if stock.dtype.kind in "iub":
+        return stock.astype(np.int64, copy=False)
+    values = df_base["current_stock"].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        units = values.astype(np.int64)
+    if not (np.isfinite(values) & (units == values)).all():
+        raise ValueError("current_stock must hold whole units")
+    return units
+
+
+def policy_kernel(
+    df_base: pd.DataFrame,
+    z: float,
+    holding_multiplier: float,
+    buffers: dict = None,
+    engine: str = "auto",
+) -> dict:
+    """EOQ, safety stock, ROP, risk code and recommended qty written into preallocated arrays.
+
+    Uses the fused, parallel Numba kernel when available; otherwise every step is an
+    in-place ufunc (out=) over the base columns. Both follow the operation order of the
+    original pandas expressions, so results are bit-identical to them.
+    `engine` is "auto", "jit" (raises without Numba) or "numpy".
+
+    With a `lead_time_std` column (days), lead time is stochastic and `lead_time_days` is its
+    mean: safety stock covers the combined variance of demand and lead time,
+    z * sqrt(lead_time * demand_std^2 + avg_daily_sales^2 * lead_time_std^2).
+    """
+    n = len(df_base)
+    if buffers is None or len(buffers["eoq"]) != n:
+        buffers = alloc_policy_buffers(n)
+    b = buffers
+
+    stochastic = "lead_time_std" in df_base.columns
+    stock = stock_units(df_base)
+    lead_time = df_base["lead_time_days"].to_numpy()
+    if lead_time.dtype.kind != "f":
+        lead_time = lead_time.astype(np.int64, copy=False)  # whole days: the int specialization
+
+    fused = load_fused_kernel() if engine != "numpy" else None
+    if engine == "jit" and fused is None:
+        raise ImportError("engine='jit' needs Numba: pip install numba")
+    if fused is not None:
+        fused(
+            np.ascontiguousarray(df_base["holding_cost"].to_numpy(), dtype=np.float64),
+            np.ascontiguousarray(df_base["order_cost"].to_numpy(), dtype=np.float64),
+            np.ascontiguousarray(df_base["avg_daily_sales"].to_numpy(), dtype=np.float64),
+            np.ascontiguousarray(df_base["demand_std"].to_numpy(), dtype=np.float64),
+            np.ascontiguousarray(lead_time),
+            np.ascontiguousarray(df_base["lead_time_std"].to_numpy() if stochastic else np.empty(0),
+                                 dtype=np.float64),
+            np.ascontiguousarray(stock),
+            np.ascontiguousarray(df_base["days_of_cover"].to_numpy(), dtype=np.float64),
+            float(z), float(holding_multiplier), stochastic,
+            b["holding_cost_adj"], b["eoq"], b["safety_stock"], b["rop"],
+            b["risk_code"], b["recommended_order_qty"],
+        )
+        return buffers
+
+    f64, mask = b["_f64"], b["_mask"]
+
+    sales = df_base["avg_daily_sales"].to_numpy()
+
+    np.multiply(df_base["holding_cost"].to_numpy(), holding_multiplier, out=b["holding_cost_adj"])
+
+    # eoq = sqrt((2 * annual_demand * order_cost) / holding_cost_adj)
+    eoq = b["eoq"]
+    np.multiply(sales, 365, out=eoq)
+    np.multiply(eoq, 2, out=eoq)
+    np.multiply(eoq, df_base["order_cost"].to_numpy(), out=eoq)
+    np.divide(eoq, b["holding_cost_adj"], out=eoq)
+    np.sqrt(eoq, out=eoq)
+
+    scratch = b["rop"].view(np.float64)  # rop is written last; until then it is float scratch
+    if stochastic:
+        # safety_stock = round(z * sqrt(lead_time * demand_std^2 + (avg_daily_sales * lead_time_std)^2))
+        demand_std = df_base["demand_std"].to_numpy()
+        np.multiply(demand_std, demand_std, out=f64)
+        np.multiply(f64, lead_time, out=f64)
+        np.multiply(sales, df_base["lead_time_std"].to_numpy(), out=scratch)
+        np.multiply(scratch, scratch, out=scratch)
+        np.add(f64, scratch, out=f64)
+        np.sqrt(f64, out=f64)
+        np.multiply(f64, z, out=f64)
+    else:
+        # safety_stock = round(z * demand_std * sqrt(lead_time))
+        np.multiply(df_base["demand_std"].to_numpy(), z, out=f64)
+        np.multiply(f64, np.sqrt(lead_time, out=scratch), out=f64)
+    np.round(f64, out=f64)
+    np.copyto(b["safety_stock"], f64, casting="unsafe")
+
+    # rop = round(avg_daily_sales * lead_time + safety_stock)
+    np.multiply(sales, lead_time, out=f64)
+    np.add(f64, b["safety_stock"], out=f64)
+    np.round(f64, out=f64)
+    np.copyto(b["rop"], f64, casting="unsafe")
+
+    # risk code, lowest-priority rule first so higher-priority rules overwrite it
+    code = b["risk_code"]
+    code.fill(3)
+    np.greater(df_base["days_of_cover"].to_numpy(), 7, out=mask)
+    np.copyto(code, 2, where=mask)
+    np.less(stock, b["rop"], out=mask)
+    np.copyto(code, 1, where=mask)
+    np.less_equal(stock, 0, out=mask)
+    np.copyto(code, 0, where=mask)
+
+    # recommended = max(round(eoq), rop - stock) where stock < rop, else 0
+    rec = b["recommended_order_qty"]
+    np.round(eoq, out=f64)
+    np.copyto(rec, f64, casting="unsafe")
+    gap = np.subtract(b["rop"], stock, out=f64.view(np.int64))  # f64 is free again
+    np.maximum(rec, gap, out=rec)
+    np.greater_equal(stock, b["rop"], out=mask)
+    np.copyto(rec, 0, where=mask)
+
+    return buffers
+
+
+def apply_policy(df_base: pd.DataFrame, z: float, holding_multiplier: float, buffers: dict = None) -> pd.DataFrame:
+    """Calculate EOQ, safety stock, ROP, risk flags under a given policy.
+
+    The result shares the base columns and wraps the kernel's output arrays without
+    copying; pass the same `buffers` on every rerun to reuse them.
+    """
+    return policy_frame(df_base, policy_kernel(df_base, z, holding_multiplier, buffers))
+
+
+def policy_frame(df_base: pd.DataFrame, b: dict) -> pd.DataFrame:
+    """Base columns + policy_kernel output arrays as one frame (no copies)."""
+    columns = {col: df_base[col] for col in df_base.columns}
+    for col in POLICY_COLUMNS:
+        columns[col] = b[col] if col != "risk_flag" else RISK_FLAGS.astype(object)[b["risk_code"]]
+    return pd.DataFrame(columns, index=df_base.index, copy=False)
+
+
+# ================= RISK TRANSITIONS =================
+ALERT_LOG_PATH = "inventory_risk_alerts.csv"
+RISK_MONITOR_STATES = 8  # policy states whose last risk codes are kept (int8 per SKU each)
+
+
+def risk_transitions(
+    sku_ids: np.ndarray,
+    old_codes: np.ndarray,
+    new_codes: np.ndarray,
+    positions: np.ndarray = None,
+    at: pd.Timestamp = None,
+) -> pd.DataFrame:
+    """SKUs whose risk code changed, as (sku_id, old_flag, new_flag, timestamp) rows.
+
+    Codes are int8 risk codes (see RISK_FLAGS). With `positions`, the codes cover only
+    those rows of `sku_ids`.
+    """
+    changed = np.flatnonzero(old_codes != new_codes)
+    rows = changed if positions is None else np.asarray(positions)[changed]
+    return pd.DataFrame({
+        "sku_id": sku_ids[rows],
+        "old_flag": RISK_FLAGS[old_codes[changed]],
+        "new_flag": RISK_FLAGS[new_codes[changed]],
+        "timestamp": at if at is not None else pd.Timestamp.now().floor("s"),
+    })
+
+
+def new_risk_monitor(max_states: int = RISK_MONITOR_STATES) -> dict:
+    """Last risk codes per policy state and the alerts they raised (keep one per process)."""
+    return {"lock": threading.Lock(), "states": OrderedDict(), "max_states": max_states, "alerts": {}}
+
+
+def update_risk_monitor(monitor: dict, policy_state: tuple, version, sku_ids, codes: np.ndarray) -> pd.DataFrame:
+    """Risk transitions since the catalog version last seen under `policy_state`.
+
+    Codes are only compared under the same policy state (z, holding multiplier, lead-time
+    mode, ...) and only when the catalog version changed: a slider move alone never
+    raises alerts, and a new catalog is reported once per process, however many sessions
+    see it. SKUs are matched by id across versions. Repeat calls for a version already
+    seen cost a dict lookup. The recent alerts of each state are kept in monitor["alerts"].
+    """
+    with monitor["lock"]:
+        states = monitor["states"]
+        last = states.get(policy_state)
+        if last is not None and last[0] == version:
+            states.move_to_end(policy_state)
+            return risk_transitions(np.empty(0, dtype=object), codes[:0], codes[:0])
+        states[policy_state] = (version, pd.Index(sku_ids), codes.copy())
+        states.move_to_end(policy_state)
+        while len(states) > monitor["max_states"]:
+            evicted, _ = states.popitem(last=False)
+            monitor["alerts"].pop(evicted, None)
+        if last is None:
+            return risk_transitions(np.empty(0, dtype=object), codes[:0], codes[:0])
+
+        _, old_ids, old_codes = last
+        new_ids = np.asarray(sku_ids, dtype=object)
+        pos = pd.Index(old_ids).get_indexer(new_ids)
+        matched = np.flatnonzero(pos >= 0)  # SKUs new in this version have no old flag
+        transitions = risk_transitions(new_ids, old_codes[pos[matched]], codes[matched], matched)
+        _record_alerts(monitor, policy_state, transitions)
+        return transitions
+
+
+def update_risk_codes(monitor: dict, policy_state: tuple, version, positions, codes: np.ndarray) -> pd.DataFrame:
+    """Risk transitions of a stock update that touched only the rows at `positions`.
+
+    The incremental counterpart of update_risk_monitor: `version` is the catalog after
+    the update, which must keep the SKU order of the version last seen under
+    `policy_state`, and `codes` are the new risk codes of just those rows (e.g.
+    policy_kernel(df_base.iloc[positions], ...)["risk_code"]). Costs O(len(positions)).
+    Nothing is compared while the state is untracked; the next full update seeds it.
+    """
+    positions = np.asarray(positions, dtype=np.intp)
+    with monitor["lock"]:
+        states = monitor["states"]
+        last = states.get(policy_state)
+        if last is None or last[0] == version:
+            return risk_transitions(np.empty(0, dtype=object), codes[:0], codes[:0])
+        _, sku_ids, old_codes = last
+        transitions = risk_transitions(sku_ids, old_codes[positions], codes, positions)
+        old_codes[positions] = codes  # the monitor's own copy
+        states[policy_state] = (version, sku_ids, old_codes)
+        states.move_to_end(policy_state)
+        _record_alerts(monitor, policy_state, transitions)
+        return transitions
+
+
+def _record_alerts(monitor: dict, policy_state: tuple, transitions: pd.DataFrame):
+    if len(transitions):
+        total, recent = monitor["alerts"].get(policy_state, (0, None))
+        monitor["alerts"][policy_state] = (
+            total + len(transitions), pd.concat([transitions, recent], ignore_index=True).head(500)
+        )
+
+
+def log_risk_alerts(transitions: pd.DataFrame, path: str = ALERT_LOG_PATH):
+    """Append transitions to the CSV alert log (header written once)."""
+    if len(transitions):
+        transitions.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+# ================= LEAD-TIME VARIABILITY =================
+def lead_time_demand_std(df: pd.DataFrame) -> np.ndarray:
+    """Std of demand over the replenishment lead time, per row.
+
+    demand_std * sqrt(lead_time) for fixed lead times; with a `lead_time_std` column,
+    sqrt(lead_time * demand_std^2 + avg_daily_sales^2 * lead_time_std^2).
+    """
+    lead_time = df["lead_time_days"].to_numpy()
+    demand_std = df["demand_std"].to_numpy()
+    if "lead_time_std" not in df.columns:
+        return demand_std * np.sqrt(lead_time)
+    sales_var = df["avg_daily_sales"].to_numpy() * df["lead_time_std"].to_numpy()
+    return np.sqrt(demand_std * demand_std * lead_time + sales_var * sales_var)
+
+
+def bootstrap_lead_time(keys, lead_times, n_boot: int = 200, seed: int = 0) -> pd.DataFrame:
+    """Bootstrap mean and std of lead-time samples per key (supplier, SKU, ...).
+
+    Every resample redraws each key's receipts with replacement from that key's own
+    history; the per-resample means and variances are averaged over `n_boot` resamples.
+    All keys are resampled together as (n_boot, n_receipts) arrays, so the cost depends
+    on the receipts history, not on the catalog.
+    """
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind="stable")
+    uniq, start, count = np.unique(keys[order], return_index=True, return_counts=True)
+    samples = np.asarray(lead_times, dtype=np.float64)[order]
+
+    rng = np.random.default_rng(seed)
+    group_start = np.repeat(start, count)
+    group_count = np.repeat(count, count)
+    draws = samples[group_start + (rng.random((n_boot, len(samples))) * group_count).astype(np.int64)]
+
+    total = np.add.reduceat(draws, start, axis=1)
+    mean = total / count
+    var = (np.add.reduceat(draws * draws, start, axis=1) - total * mean) / np.maximum(count - 1, 1)
+    return pd.DataFrame(
+        {
+            "lead_time_mean": mean.mean(axis=0),
+            "lead_time_std": np.sqrt(np.clip(var, 0, None).mean(axis=0)),
+            "receipts": count,
+        },
+        index=pd.Index(uniq, name="key"),
+    )
+
+
+def with_lead_time_stats(df_base: pd.DataFrame, ratio_stats: pd.DataFrame, by: str = "supplier") -> pd.DataFrame:
+    """Base frame with a stochastic lead time per row: `lead_time_days` becomes the mean, plus
+    a `lead_time_std` column.
+
+    `ratio_stats` holds actual / planned lead-time stats per `by` key (as returned by
+    bootstrap_lead_time, or supplier_lead_time_profile); they scale each row's planned
+    lead time. Keys without stats keep their planned lead time, with zero std.
+    """
+    codes, uniques = pd.factorize(df_base[by])  # match the few distinct keys, then gather per row
+    pos = np.where(codes >= 0, ratio_stats.index.get_indexer(uniques)[codes], -1)
+    known = pos >= 0
+    mean_ratio = np.where(known, ratio_stats["lead_time_mean"].to_numpy()[pos], 1.0)
+    std_ratio = np.where(known, ratio_stats["lead_time_std"].to_numpy()[pos], 0.0)
+    planned = df_base["lead_time_days"].to_numpy()
+    columns = {col: df_base[col] for col in df_base.columns}  # shared, as in policy_frame
+    columns.update(lead_time_days=planned * mean_ratio, lead_time_std=planned * std_ratio)
+    df = pd.DataFrame(columns, index=df_base.index, copy=False)
+    df.attrs.update(df_base.attrs)
+    return df
+
+
+# ================= SCENARIOS (STACKED POLICY) =================
+def apply_policy_scenarios(df_base: pd.DataFrame, z_values, holding_mults) -> dict:
+    """Evaluate K policies at once as (K, n_sku) arrays over the shared base columns.
+
+    Same formulas and rounding as apply_policy, broadcast over a leading scenario axis;
+    the base catalog itself is never copied per scenario.
+    """
+    z = np.asarray(z_values, dtype=float)[:, None]
+    mult = np.asarray(holding_mults, dtype=float)[:, None]
+
+    sales = df_base["avg_daily_sales"].to_numpy()
+    lead_time = df_base["lead_time_days"].to_numpy()
+    stock = stock_units(df_base)
+
+    annual_demand = sales * 365
+    eoq = np.sqrt((2 * annual_demand * df_base["order_cost"].to_numpy()) / (df_base["holding_cost"].to_numpy() * mult))
+    if "lead_time_std" in df_base.columns:
+        safety_stock = np.round(z * lead_time_demand_std(df_base)).astype(int)
+    else:
+        safety_stock = np.round(z * df_base["demand_std"].to_numpy() * np.sqrt(lead_time)).astype(int)
+    rop = np.round(sales * lead_time + safety_stock).astype(int)
+
+    risk_code = np.select(
+        [
+            np.broadcast_to(stock <= 0, rop.shape),
+            stock < rop,
+            np.broadcast_to(df_base["days_of_cover"].to_numpy() > 7, rop.shape),
+        ],
+        [0, 1, 2],
+        default=3
+    ).astype(np.int8)
+
+    recommended = np.where(stock < rop, np.maximum(np.round(eoq).astype(int), rop - stock), 0)
+    return {"eoq": eoq, "safety_stock": safety_stock, "rop": rop, "risk_code": risk_code,
+            "recommended_order_qty": recommended}
@@ -0,0 +1,126 @@
+"""Speculative background computation of neighbouring policy states.
+
+After a rerun, a background worker computes the policy for the neighbouring sidebar
+states (adjacent service level, holding cost +/- one slider step) into an LRU shared by
+all sessions and bounded by bytes, so the next slider step is usually a cache hit.
+Each queued state remembers the sessions that asked for it; a session's rerun only
+withdraws its own requests, and a state nobody wants any more is dropped.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .policy import Z_MAP, alloc_policy_buffers, policy_kernel
+
+PREFETCH_CACHE_BYTES = 256 * 2**20  # ~6 network policy states of a 1M-SKU catalog
+PREFETCH_CHUNK_ROWS = 250_000
+PREFETCH_BYTES_PER_ROW = sum(  # cached outputs of one policy state, scratch arrays excluded
+    v.itemsize for k, v in alloc_policy_buffers(0).items() if not k.startswith("_")
+)
+HOLDING_MULT_STEP = 0.05
+HOLDING_MULT_RANGE = (0.8, 1.2)
+
+
+def new_policy_prefetcher(max_bytes: int = PREFETCH_CACHE_BYTES) -> dict:
+    """One speculative worker thread and its byte-bounded result cache (keep one per process)."""
+    return {
+        "executor": ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-prefetch"),
+        "cache": OrderedDict(),  # (scope, n_rows, z, holding_mult) -> policy buffers
+        "cache_bytes": 0,
+        "max_bytes": max_bytes,
+        "lock": threading.Lock(),
+        "pending": {},  # key -> {"future", "sessions": sessions still wanting it}
+    }
+
+
+def neighbour_policies(service_level: float, holding_mult: float) -> list:
+    """(service_level, holding_mult) states one sidebar step away."""
+    levels = list(Z_MAP)
+    i = levels.index(service_level)
+    states = [(levels[j], holding_mult) for j in (i - 1, i + 1) if 0 <= j < len(levels)]
+    for step in (-HOLDING_MULT_STEP, HOLDING_MULT_STEP):
+        mult = round(holding_mult + step, 2)
+        if HOLDING_MULT_RANGE[0] <= mult <= HOLDING_MULT_RANGE[1]:
+            states.append((service_level, mult))
+    return states
+
+
+def cancel_prefetch(prefetcher: dict, session=None):
+    """Withdraw `session`'s speculative requests; a state no session wants any more is
+    dropped from the queue, or stops at its next chunk boundary when already running."""
+    with prefetcher["lock"]:
+        for key, job in list(prefetcher["pending"].items()):
+            job["sessions"].discard(session)
+            if not job["sessions"] and job["future"].cancel():
+                del prefetcher["pending"][key]
+
+
+def cached_policy(prefetcher: dict, key: tuple) -> dict:
+    """Prefetched policy buffers for `key` (read-only, shared), or None."""
+    with prefetcher["lock"]:
+        b = prefetcher["cache"].get(key)
+        if b is not None:
+            prefetcher["cache"].move_to_end(key)
+        return b
+
+
+def _buffers_bytes(b: dict) -> int:
+    return sum(v.nbytes for v in b.values())
+
+
+def _prefetch_policy(prefetcher: dict, df_base: pd.DataFrame, key: tuple, job: dict):
+    try:
+        _, n, z, holding_mult = key
+        if n * PREFETCH_BYTES_PER_ROW > prefetcher["max_bytes"]:
+            return  # would evict the whole cache and still not fit
+        b = alloc_policy_buffers(n)
+        for start in range(0, n, PREFETCH_CHUNK_ROWS):
+            if not job["sessions"]:
+                return  # every session that asked moved on; give the CPU back to them
+            stop = min(start + PREFETCH_CHUNK_ROWS, n)
+            policy_kernel(df_base.iloc[start:stop], z, holding_mult, {k: v[start:stop] for k, v in b.items()})
+        del b["_f64"], b["_mask"]
+
+        with prefetcher["lock"]:
+            cache = prefetcher["cache"]
+            if key not in cache:
+                cache[key] = b
+                prefetcher["cache_bytes"] += _buffers_bytes(b)
+            cache.move_to_end(key)
+            while prefetcher["cache_bytes"] > prefetcher["max_bytes"]:
+                _, evicted = cache.popitem(last=False)
+                prefetcher["cache_bytes"] -= _buffers_bytes(evicted)
+    finally:
+        with prefetcher["lock"]:
+            if prefetcher["pending"].get(key) is job:
+                del prefetcher["pending"][key]
+
+
+def schedule_prefetch(prefetcher: dict, bases: dict, service_level: float, holding_mult: float, session=None):
+    """Queue the neighbouring policy states of every base frame ({scope: df_base}) for `session`.
+
+    Scopes are taken in order, every neighbour of one before the next scope, and only
+    while the states asked for fit in the cache together: a state that would not fit
+    is skipped rather than computed and then evicted by its own siblings.
+    """
+    neighbours = neighbour_policies(service_level, holding_mult)
+    budget = prefetcher["max_bytes"]
+    with prefetcher["lock"]:
+        for scope, df_base in bases.items():
+            state_bytes = len(df_base) * PREFETCH_BYTES_PER_ROW
+            for sl, mult in neighbours:
+                if state_bytes > budget:
+                    break  # and try the next (smaller) scope
+                budget -= state_bytes
+                key = (scope, len(df_base), Z_MAP[sl], mult)
+                if key in prefetcher["cache"]:
+                    continue
+                job = prefetcher["pending"].get(key)
+                if job is not None and job["sessions"]:
+                    job["sessions"].add(session)  # already queued or running for another session
+                    continue
+                job = {"sessions": {session}}
+                job["future"] = prefetcher["executor"].submit(_prefetch_policy, prefetcher, df_base, key, job)
+                prefetcher["pending"][key] = job
@@ -0,0 +1,253 @@
+"""Ingest validation of catalog files: column rules as vectorized masks, one pass per column.
+
+validate_catalog checks every row against CATALOG_SCHEMA (nulls, type coercion, ranges,
+unique sku_id) and splits the frame into clean rows, a quarantine table of the rejected
+rows with their failed rules, and a compact per-rule error report. Rules that pass keep
+no mask, so a clean catalog costs one comparison per rule and a sort of the SKU keys.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# kind: "str" / "int" / "float"; bounds: gt, ge (lower), le (upper); optional columns may be absent
+CATALOG_SCHEMA = {
+    "sku_id": {"kind": "str", "unique": True},
+    "category": {"kind": "str"},
+    "supplier": {"kind": "str"},
+    "avg_daily_sales": {"kind": "float", "gt": 0},  # zero -> undefined days of cover
+    "demand_std": {"kind": "float", "ge": 0},
+    "lead_time_days": {"kind": "int", "ge": 0},
+    "current_stock": {"kind": "int", "ge": 0},
+    "unit_cost": {"kind": "float", "gt": 0},
+    "unit_price": {"kind": "float", "ge": 0},
+    "annual_demand": {"kind": "float", "ge": 0},
+    "order_cost": {"kind": "float", "ge": 0},
+    "holding_cost": {"kind": "float", "gt": 0},  # zero -> infinite EOQ
+    "stock_value": {"kind": "float", "ge": 0},
+    "days_of_cover": {"kind": "float", "ge": 0, "optional": True},  # derived when absent
+    "lead_time_std": {"kind": "float", "ge": 0, "optional": True},
+}
+
+
+# ================= UNIQUE KEYS =================
+def _chunk_string_keys(arr) -> np.ndarray:
+    """uint64 key per string of one Arrow string array: length, first and last 8 bytes.
+
+    Equal strings always get equal keys, so rows with a key of their own are unique.
+    The 8-byte windows are read straight from the data buffer, without copying it.
+    """
+    import pyarrow as pa
+
+    _, offsets, data = arr.buffers()
+    off = np.frombuffer(offsets, dtype=np.int64 if pa.types.is_large_string(arr.type) else np.int32)
+    off = off[arr.offset:arr.offset + len(arr) + 1].astype(np.int64, copy=False)
+    start, end = off[:-1], off[1:]
+    raw = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, np.uint8)
+    if len(raw) < 8:
+        raw = np.concatenate([raw, np.zeros(8, dtype=np.uint8)])
+    windows = np.ndarray((len(raw) - 7,), dtype="<u8", buffer=raw, strides=(1,))  # 8 bytes from each offset
+    top = len(windows) - 1
+
+    length = (end - start).astype(np.uint64)
+    first = windows[np.minimum(start, top)]
+    tail = start > top  # short strings in the buffer's last 7 bytes: shift them down
+    if tail.any():
+        first[tail] >>= ((start[tail] - top) * 8).astype(np.uint64)
+    pos = end - 8
+    np.maximum(pos, start, out=pos)
+    np.minimum(pos, top, out=pos)  # only short strings are clamped; their last window is unused
+    last = windows[pos]
+    short = length < 8
+    if short.any():  # mask off the bytes of the next string
+        first[short] &= (np.uint64(1) << length[short] * np.uint64(8)) - np.uint64(1)
+        last[short] = first[short]
+    first *= np.uint64(0x9E3779B97F4A7C15)
+    first ^= last
+    length <<= np.uint64(56)
+    first ^= length
+    return first
+
+
+def _duplicated_strings(values: pd.Series) -> np.ndarray:
+    """Mask of the non-null values that occur more than once (every copy is marked).
+
+    Sorting 64-bit keys is several times faster than hashing 10M strings; only rows whose
+    keys collide are compared exactly.
+    """
+    import pyarrow as pa
+
+    arr = pa.array(values.array)
+    chunks = arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr]
+    chunks = [c if pa.types.is_string(c.type) or pa.types.is_large_string(c.type) else c.cast(pa.large_string())
+              for c in chunks]
+    keys = np.concatenate([_chunk_string_keys(c) for c in chunks]) if chunks else np.zeros(0, np.uint64)
+
+    sorted_keys = np.sort(keys)
+    repeated = sorted_keys[1:][sorted_keys[1:] == sorted_keys[:-1]]
+    dup = np.zeros(len(values), dtype=bool)
+    if len(repeated):
+        candidates = np.isin(keys, repeated) & values.notna().to_numpy()
+        dup[candidates] = values[candidates].duplicated(keep=False).to_numpy()
+    return dup
+
+
+# ================= VALIDATION =================
+def _in_bounds(lo, hi, rule: dict) -> bool:
+    """Whether a column's min / max satisfy the rule's bounds (NaN never does)."""
+    return (lo > rule["gt"] if "gt" in rule else lo >= rule.get("ge", -np.inf)) \
+        and hi <= rule.get("le", np.inf) and hi < np.inf
+
+
+def _clean_by_stats(col: pd.Series, rule: dict, stats: dict) -> bool:
+    """Whether a column without nulls passes its rules (bar uniqueness) given its min / max.
+
+    File statistics skip NaN, so a float column also needs a finite sum: one pass
+    instead of the min and max scans.
+    """
+    if rule["kind"] == "str":
+        return pd.api.types.is_string_dtype(col) and stats["min"] != ""
+    kind = col.dtype.kind
+    if kind not in ("iu" if rule["kind"] == "int" else "iuf") or not _in_bounds(stats["min"], stats["max"], rule):
+        return False
+    return kind != "f" or bool(np.isfinite(np.add.reduce(col.to_numpy())))
+
+
+def _column_checks(col: pd.Series, rule: dict, stats: dict = None):
+    """(coerced column, [(rule label, failing-rows mask)]) for one column.
+
+    A clean numeric column is recognised from its min and max alone, taken from `stats`
+    (the file's own statistics) when given; the per-rule masks are only built for a
+    column that fails somewhere.
+    """
+    checks = []
+    if stats is not None and stats["null_count"] == 0 and _clean_by_stats(col, rule, stats):
+        if rule.get("unique"):
+            checks.append(("duplicate", _duplicated_strings(col)))
+        return col, checks
+    if rule["kind"] == "str":
+        missing = col.isna().to_numpy() if col.hasnans else None
+        if not pd.api.types.is_string_dtype(col):
+            col = col.astype("str")
+        empty = col == ""
+        if empty.any():
+            empty = empty.to_numpy(dtype=bool, na_value=False)
+            missing = empty if missing is None else missing | empty
+        if missing is not None:
+            checks.append(("missing", missing))
+        if rule.get("unique"):
+            checks.append(("duplicate", _duplicated_strings(col)))
+        return col, checks
+
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        values = col.to_numpy()
+        integral = rule["kind"] != "int" or values.dtype.kind in "iu"
+        if len(values) == 0 or (integral and values.dtype.kind in "iuf"
+                                and _in_bounds(values.min(), values.max(), rule)):
+            return col, checks
+        x = values.astype(np.float64) if values.dtype.kind in "iuf" else col.to_numpy(np.float64, na_value=np.nan)
+        checks.append(("missing", np.isnan(x)))
+    else:
+        x = pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        nan, present = np.isnan(x), col.notna().to_numpy()
+        checks += [("missing", nan & ~present), ("not a number", nan & present)]
+        col = pd.Series(x, index=col.index, name=col.name)
+    checks.append(("not finite", np.isinf(x)))
+    if rule["kind"] == "int" and not pd.api.types.is_integer_dtype(col):
+        with np.errstate(invalid="ignore"):
+            checks.append(("not an integer", np.isfinite(x) & (x != np.round(x))))
+    for bound, fails, text in [("gt", np.less_equal, ">"), ("ge", np.less, ">="), ("le", np.greater, "<=")]:
+        if bound in rule:
+            checks.append((f"not {text} {rule[bound]}", fails(x, rule[bound])))
+    return col, checks
+
+
+def validate_catalog(df: pd.DataFrame, schema: dict = CATALOG_SCHEMA, stats: dict = None) -> dict:
+    """Check every schema rule on every row; returns {"clean", "quarantine", "report"}.
+
+    clean: the passing rows with coerced dtypes (int columns int64, float columns float64,
+    days_of_cover derived when absent). quarantine: the rejected rows as read, plus an
+    "errors" column listing their failed rules. report: one row per failed rule (column,
+    rule, rows, first SKUs). Every copy of a duplicated sku_id is rejected. A required
+    column missing from the frame raises ValueError.
+
+    stats: {column: {"min", "max", "null_count"}} of the file `df` was read from (see
+    parquet_column_stats); the columns they show clean skip their scans.
+    """
+    absent = [c for c, rule in schema.items() if c not in df and not rule.get("optional")]
+    if absent:
+        raise ValueError(f"catalog is missing columns: {absent}")
+
+    columns, failed = {}, []
+    bad = np.zeros(len(df), dtype=bool)
+    for name, rule in schema.items():
+        if name not in df:
+            continue
+        columns[name], checks = _column_checks(df[name], rule, (stats or {}).get(name))
+        for label, mask in checks:
+            if mask.any():  # passing rules keep no mask
+                failed.append((name, label, mask))
+                bad |= mask
+
+    clean = df.assign(**columns)
+    if bad.any():
+        clean = clean[~bad]
+    for name, rule in schema.items():
+        if name in clean and rule["kind"] == "int" and clean[name].dtype != np.int64:
+            clean[name] = clean[name].astype(np.int64)
+    if "days_of_cover" not in clean:
+        clean["days_of_cover"] = clean["current_stock"] / clean["avg_daily_sales"]
+
+    quarantine = df[bad].copy() if failed else df.iloc[:0].copy()
+    errors = np.full(len(quarantine), "", dtype=object)
+    sku_ids = df["sku_id"].astype("str") if failed else None
+    report = []
+    for name, label, mask in failed:
+        rejected = mask[bad]
+        errors[rejected] += f"{name}: {label}; "
+        report.append({"column": name, "rule": label, "rows": int(mask.sum()),
+                       "examples": ", ".join(sku_ids[mask].head(3).fillna("<missing>"))})
+    quarantine["errors"] = [e[:-2] for e in errors]
+    report = pd.DataFrame(report, columns=["column", "rule", "rows", "examples"])
+    return {"clean": clean.reset_index(drop=True), "quarantine": quarantine, "report": report}
+
+
+def parquet_column_stats(path: str) -> dict:
+    """{column: {"min", "max", "null_count"}} over all row groups, from the Parquet footer.
+
+    Columns that some row group has no statistics for are left out.
+    """
+    import pyarrow.parquet as pq
+
+    meta = pq.read_metadata(path)
+    stats = {}
+    for j in range(meta.num_columns):
+        chunks = [meta.row_group(i).column(j) for i in range(meta.num_row_groups)]
+        if not chunks or not all(c.statistics is not None and c.statistics.has_min_max
+                                 and c.statistics.has_null_count for c in chunks):
+            continue
+        stats[chunks[0].path_in_schema] = {
+            "min": min(c.statistics.min for c in chunks),
+            "max": max(c.statistics.max for c in chunks),
+            "null_count": sum(c.statistics.null_count for c in chunks),
+        }
+    return stats
+
+
+def read_catalog(path: str, quarantine_path: str = None) -> dict:
+    """Read a catalog CSV / Parquet file and validate it (see validate_catalog).
+
+    Parquet column statistics stand in for the min / max and null scans. Rejected rows
+    are written to `quarantine_path` (CSV) when there are any; an older quarantine file
+    there is removed when the catalog is clean.
+    """
+    if str(path).endswith(".parquet"):
+        result = validate_catalog(pd.read_parquet(path), stats=parquet_column_stats(path))
+    else:
+        result = validate_catalog(pd.read_csv(path))
+    if quarantine_path is not None:
+        if len(result["quarantine"]):
+            result["quarantine"].to_csv(quarantine_path, index=False)
+        elif os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+    return result
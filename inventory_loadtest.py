@@ -0,0 +1,267 @@
+"""Load test: many concurrent dashboard sessions against one process.
+
+Each simulated planner is a Streamlit AppTest session on its own thread, like the
+sessions of one Streamlit server: they share the process, its st.cache_data /
+st.cache_resource entries, the prefetch and export workers, and the GIL. After the
+first page load every session changes one random sidebar widget per rerun (service
+level, holding cost, lead-time mode, risk view, days of cover, categories, suppliers,
+locations) and reruns the whole page: policy, filters, charts, alerts and CSV writes.
+
+Reported: p50 / p95 / p99 latency of first loads and of reruns, rerun throughput, and
+memory (process RSS growth per session, plus the arrays each session keeps in its
+session state).
+
+    python inventory_loadtest.py --sessions 8 --reruns 10
+    python inventory_loadtest.py --sessions 4 --n-items 200000 --max-p95 5
+
+--n-items publishes a generated catalog of that size to a temporary shared catalog
+store (see inventory_catalog.py). The app writes its CSVs and snapshots relative to
+the working directory, so the sessions run in a scratch directory (--workdir).
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from inventory_core import Z_MAP, load_base_inventory
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Inventory_Management_BI_System.py")
+LOAD_TEST_TIMEOUT = 600.0  # seconds one AppTest rerun may take before it counts as failed
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _state_bytes(value) -> int:
+    """Bytes of the arrays / frames held in a session-state value (containers walked)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, dict):
+        return sum(_state_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_state_bytes(v) for v in value)
+    return 0
+
+
+# ================= SIDEBAR ACTIONS =================
+def _widget(elements, label: str):
+    return next((w for w in elements if w.label == label), None)
+
+
+def _random_subset(rng: random.Random, options: list) -> list:
+    return rng.sample(list(options), rng.randint(1, len(options)))
+
+
+def random_sidebar_change(at, rng: random.Random) -> str:
+    """Change one sidebar widget of AppTest session `at` to a random value; returns its label."""
+    actions = [
+        ("Target service level", at.select_slider, lambda w: rng.choice(list(Z_MAP))),  # options are labels
+        ("Holding cost adjustment", at.slider, lambda w: round(0.8 + 0.05 * rng.randint(0, 8), 2)),
+        ("Lead time", at.radio, lambda w: rng.choice(list(w.options))),
+        ("Risk view", at.radio, lambda w: rng.choice(list(w.options))),
+        ("Days of cover", at.slider, lambda w: tuple(sorted(rng.sample(range(0, 121), 2)))),
+        ("Category", at.multiselect, lambda w: _random_subset(rng, w.options)),
+        ("Supplier", at.multiselect, lambda w: _random_subset(rng, w.options)),
+        ("Location", at.multiselect, lambda w: _random_subset(rng, w.options)),
+    ]
+    rng.shuffle(actions)
+    for label, elements, value in actions:
+        w = _widget(elements, label)
+        if w is not None:
+            w.set_value(value(w))
+            return label
+    return None
+
+
+# ================= SESSIONS =================
+@contextmanager
+def _shared_runtime():
+    """Keep one Streamlit Runtime for all sessions, as a server has.
+
+    AppTest installs a mock Runtime singleton at the start of each run and clears it at
+    the end, which pulls it from under the sessions still running; while the load test
+    runs, the last installed one stays visible instead.
+    """
+    from streamlit.runtime import Runtime
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    def exists(cls):
+        return cls._instance is not None or bool(last)
+
+    with patch.object(Runtime, "instance", classmethod(instance)), \
+            patch.object(Runtime, "exists", classmethod(exists)):
+        yield
+
+
+def _timed_run(at, samples: list, session: int, phase: str, action: str = None):
+    t0 = time.perf_counter()
+    try:
+        at.run()
+        error = at.exception[0].message if len(at.exception) else None
+    except Exception as exc:  # e.g. the rerun timed out
+        error = f"{type(exc).__name__}: {exc}"
+    samples.append({"session": session, "phase": phase, "action": action,
+                    "seconds": time.perf_counter() - t0, "error": error})
+
+
+def _session(i: int, reruns: int, think: float, seed: int, samples: list, states: dict, start: threading.Barrier):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + i)
+    at = AppTest.from_file(APP_PATH, default_timeout=LOAD_TEST_TIMEOUT)
+    start.wait()  # all sessions open the page together
+    _timed_run(at, samples, i, "first load")
+    for _ in range(reruns):
+        if think > 0:
+            time.sleep(rng.expovariate(1 / think))
+        action = random_sidebar_change(at, rng)
+        _timed_run(at, samples, i, "rerun", action)
+    states[i] = _state_bytes(at.session_state.to_dict())
+    # The page's CSVs are written by the background export worker to relative paths;
+    # let them land in the scratch directory before the run changes back out of it
+    if "auto_exports" in at.session_state:
+        wait([job["future"] for job in at.session_state["auto_exports"]])
+
+
+def latency_table(samples: pd.DataFrame) -> pd.DataFrame:
+    """Latency percentiles (seconds) per phase."""
+    rows = []
+    for phase, g in samples.groupby("phase", sort=False):
+        s = g["seconds"].to_numpy()
+        p50, p95, p99 = np.percentile(s, [50, 95, 99])
+        rows.append({"phase": phase, "runs": len(s), "errors": int(g["error"].notna().sum()),
+                     "p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3),
+                     "max": round(s.max(), 3)})
+    return pd.DataFrame(rows)
+
+
+def run_load_test(
+    sessions: int = 8,
+    reruns: int = 10,
+    think: float = 0.0,
+    n_items: int = None,
+    seed: int = 0,
+    workdir: str = None,
+) -> dict:
+    """Drive `sessions` concurrent dashboard sessions of `reruns` random sidebar changes each.
+
+    Returns {"latency": per-phase percentiles, "sessions": per-session figures,
+    "summary": totals, "samples": every timed run}. Changes into `workdir` (a new
+    temporary directory when None) for the duration of the run.
+    """
+    from streamlit import config
+
+    # AppTest parses the script on every run; concurrent ast.parse calls (Streamlit "magic")
+    # trip a CPython 3.11 race, and the page does not use magic anyway
+    config.set_option("runner.magicEnabled", False)
+    workdir = workdir or tempfile.mkdtemp(prefix="inventory_loadtest_")
+    cwd, env = os.getcwd(), os.environ.get("INVENTORY_CATALOG_DIR")
+    os.chdir(workdir)
+    try:
+        if n_items is not None:
+            import inventory_catalog
+
+            store = os.path.join(workdir, "catalog")
+            inventory_catalog.publish_catalog(store, load_base_inventory(n_items))
+            os.environ["INVENTORY_CATALOG_DIR"] = store
+
+        samples, states = [], {}
+        start = threading.Barrier(sessions)
+        threads = [
+            threading.Thread(target=_session, args=(i, reruns, think, seed, samples, states, start),
+                             name=f"session-{i}")
+            for i in range(sessions)
+        ]
+        rss_before = _rss_mb()
+        t0 = time.perf_counter()
+        with _shared_runtime():
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        wall = time.perf_counter() - t0
+        rss_after = _rss_mb()
+    finally:
+        os.chdir(cwd)
+        if env is None:
+            os.environ.pop("INVENTORY_CATALOG_DIR", None)
+        else:
+            os.environ["INVENTORY_CATALOG_DIR"] = env
+
+    samples = pd.DataFrame(samples, columns=["session", "phase", "action", "seconds", "error"])
+    per_session = samples.groupby("session").agg(
+        runs=("seconds", "size"), mean_seconds=("seconds", "mean"), errors=("error", "count")
+    )
+    per_session["state_mb"] = pd.Series(states, dtype=float) / 2**20
+    summary = {
+        "sessions": sessions,
+        "reruns": int((samples["phase"] == "rerun").sum()),
+        "errors": int(samples["error"].notna().sum()),
+        "wall_seconds": round(wall, 2),
+        "runs_per_second": round(len(samples) / wall, 3),  # page loads and reruns
+        "rss_before_mb": round(rss_before, 1),
+        "rss_after_mb": round(rss_after, 1),
+        "rss_peak_mb": round(_peak_rss_mb(), 1),
+        "rss_per_session_mb": round((rss_after - rss_before) / sessions, 1),
+        "state_per_session_mb": round(per_session["state_mb"].mean(), 2),
+    }
+    return {"latency": latency_table(samples), "sessions": per_session.round(3).reset_index(),
+            "summary": summary, "samples": samples}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent dashboard sessions load test")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated planners")
+    parser.add_argument("--reruns", type=int, default=10, help="random sidebar changes per session")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between a session's changes")
+    parser.add_argument("--n-items", type=int, help="publish a generated catalog of this size (default: app's own)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="scratch directory for the app's files (default: new temp dir)")
+    parser.add_argument("--samples", help="write every timed run to this CSV")
+    parser.add_argument("--max-p95", type=float, help="exit 1 when rerun p95 (seconds) exceeds this")
+    args = parser.parse_args()
+
+    result = run_load_test(args.sessions, args.reruns, args.think, args.n_items, args.seed, args.workdir)
+    print(result["latency"].to_string(index=False))
+    print()
+    print(result["sessions"].to_string(index=False))
+    print()
+    print(json.dumps(result["summary"], indent=1))
+    if args.samples:
+        result["samples"].to_csv(args.samples, index=False)
+
+    latency = result["latency"].set_index("phase")
+    failed = result["summary"]["errors"] > 0
+    if args.max_p95 is not None and "rerun" in latency.index and latency.loc["rerun", "p95"] > args.max_p95:
+        print(f"rerun p95 {latency.loc['rerun', 'p95']}s exceeds --max-p95 {args.max_p95}s", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,218 @@
+"""Time-travel store of policy results, one snapshot per day (or per run).
+
+Each snapshot records the policy parameters it was computed under (service level,
+holding multiplier, lead-time mode), and every policy has its own chain of snapshots:
+the first is written in full; every later one stores only the rows that changed
+against the previous state of that chain (new or modified SKUs, plus tombstones for
+removed ones) as a zstd-compressed Parquet file, so storage grows with churn, not
+catalog size. A snapshot whose columns or row order differ from the previous state
+starts the chain again with a full base. KPIs are computed once at save time and kept
+in the manifest, so KPI time series never touch the row data.
+
+The dashboard snapshots REFERENCE_POLICY once a day, whatever its sidebar is set to.
+
+    python inventory_snapshots.py save inventory_snapshots --source inventory_policy_data.csv \
+        --policy '{"service_level": 0.99, "holding_mult": 1.0, "lead_time_mode": "Fixed"}'
+    python inventory_snapshots.py history inventory_snapshots
+    python inventory_snapshots.py restore inventory_snapshots --at 2026-03-31 --out policy_0331.csv
+"""
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+KEY = "sku_id"
+REFERENCE_POLICY = {"service_level": 0.95, "holding_mult": 1.0, "lead_time_mode": "Fixed"}
+_store_lock = threading.Lock()  # dashboard sessions save from their own threads
+
+
+@contextmanager
+def _locked_store(store_dir: str):
+    """Hold the store for a manifest read-modify-write, across threads and processes.
+
+    Server workers share one store, so the lock is an flock on store_dir/manifest.lock
+    (where fcntl exists); the thread lock covers the rest.
+    """
+    with _store_lock:
+        os.makedirs(store_dir, exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:  # Windows: one process per store
+            yield
+            return
+        with open(os.path.join(store_dir, "manifest.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+            yield
+
+
+def load_manifest(store_dir: str) -> list:
+    path = os.path.join(store_dir, "manifest.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(store_dir: str, manifest: list):
+    path = os.path.join(store_dir, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)  # readers never see a half-written manifest
+
+
+def snapshot_kpis(df_policy: pd.DataFrame) -> dict:
+    """Network KPIs recorded with each snapshot (unfiltered)."""
+    return {
+        "skus": int(len(df_policy)),
+        "total_stock_value": float(df_policy["stock_value"].sum()),
+        "items_at_risk": int(df_policy["risk_flag"].isin(["Stock-out", "Below ROP"]).sum()),
+        "overstock_items": int((df_policy["risk_flag"] == "Overstock").sum()),
+        "avg_days_cover": float(df_policy["days_of_cover"].mean()),
+        "total_rec_qty": int(df_policy["recommended_order_qty"].sum()),
+        "rec_budget": float((df_policy["recommended_order_qty"] * df_policy["unit_cost"]).sum()),
+    }
+
+
+def changed_rows(prev: pd.DataFrame, cur: pd.DataFrame) -> pd.DataFrame:
+    """Rows of `cur` that are new or differ from `prev`, plus `_deleted` tombstones.
+
+    Assumes the same columns (save_snapshot writes a full base otherwise).
+    """
+    prev_ids = pd.Index(prev[KEY])
+    pos = prev_ids.get_indexer(cur[KEY])  # hashed lookups; -1 = new SKU
+
+    changed = pos < 0
+    found = np.flatnonzero(~changed)
+    for col in cur.columns.drop(KEY):
+        a, b = cur[col].to_numpy()[found], prev[col].to_numpy()[pos[found]]
+        changed[found] |= (a != b) & ~(pd.isna(a) & pd.isna(b))
+
+    delta = cur[changed].assign(_deleted=False)
+    removed = pd.Index(cur[KEY]).get_indexer(prev_ids) < 0
+    if removed.any():
+        tombstones = pd.DataFrame({KEY: prev_ids[removed], "_deleted": True})
+        delta = pd.concat([delta, tombstones], ignore_index=True)
+    return delta
+
+
+def _delta_keeps_layout(prev: pd.DataFrame, cur: pd.DataFrame) -> bool:
+    """Whether `cur` can be rebuilt from `prev` plus a delta: same columns, and `prev`'s
+    surviving SKUs in their old relative order followed by the new ones (the order
+    load_snapshot rebuilds)."""
+    if list(cur.columns) != list(prev.columns):
+        return False
+    pos = pd.Index(prev[KEY]).get_indexer(cur[KEY])
+    known = pos >= 0
+    n_known = int(known.sum())
+    return bool(known[:n_known].all()) and bool((np.diff(pos[:n_known]) > 0).all())
+
+
+def _chain(manifest: list, policy: dict) -> list:
+    """Manifest entries of one policy (None: snapshots saved without policy parameters)."""
+    return [m for m in manifest if m.get("policy") == policy]
+
+
+def load_snapshot(store_dir: str, at=None, policy: dict = REFERENCE_POLICY) -> pd.DataFrame:
+    """Policy result as of `at` (latest snapshot at or before it; the newest when None),
+    with the rows in the order they were saved."""
+    manifest = _chain(load_manifest(store_dir), policy)
+    if at is not None:
+        cutoff = pd.Timestamp(at)
+        if cutoff == cutoff.normalize():  # a bare date means the end of that day
+            cutoff += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+        manifest = [m for m in manifest if pd.Timestamp(m["at"]) <= cutoff]
+    if not manifest:
+        raise LookupError(f"no snapshot of policy {policy} in {store_dir!r} at or before {at}")
+
+    # The last full base plus every delta after it; the last version of each SKU wins,
+    # in the order SKUs first appeared (a delta only appends new SKUs)
+    start = max(i for i, m in enumerate(manifest) if m["file"].startswith("base-"))
+    parts = [pd.read_parquet(os.path.join(store_dir, m["file"])) for m in manifest[start:]]
+    rows = pd.concat(parts, ignore_index=True)
+    order = rows[KEY].drop_duplicates(keep="first")
+    state = rows.drop_duplicates(KEY, keep="last").set_index(KEY).loc[order.to_numpy()].reset_index()
+    state = state[~state["_deleted"].to_numpy(dtype=bool)].drop(columns="_deleted")
+    # Tombstones carry NaN values, which widen int columns in the concat; restore the base dtypes
+    dtypes = parts[0].dtypes.drop("_deleted")
+    return state[dtypes.index].astype(dtypes.to_dict()).reset_index(drop=True)
+
+
+def snapshot_due(store_dir: str, policy: dict = REFERENCE_POLICY, at=None) -> bool:
+    """Whether the policy has no snapshot yet on the day of `at` (today when None)."""
+    day = (pd.Timestamp.now() if at is None else pd.Timestamp(at)).date()
+    chain = _chain(load_manifest(store_dir), policy)
+    return not chain or pd.Timestamp(chain[-1]["at"]).date() != day
+
+
+def save_snapshot(
+    store_dir: str,
+    df_policy: pd.DataFrame,
+    at=None,
+    per_day: bool = False,
+    policy: dict = REFERENCE_POLICY,
+) -> dict:
+    """Store `df_policy`, computed under `policy`, as a new snapshot; returns its manifest entry.
+
+    With `per_day`, nothing is written when that policy already has a snapshot that day.
+    """
+    at = pd.Timestamp.now().floor("s") if at is None else pd.Timestamp(at)
+    with _locked_store(store_dir):
+        manifest = load_manifest(store_dir)
+        chain = _chain(manifest, policy)
+        if per_day and chain and pd.Timestamp(chain[-1]["at"]).date() == at.date():
+            return chain[-1]
+
+        prev = load_snapshot(store_dir, policy=policy) if chain else None
+        if prev is not None and _delta_keeps_layout(prev, df_policy):
+            kind, delta = "delta", changed_rows(prev, df_policy)
+        else:
+            kind, delta = "base", df_policy.assign(_deleted=False)
+
+        name = f"{kind}-{at:%Y%m%dT%H%M%S}-{len(manifest):04d}.parquet"
+        delta.to_parquet(os.path.join(store_dir, name), index=False, compression="zstd")
+        entry = {"at": at.isoformat(), "file": name, "policy": policy, "rows_written": int(len(delta)),
+                 "kpis": snapshot_kpis(df_policy)}
+        _write_manifest(store_dir, manifest + [entry])
+    return entry
+
+
+def kpi_history(store_dir: str, policy: dict = REFERENCE_POLICY) -> pd.DataFrame:
+    """One row of KPIs per snapshot of one policy, read from the manifest only."""
+    return pd.DataFrame(
+        [{"at": pd.Timestamp(m["at"]), "rows_written": m["rows_written"], **m["kpis"]}
+         for m in _chain(load_manifest(store_dir), policy)]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-travel store of policy snapshots")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_save = sub.add_parser("save", help="store a policy result (CSV / Parquet) as a snapshot")
+    p_save.add_argument("store_dir")
+    p_save.add_argument("--source", default="inventory_policy_data.csv")
+    p_save.add_argument("--at", help="snapshot timestamp (default: now)")
+    p_hist = sub.add_parser("history", help="KPI time series across snapshots")
+    p_hist.add_argument("store_dir")
+    p_restore = sub.add_parser("restore", help="rebuild the policy result as of a date")
+    p_restore.add_argument("store_dir")
+    p_restore.add_argument("--at", help="date or timestamp (default: latest)")
+    p_restore.add_argument("--out", required=True)
+    for p in (p_save, p_hist, p_restore):
+        p.add_argument("--policy", type=json.loads, default=REFERENCE_POLICY,
+                       help="policy parameters as JSON (default: the dashboard's REFERENCE_POLICY)")
+    args = parser.parse_args()
+
+    if args.cmd == "save":
+        reader = pd.read_parquet if args.source.endswith(".parquet") else pd.read_csv
+        entry = save_snapshot(args.store_dir, reader(args.source), at=args.at, policy=args.policy)
+        print(f"{entry['file']}: {entry['rows_written']:,} rows written")
+    elif args.cmd == "history":
+        print(kpi_history(args.store_dir, args.policy).to_string(index=False))
+    else:
+        state = load_snapshot(args.store_dir, at=args.at, policy=args.policy)
+        state.to_csv(args.out, index=False)
+        print(f"{len(state):,} SKUs written to {args.out}")
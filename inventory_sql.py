@@ -0,0 +1,234 @@
+"""Optional DuckDB storage backend for the inventory catalog.
+
+The catalog lives in a local DuckDB file; the policy (EOQ / safety stock / ROP / risk
+flag / recommended qty), the sidebar filters, the KPI reductions and the Overview
+groupbys all run inside DuckDB, and only aggregated frames come back to Python.
+Rounding uses round_even so results match pandas' round-half-to-even in apply_policy.
+
+    python inventory_sql.py build inventory.duckdb --source inventory_Raw_data.csv
+    python inventory_sql.py bench --n-items 1000000
+    INVENTORY_DB=inventory.duckdb streamlit run Inventory_Management_BI_System.py
+
+Source files are validated before they are written (inventory_core.validate_catalog);
+rejected rows are left out and written to <source>.quarantine.csv.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+CATALOG_COLUMNS = [
+    "sku_id", "category", "supplier", "avg_daily_sales", "demand_std", "lead_time_days",
+    "current_stock", "unit_cost", "unit_price", "annual_demand", "order_cost",
+    "holding_cost", "stock_value", "days_of_cover",
+]
+
+
+def connect(db_path: str, read_only: bool = True):
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ImportError("The SQL backend needs DuckDB: pip install duckdb") from exc
+    return duckdb.connect(db_path, read_only=read_only)
+
+
+def build_catalog_db(db_path: str, source, quarantine_path: str = None) -> int:
+    """Write the catalog table from a DataFrame or a CSV / Parquet file path.
+
+    Rows go through validate_catalog like every other ingest path (read_catalog for
+    files); rejected rows are left out, and those of a file source are written to
+    `quarantine_path` (CSV) when given. Returns the number of rows written.
+    """
+    from inventory_core import read_catalog, validate_catalog
+
+    if isinstance(source, pd.DataFrame):
+        clean = validate_catalog(source)["clean"]
+    else:
+        clean = read_catalog(str(source), quarantine_path)["clean"]
+    con = connect(db_path, read_only=False)
+    con.register("source_df", clean[CATALOG_COLUMNS])
+    con.execute(f"CREATE OR REPLACE TABLE catalog AS SELECT {', '.join(CATALOG_COLUMNS)} FROM source_df")
+    n = con.execute("SELECT count(*) FROM catalog").fetchone()[0]
+    con.close()
+    return n
+
+
+# ================= POLICY + FILTERS AS SQL =================
+POLICY_SQL = """
+WITH adj AS (
+    SELECT *,
+        holding_cost * $holding_mult AS holding_cost_adj,
+        round_even($z * demand_std * sqrt(lead_time_days), 0)::BIGINT AS safety_stock
+    FROM catalog
+), pol AS (
+    SELECT *,
+        sqrt((2 * (avg_daily_sales * 365) * order_cost) / holding_cost_adj) AS eoq,
+        round_even(avg_daily_sales * lead_time_days + safety_stock, 0)::BIGINT AS rop
+    FROM adj
+)
+SELECT *,
+    CASE
+        WHEN current_stock <= 0 THEN 'Stock-out'
+        WHEN current_stock < rop THEN 'Below ROP'
+        WHEN days_of_cover > 7 THEN 'Overstock'
+        ELSE 'Healthy'
+    END AS risk_flag,
+    CASE
+        WHEN current_stock < rop THEN greatest(round_even(eoq, 0)::BIGINT, rop - current_stock)
+        ELSE 0
+    END AS recommended_order_qty
+FROM pol
+"""
+
+
+def filtered_policy_sql(
+    z: float,
+    holding_mult: float,
+    category_filter: list,
+    supplier_filter: list,
+    risk_filter: list,
+    min_cov: float,
+    max_cov: float,
+) -> tuple:
+    """SQL text + named parameters for the filtered policy rows (same rules as filter_view)."""
+    params = {"z": z, "holding_mult": holding_mult, "min_cov": min_cov, "max_cov": max_cov}
+    where = ["days_of_cover >= $min_cov", "days_of_cover <= $max_cov"]
+    for col, values in [("category", category_filter), ("supplier", supplier_filter), ("risk_flag", risk_filter)]:
+        if values:
+            where.append(f"list_contains(${col}, {col})")
+            params[col] = list(values)
+    sql = f"SELECT * FROM ({POLICY_SQL}) WHERE " + " AND ".join(where)
+    return sql, params
+
+
+def sql_kpi_values(con, **policy_filters) -> dict:
+    """Same dict as kpi_values(), reduced inside DuckDB."""
+    sql, params = filtered_policy_sql(**policy_filters)
+    row = con.execute(f"""
+        SELECT
+            coalesce(sum(stock_value), 0),
+            count_if(risk_flag IN ('Stock-out', 'Below ROP')),
+            count_if(risk_flag = 'Overstock'),
+            avg(days_of_cover)
+        FROM ({sql})
+    """, params).fetchone()
+    return {
+        "total_stock_value": row[0],
+        "items_at_risk": row[1],
+        "overstock_items": row[2],
+        "avg_days_cover": float("nan") if row[3] is None else row[3],
+    }
+
+
+def sql_overview_aggregates(con, scatter_rows: int = 5000, **policy_filters) -> dict:
+    """Same dict as overview_aggregates(); only grouped results and a row sample leave DuckDB."""
+    sql, params = filtered_policy_sql(**policy_filters)
+
+    # One scan for all three groupbys; grouping_id tells the sets apart
+    groups = con.execute(f"""
+        SELECT
+            grouping_id(category, supplier, risk_flag) AS gid,
+            category, supplier, risk_flag,
+            sum(stock_value) AS stock_value,
+            count(*) AS sku_count,
+            sum(recommended_order_qty) AS recommended_order_qty
+        FROM ({sql})
+        GROUP BY GROUPING SETS ((category), (supplier), (risk_flag))
+    """, params).df()
+
+    by_category = groups[groups["gid"] == 0b011].sort_values("category", ignore_index=True)
+    by_supplier = groups[groups["gid"] == 0b101].sort_values("supplier", ignore_index=True)
+    by_risk = groups[groups["gid"] == 0b110].sort_values("risk_flag", ignore_index=True)
+    return {
+        "rows": int(by_category["sku_count"].sum()),
+        "by_category": by_category[["category", "stock_value", "sku_count", "recommended_order_qty"]],
+        "by_supplier": by_supplier[["supplier", "stock_value"]],
+        "by_risk": by_risk[["risk_flag", "sku_count"]].rename(columns={"sku_count": "count"}),
+        "scatter": con.execute(
+            f"SELECT * FROM ({sql}) USING SAMPLE reservoir({int(scatter_rows)} ROWS) REPEATABLE (0)", params
+        ).df(),
+    }
+
+
+def sql_rows(con, risk_only: bool = False, limit: int = None, **policy_filters) -> pd.DataFrame:
+    """Materialize filtered policy rows (optionally only Stock-out / Below ROP)."""
+    sql, params = filtered_policy_sql(**policy_filters)
+    if risk_only:
+        sql = f"SELECT * FROM ({sql}) WHERE risk_flag IN ('Stock-out', 'Below ROP')"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return con.execute(sql, params).df()
+
+
+def sql_distinct(con, column: str) -> list:
+    return [r[0] for r in con.execute(f"SELECT DISTINCT {column} FROM catalog ORDER BY 1").fetchall()]
+
+
+# ================= BENCHMARK =================
+def benchmark(n_items: int = 1_000_000, repeats: int = 3) -> pd.DataFrame:
+    """Time policy + filters + KPIs + Overview groupbys: pandas in memory vs DuckDB file."""
+    from inventory_core import (
+        Z_MAP, apply_policy, filter_view, kpi_values, load_base_inventory, overview_aggregates,
+    )
+
+    base_df = load_base_inventory(n_items)
+    filters = dict(
+        category_filter=["Home Cleaning", "Paper", "Kitchen"],
+        supplier_filter=[],
+        risk_filter=["Stock-out", "Below ROP", "Overstock"],
+        min_cov=0,
+        max_cov=120,
+    )
+
+    def run_pandas():
+        df_f = filter_view(apply_policy(base_df, z=Z_MAP[0.95], holding_multiplier=1.0), **filters)
+        return kpi_values(df_f), overview_aggregates(df_f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.duckdb")
+        build_catalog_db(db_path, base_df)
+        con = connect(db_path)
+
+        def run_sql():
+            args = dict(z=Z_MAP[0.95], holding_mult=1.0, **filters)
+            return sql_kpi_values(con, **args), sql_overview_aggregates(con, **args)
+
+        timings = []
+        for name, fn in [("pandas", run_pandas), ("duckdb", run_sql)]:
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                kpis, _ = fn()
+                timings.append({"backend": name, "seconds": time.perf_counter() - t0,
+                                "stock_value": kpis["total_stock_value"], "at_risk": kpis["items_at_risk"]})
+        con.close()
+
+    return pd.DataFrame(timings).groupby("backend", as_index=False).agg(
+        best_seconds=("seconds", "min"), stock_value=("stock_value", "first"), at_risk=("at_risk", "first")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DuckDB backend for the inventory catalog")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="write a catalog DuckDB file")
+    p_build.add_argument("db_path")
+    p_build.add_argument("--source", help="CSV / Parquet catalog (default: generated catalog)")
+    p_build.add_argument("--n-items", type=int, default=150)
+    p_bench = sub.add_parser("bench", help="compare pandas vs DuckDB")
+    p_bench.add_argument("--n-items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        if args.source:
+            source = args.source
+        else:
+            from inventory_core import load_base_inventory
+            source = load_base_inventory(args.n_items)
+        quarantine_path = f"{args.source}.quarantine.csv" if args.source else None
+        print(f"{build_catalog_db(args.db_path, source, quarantine_path):,} SKUs written to {args.db_path}")
+        if quarantine_path and os.path.exists(quarantine_path):
+            print(f"rejected rows written to {quarantine_path}")
+    else:
+        print(benchmark(args.n_items).to_string(index=False))
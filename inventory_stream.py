@@ -0,0 +1,166 @@
+"""Out-of-core policy pipeline for catalogs that do not fit in memory.
+
+Reads the catalog from CSV / Parquet in row chunks, validates each chunk (rejected rows
+go to the optional quarantine file), applies the policy, appends the plan to the output
+file and folds every chunk into running aggregates (KPI banner values + Overview groupbys
++ a fixed-size scatter sample). Peak memory is bounded by the chunk size, not the catalog size.
+
+    python inventory_stream.py catalog.parquet plan.parquet --service-level 0.95 --chunk-rows 500000
+    python inventory_stream.py catalog.csv plan.csv --quarantine rejected.csv
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from inventory_core import ARROW_STR, Z_MAP, apply_policy, filter_view, validate_catalog
+
+
+def iter_catalog_chunks(path: str, chunk_rows: int = 500_000):
+    """Yield the catalog as DataFrames of at most `chunk_rows` rows."""
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def write_plan_chunk(dest: str, chunk: pd.DataFrame, state: dict):
+    """Append one policy chunk to a CSV or Parquet file (`state` carries the open writer)."""
+    if str(dest).endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if "writer" not in state:
+            state["schema"] = pa.Schema.from_pandas(chunk, preserve_index=False)
+            state["writer"] = pq.ParquetWriter(dest, state["schema"])
+        state["writer"].write_table(pa.Table.from_pandas(chunk, schema=state["schema"], preserve_index=False))
+    else:
+        first = not state.get("started")
+        chunk.to_csv(dest, mode="w" if first else "a", header=first, index=False)
+        state["started"] = True
+
+
+def _add(acc, part):
+    return part if acc is None else acc.add(part, fill_value=0)
+
+
+def new_running_aggregates(scatter_rows: int = 5000, seed: int = 0) -> dict:
+    return {
+        "rows": 0, "stock_value": 0.0, "items_at_risk": 0, "overstock_items": 0,
+        "cover_sum": 0.0, "cover_count": 0, "total_rec_qty": 0, "rec_budget": 0.0,
+        "by_category": None, "by_supplier": None, "by_risk": None,
+        "sample": None, "scatter_rows": scatter_rows, "rng": np.random.default_rng(seed),
+        "quarantined": 0, "rejects": None,
+    }
+
+
+def fold_chunk(aggs: dict, df_f: pd.DataFrame):
+    """Fold one filtered policy chunk into the running KPI / Overview aggregates."""
+    aggs["rows"] += len(df_f)
+    aggs["stock_value"] += df_f["stock_value"].sum()
+    aggs["items_at_risk"] += int(df_f["risk_flag"].isin(["Stock-out", "Below ROP"]).sum())
+    aggs["overstock_items"] += int((df_f["risk_flag"] == "Overstock").sum())
+    aggs["cover_sum"] += df_f["days_of_cover"].sum()
+    aggs["cover_count"] += int(df_f["days_of_cover"].count())
+    aggs["total_rec_qty"] += int(df_f["recommended_order_qty"].sum())
+    aggs["rec_budget"] += (df_f["recommended_order_qty"] * df_f["unit_cost"]).sum()
+
+    aggs["by_category"] = _add(aggs["by_category"], df_f.groupby("category").agg(
+        stock_value=("stock_value", "sum"),
+        sku_count=("sku_id", "count"),
+        recommended_order_qty=("recommended_order_qty", "sum"),
+    ))
+    aggs["by_supplier"] = _add(aggs["by_supplier"], df_f.groupby("supplier")["stock_value"].sum())
+    aggs["by_risk"] = _add(aggs["by_risk"], df_f.groupby("risk_flag")["sku_id"].count())
+
+    # Reservoir sample for the scatter: keep the rows with the smallest random keys so far
+    keyed = df_f.assign(_key=aggs["rng"].random(len(df_f)))
+    pool = keyed if aggs["sample"] is None else pd.concat([aggs["sample"], keyed])
+    aggs["sample"] = pool.nsmallest(aggs["scatter_rows"], "_key")
+
+
+def finalize_aggregates(aggs: dict) -> tuple:
+    """Return (kpis, overview) shaped like kpi_values() / overview_aggregates()."""
+    kpis = {
+        "total_stock_value": aggs["stock_value"],
+        "items_at_risk": aggs["items_at_risk"],
+        "overstock_items": aggs["overstock_items"],
+        "avg_days_cover": aggs["cover_sum"] / aggs["cover_count"] if aggs["cover_count"] else float("nan"),
+    }
+    if aggs["by_category"] is None:
+        return kpis, {"rows": 0, "by_category": pd.DataFrame(), "by_supplier": pd.DataFrame(),
+                      "by_risk": pd.DataFrame(), "scatter": pd.DataFrame()}
+    overview = {
+        "rows": aggs["rows"],
+        "by_category": aggs["by_category"].reset_index(),
+        "by_supplier": aggs["by_supplier"].reset_index(),
+        "by_risk": aggs["by_risk"].rename("count").reset_index(),
+        "scatter": aggs["sample"].drop(columns="_key"),
+    }
+    return kpis, overview
+
+
+def stream_policy(
+    source: str,
+    dest: str,
+    z: float,
+    holding_mult: float,
+    chunk_rows: int = 500_000,
+    view_filters: dict = None,
+    quarantine: str = None,
+) -> dict:
+    """Validate and apply the policy chunk by chunk, write the full plan to `dest`, aggregate the filtered view.
+
+    Rows failing validation are left out of the plan and appended to `quarantine` (CSV /
+    Parquet, every column as text) when given; sku_id uniqueness is checked within each chunk. Returns the
+    running aggregates; see finalize_aggregates().
+    """
+    aggs = new_running_aggregates()
+    writer_state, quarantine_state = {}, {}
+    try:
+        for chunk in iter_catalog_chunks(source, chunk_rows):
+            checked = validate_catalog(chunk)
+            if len(checked["quarantine"]):
+                aggs["quarantined"] += len(checked["quarantine"])
+                aggs["rejects"] = _add(aggs["rejects"], checked["report"].set_index(["column", "rule"])["rows"])
+                if quarantine is not None:
+                    # rows as read: a column's dtype varies by chunk, so every column goes out as text
+                    write_plan_chunk(quarantine, checked["quarantine"].astype(ARROW_STR), quarantine_state)
+            df_policy = apply_policy(checked["clean"], z=z, holding_multiplier=holding_mult)
+            write_plan_chunk(dest, df_policy, writer_state)
+            fold_chunk(aggs, filter_view(df_policy, **view_filters) if view_filters else df_policy)
+    finally:
+        for state in (writer_state, quarantine_state):
+            if "writer" in state:
+                state["writer"].close()
+    return aggs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunked out-of-core policy run")
+    parser.add_argument("source", help="catalog CSV / Parquet")
+    parser.add_argument("dest", help="plan output (.csv or .parquet)")
+    parser.add_argument("--service-level", type=float, default=0.95, choices=sorted(Z_MAP))
+    parser.add_argument("--holding-mult", type=float, default=1.0)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--quarantine", help="write rows that fail validation here (.csv or .parquet)")
+    args = parser.parse_args()
+
+    aggs = stream_policy(
+        args.source, args.dest,
+        z=Z_MAP[args.service_level],
+        holding_mult=args.holding_mult,
+        chunk_rows=args.chunk_rows,
+        quarantine=args.quarantine,
+    )
+    kpis, overview = finalize_aggregates(aggs)
+    kpis.update(rows=aggs["rows"], total_rec_qty=aggs["total_rec_qty"], rec_budget=aggs["rec_budget"])
+    print(json.dumps({k: float(v) for k, v in kpis.items()}, indent=2))
+    print(overview["by_category"].to_string(index=False))
+    if aggs["quarantined"]:
+        print(f"{aggs['quarantined']:,} rows quarantined" + (f" to {args.quarantine}" if args.quarantine else ""))
+        print(aggs["rejects"].astype(int).rename("rows").reset_index().to_string(index=False))
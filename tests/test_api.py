@@ -0,0 +1,105 @@
+"""HTTP API through a local TestClient: filters, streaming encoders, exports, bad input."""
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from starlette.testclient import TestClient
+
+import inventory_api
+from inventory_api import app, policy_for
+from inventory_core import Z_MAP
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def test_policy_ndjson_matches_engine(client, monkeypatch):
+    monkeypatch.setattr(inventory_api, "STREAM_CHUNK_ROWS", 7)  # several chunks
+    r = client.get("/policy", params={"service_level": 0.95, "risk": ["Stock-out", "Below ROP"]})
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines() if line]
+    expected = policy_for(0.95, 1.0)
+    expected = expected[expected["risk_flag"].isin(["Stock-out", "Below ROP"])]
+    assert [row["sku_id"] for row in rows] == list(expected["sku_id"])
+    assert [row["rop"] for row in rows] == list(expected["rop"])
+
+
+def test_policy_arrow_stream(client, monkeypatch):
+    monkeypatch.setattr(inventory_api, "STREAM_CHUNK_ROWS", 7)
+    r = client.get("/policy", params={"format": "arrow", "category": "Paper", "min_cov": 10})
+    assert r.status_code == 200
+    table = pa.ipc.open_stream(io.BytesIO(r.content)).read_all()
+    df = table.to_pandas()
+    assert len(df) > 0
+    assert (df["category"] == "Paper").all() and (df["days_of_cover"] >= 10).all()
+
+
+def test_kpis_and_export(client):
+    kpis = client.get("/kpis", params={"supplier": "Sano"}).json()
+    df = policy_for(0.95, 1.0)
+    assert kpis["skus"] == int((df["supplier"] == "Sano").sum())
+
+    r = client.get("/export", params={"format": "csv", "supplier": "Sano"})
+    assert r.status_code == 200
+    assert "attachment" in r.headers["content-disposition"]
+    assert len(pd.read_csv(io.BytesIO(r.content))) == kpis["skus"]
+
+
+def test_skus_lookup(client):
+    r = client.post("/skus", json={"skus": ["SKU-1000", "SKU-X"], "service_level": 0.99})
+    assert r.status_code == 200
+    body = r.json()
+    assert [item["sku_id"] for item in body["items"]] == ["SKU-1000"]
+    assert body["missing"] == ["SKU-X"]
+    assert body["items"][0]["safety_stock"] == policy_for(0.99, 1.0)["safety_stock"].iloc[0]
+
+
+@pytest.mark.parametrize("params", [
+    {"service_level": 0.5},
+    {"holding_mult": 0},
+    {"holding_mult": "abc"},
+    {"holding_mult": "nan"},
+    {"holding_mult": "inf"},
+    {"min_cov": "abc"},
+    {"max_cov": ""},
+])
+def test_bad_query_params_are_400(client, params):
+    for path in ["/policy", "/kpis", "/export"]:
+        r = client.get(path, params=params)
+        assert r.status_code == 400, (path, params)
+        assert "error" in r.json()
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    "SKU-1000",
+    {"service_level": 0.95},
+    {"skus": "SKU-1000"},
+    {"skus": [1, 2]},
+    {"skus": [], "service_level": "high"},
+    {"skus": [], "service_level": max(Z_MAP) + 1},
+])
+def test_bad_sku_bodies_are_400(client, body):
+    r = client.post("/skus", json=body)
+    assert r.status_code == 400
+    assert r.json()["error"].startswith("invalid request body")
+
+
+def test_non_finite_holding_mult_never_reaches_the_cache(client):
+    before = policy_for.cache_info().currsize
+    for value in ["nan", "inf", "-inf"]:
+        assert client.get("/policy", params={"holding_mult": value}).status_code == 400
+    r = client.post("/skus", content=b'{"skus": ["SKU-1000"], "holding_mult": NaN}',
+                    headers={"content-type": "application/json"})
+    assert r.status_code == 400
+    assert policy_for.cache_info().currsize == before
+
+
+def test_invalid_json_is_400(client):
+    r = client.post("/skus", content=b"{not json", headers={"content-type": "application/json"})
+    assert r.status_code == 400
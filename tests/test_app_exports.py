@@ -0,0 +1,43 @@
+"""Dashboard background CSVs: written once per change of their inputs, not on every rerun."""
+from concurrent.futures import wait
+
+from inventory_loadtest import APP_PATH, LOAD_TEST_TIMEOUT
+
+
+def test_auto_exports_start_only_when_inputs_change(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(tmp_path)
+    at = AppTest.from_file(APP_PATH, default_timeout=LOAD_TEST_TIMEOUT)
+    at.run()
+    policy_job, view_job = at.session_state["auto_exports"]
+    wait([policy_job["future"], view_job["future"]])
+
+    at.run()  # plain rerun, e.g. a click elsewhere on the page
+    assert at.session_state["auto_exports"] == [policy_job, view_job]
+    other = AppTest.from_file(APP_PATH, default_timeout=LOAD_TEST_TIMEOUT)
+    other.run()  # another session on the same inputs
+    assert other.session_state["auto_exports"][0] is policy_job
+
+    at.sidebar.multiselect[0].set_value(at.sidebar.multiselect[0].value[:1]).run()
+    jobs = at.session_state["auto_exports"]
+    assert jobs[0] is policy_job and jobs[1] is not view_job  # only the filtered view changed
+    wait([jobs[1]["future"]])
+    assert (tmp_path / "inventory_filtered_data.csv").exists()
+
+
+def test_exports_with_the_same_file_name_keep_distinct_widgets(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    from inventory_core import frame_chunks, load_base_inventory, new_export_worker, submit_export
+
+    monkeypatch.chdir(tmp_path)
+    worker, path = new_export_worker(), str(tmp_path / "policy_20260301T080000.csv")
+    jobs = [submit_export(worker, frame_chunks(load_base_inventory(100)), path, "csv") for _ in range(2)]
+    wait([job["future"] for job in jobs])  # two exports started within the same second
+
+    at = AppTest.from_file(APP_PATH, default_timeout=LOAD_TEST_TIMEOUT)
+    at.session_state["exports"] = jobs
+    at.run()
+    assert not at.exception
+    wait([job["future"] for job in at.session_state["auto_exports"]])  # written under tmp_path
@@ -0,0 +1,91 @@
+"""Shared catalog store: publish, zero-copy attach and the atomic version swap."""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from inventory_catalog import (
+    PARTS,
+    attach_catalog,
+    attach_locations,
+    attach_sku_index,
+    current_version,
+    publish_catalog,
+)
+from inventory_core import (
+    ARROW_STR,
+    apply_policy,
+    build_sku_index,
+    load_base_inventory,
+    location_base_frame,
+    search_sku_prefix,
+    sku_position,
+    split_locations,
+)
+
+
+def test_attach_round_trips_catalog(tmp_path):
+    df_base = load_base_inventory(500)
+    publish_catalog(str(tmp_path), df_base)
+    shared = attach_catalog(str(tmp_path))
+
+    pd.testing.assert_frame_equal(shared, df_base)
+    assert not shared["avg_daily_sales"].to_numpy().flags.writeable  # mapped, read-only
+    pd.testing.assert_frame_equal(apply_policy(shared, 1.65, 1.0), apply_policy(df_base, 1.65, 1.0))
+
+
+def test_attach_keeps_strings_in_the_mapped_file(tmp_path):
+    df_base = load_base_inventory(20_000)
+    df_base["sku_id"] = df_base["sku_id"].astype(object)  # what pandas 2.2 frames hold
+    publish_catalog(str(tmp_path), df_base)
+
+    allocated = pa.total_allocated_bytes()
+    shared = attach_catalog(str(tmp_path))
+    assert pa.total_allocated_bytes() - allocated < 1000  # nothing copied into Arrow's pool
+    for col in ("sku_id", "category", "supplier"):
+        assert shared[col].dtype == ARROW_STR
+    assert shared["sku_id"].equals(df_base["sku_id"].astype(ARROW_STR))
+
+
+def test_version_swap_keeps_attached_versions_readable(tmp_path):
+    store = str(tmp_path)
+    publish_catalog(store, load_base_inventory(100), keep=1)
+    v1 = attach_catalog(store)
+    publish_catalog(store, load_base_inventory(200), keep=1)
+    publish_catalog(store, load_base_inventory(300), keep=1)
+
+    assert current_version(store)["version"] == 3
+    assert len(attach_catalog(store)) == 300
+    assert not any(os.path.exists(os.path.join(store, f"{part}-000001.arrow")) for part in PARTS)
+    assert np.isfinite(v1["stock_value"].to_numpy()).all()  # still mapped after unlink
+    with pytest.raises(LookupError):
+        attach_catalog(store, version=1)
+
+
+def test_derived_frames_are_published_with_each_version(tmp_path):
+    store = str(tmp_path)
+    df_base = load_base_inventory(5000)
+    df_base.loc[:9, ["avg_daily_sales", "days_of_cover"]] = [0.0, np.nan]  # NaN must map, not become null
+    publish_catalog(store, df_base)
+    shared = attach_catalog(store)
+    pd.testing.assert_frame_equal(shared, df_base)
+
+    allocated = pa.total_allocated_bytes()
+    df_loc = attach_locations(store, version=1)
+    sku_index = attach_sku_index(store, shared["sku_id"], version=1)
+    assert pa.total_allocated_bytes() - allocated < 1000  # mapped, not rebuilt
+
+    loc_inv = split_locations(df_base)
+    pd.testing.assert_frame_equal(df_loc, location_base_frame(df_base, loc_inv))
+    assert df_loc.attrs["locations"] == list(loc_inv["locations"])
+    assert not df_loc["current_stock"].to_numpy().flags.writeable
+
+    built = build_sku_index(df_base)
+    np.testing.assert_array_equal(sku_index["sorted_pos"], built["sorted_pos"])
+    assert sku_index["sorted_ids"].equals(built["sorted_ids"])
+    in_view = np.ones(len(df_base), dtype=bool)
+    assert search_sku_prefix(sku_index, "sku-10", in_view) == search_sku_prefix(built, "sku-10", in_view)
+    assert sku_position(sku_index, df_base["sku_id"].iloc[1234]) == 1234
+    assert sku_index["pos"].get_loc(df_base["sku_id"].iloc[77]) == 77
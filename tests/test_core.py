@@ -0,0 +1,222 @@
+"""Hot paths of inventory_core, exercised without a Streamlit runtime."""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from inventory_core import (
+    CATALOG_SEED,
+    RISK_FLAGS,
+    apply_policy,
+    apply_policy_scenarios,
+    bootstrap_lead_time,
+    build_sku_index,
+    charts,
+    filter_view,
+    key_normals,
+    key_states,
+    kpi_values,
+    load_base_inventory,
+    overview_aggregates,
+    policy_frame,
+    policy_kernel,
+    rollup_cube,
+    search_sku_prefix,
+    simulate_daily_demand,
+    simulate_demand,
+    sku_position,
+    supplier_lead_time_profile,
+    view_aggregates,
+    with_lead_time_stats,
+)
+from inventory_core.data import CATALOG_CHUNK_ROWS, DEMAND_SEED, _catalog_chunk
+
+VIEW = {"category_filter": [], "supplier_filter": [], "risk_filter": [], "min_cov": 0.0, "max_cov": 1e9}
+
+
+def policy_df(n_items: int = 2000) -> pd.DataFrame:
+    return apply_policy(load_base_inventory(n_items), z=1.65, holding_multiplier=1.0)
+
+
+def reference_policy(df: pd.DataFrame, z: float, holding_multiplier: float) -> pd.DataFrame:
+    """The policy as plain pandas expressions, independent of either kernel."""
+    holding_cost_adj = df["holding_cost"] * holding_multiplier
+    eoq = np.sqrt((2 * (df["avg_daily_sales"] * 365) * df["order_cost"]) / holding_cost_adj)
+    safety_stock = (z * df["demand_std"] * np.sqrt(df["lead_time_days"])).round().astype(int)
+    rop = (df["avg_daily_sales"] * df["lead_time_days"] + safety_stock).round().astype(int)
+    stock = df["current_stock"]
+    return pd.DataFrame({
+        "holding_cost_adj": holding_cost_adj,
+        "eoq": eoq,
+        "safety_stock": safety_stock,
+        "rop": rop,
+        "risk_flag": np.select([stock <= 0, stock < rop, df["days_of_cover"] > 7],
+                               ["Stock-out", "Below ROP", "Overstock"], default="Healthy"),
+        "recommended_order_qty": np.where(stock < rop, np.maximum(eoq.round().astype(int), rop - stock), 0),
+    })
+
+
+def test_numpy_kernel_matches_frame():
+    df_base = load_base_inventory(500)
+    expected = reference_policy(df_base, 1.65, 1.1)
+    df_policy = policy_frame(df_base, policy_kernel(df_base, 1.65, 1.1, engine="numpy"))
+    for col in expected:
+        np.testing.assert_array_equal(df_policy[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+
+
+def test_numpy_kernel_accepts_whole_float_stock():
+    df_base = load_base_inventory(500)
+    expected = reference_policy(df_base, 1.65, 1.0)
+    as_float = df_base.assign(current_stock=df_base["current_stock"].astype(float))
+    b = policy_kernel(as_float, 1.65, 1.0, engine="numpy")
+    np.testing.assert_array_equal(b["recommended_order_qty"], expected["recommended_order_qty"])
+    np.testing.assert_array_equal(RISK_FLAGS[b["risk_code"]], expected["risk_flag"])
+    stacked = apply_policy_scenarios(as_float, [1.65], [1.0])
+    np.testing.assert_array_equal(stacked["recommended_order_qty"][0], expected["recommended_order_qty"])
+
+    for bad in (0.5, np.nan):
+        with pytest.raises(ValueError, match="whole units"):
+            policy_kernel(as_float.assign(current_stock=np.r_[bad, as_float["current_stock"][1:]]),
+                          1.65, 1.0, engine="numpy")
+
+
+@pytest.mark.parametrize("stock_dtype", ["int64", "int32", "float64"])
+@pytest.mark.parametrize("stochastic", [False, True])
+def test_jit_kernel_matches_numpy(stochastic, stock_dtype):
+    pytest.importorskip("numba")
+    df_base = load_base_inventory(5000)
+    df_base["current_stock"] = df_base["current_stock"].astype(stock_dtype)
+    if stochastic:
+        df_base = with_lead_time_stats(df_base, supplier_lead_time_profile())
+    for z, h in [(1.65, 1.0), (2.33, 0.85)]:
+        jit = policy_kernel(df_base, z, h, engine="jit")
+        numpy = policy_kernel(df_base, z, h, engine="numpy")
+        for col in ["holding_cost_adj", "eoq", "safety_stock", "rop", "risk_code", "recommended_order_qty"]:
+            np.testing.assert_array_equal(jit[col], numpy[col], err_msg=col)
+
+
+def test_engines_reject_fractional_stock_alike():
+    pytest.importorskip("numba")
+    df_base = load_base_inventory(100)
+    df_base["current_stock"] = df_base["current_stock"] + 0.5
+    for engine in ("jit", "numpy"):
+        with pytest.raises(ValueError, match="whole units"):
+            policy_kernel(df_base, 1.65, 1.0, engine=engine)
+
+
+def test_cube_matches_scan():
+    df_policy = policy_df()
+    view = dict(VIEW, category_filter=sorted(df_policy["category"].unique())[:2], risk_filter=["Healthy", "Overstock"])
+    df_f = filter_view(df_policy, **view)
+
+    kpis, aggs = view_aggregates(df_f, view, rollup_cube(df_policy))
+    scan_kpis, scan_aggs = kpi_values(df_f), overview_aggregates(df_f)
+    for key, value in scan_kpis.items():
+        assert np.isclose(kpis[key], value, rtol=1e-12)
+    pd.testing.assert_frame_equal(aggs["by_category"], scan_aggs["by_category"], check_dtype=False)
+    assert aggs["rows"] == len(df_f)
+
+
+def test_cover_range_falls_back_to_scan():
+    df_policy = policy_df()
+    view = dict(VIEW, min_cov=5.0, max_cov=30.0)
+    df_f = filter_view(df_policy, **view)
+    kpis, aggs = view_aggregates(df_f, view, rollup_cube(df_policy))
+    assert kpis["total_stock_value"] == df_f["stock_value"].sum()
+    assert aggs["rows"] == len(df_f)
+
+
+def test_charts_build_figures():
+    aggs = overview_aggregates(policy_df(300))
+    fig = charts.stock_value_by_category(aggs["by_category"])
+    assert fig.layout.paper_bgcolor == "white"
+    assert charts.risk_distribution(aggs["by_risk"]).data
+
+
+def test_stochastic_lead_time_engines_agree():
+    df_base = with_lead_time_stats(load_base_inventory(500), supplier_lead_time_profile())
+    b = policy_kernel(df_base, 1.65, 1.0, engine="numpy")
+    stacked = apply_policy_scenarios(df_base, [1.65], [1.0])
+    np.testing.assert_array_equal(b["safety_stock"], stacked["safety_stock"][0])
+    expected = np.round(1.65 * np.sqrt(
+        df_base["lead_time_days"] * df_base["demand_std"] ** 2
+        + (df_base["avg_daily_sales"] * df_base["lead_time_std"]) ** 2
+    ))
+    np.testing.assert_allclose(b["safety_stock"], expected, atol=1)
+
+
+def test_lead_time_stats_share_the_base_columns():
+    df = load_base_inventory(500)
+    df.attrs["catalog_version"] = 3
+    stochastic = with_lead_time_stats(df, supplier_lead_time_profile())
+    assert list(stochastic.columns) == list(df.columns) + ["lead_time_std"]
+    assert np.shares_memory(stochastic["unit_cost"].to_numpy(), df["unit_cost"].to_numpy())
+    assert stochastic.attrs["catalog_version"] == 3
+
+
+def test_zero_lead_time_std_matches_fixed():
+    df_base = load_base_inventory(500)
+    fixed = policy_kernel(df_base, 1.65, 1.0, engine="numpy")["safety_stock"].copy()
+    stochastic = policy_kernel(df_base.assign(lead_time_std=0.0), 1.65, 1.0, engine="numpy")["safety_stock"]
+    np.testing.assert_allclose(stochastic, fixed, atol=1)
+
+
+def test_bootstrap_lead_time_per_key():
+    rng = np.random.default_rng(1)
+    keys = np.repeat(["A", "B"], [400, 100])
+    samples = np.concatenate([rng.normal(10, 2, 400), np.full(100, 5.0)])
+    stats = bootstrap_lead_time(keys, samples, n_boot=100)
+    assert list(stats["receipts"]) == [400, 100]
+    assert abs(stats.loc["A", "lead_time_mean"] - samples[:400].mean()) < 0.1
+    assert abs(stats.loc["A", "lead_time_std"] - samples[:400].std(ddof=1)) < 0.1
+    assert stats.loc["B", "lead_time_std"] == 0
+
+
+def test_catalog_independent_of_workers_and_size():
+    n = CATALOG_CHUNK_ROWS + 500  # two chunks
+    serial = load_base_inventory(n)
+    pd.testing.assert_frame_equal(load_base_inventory(n, workers=2), serial)
+    pd.testing.assert_frame_equal(load_base_inventory(300), serial.iloc[:300])
+    assert not load_base_inventory(300, seed=CATALOG_SEED + 1).equals(serial.iloc[:300])
+    short = _catalog_chunk(CATALOG_SEED, 1, 500)  # only the rows asked for are drawn
+    pd.testing.assert_frame_equal(short, _catalog_chunk(CATALOG_SEED, 1).iloc[:500])
+
+
+def test_demand_keyed_by_sku():
+    df = load_base_inventory(2000)
+    paths = simulate_demand(df["sku_id"], df["avg_daily_sales"], df["demand_std"], days=30)
+    view = df[df["category"] == "Paper"].iloc[::-1]  # filtered and reordered
+    view_paths = simulate_demand(view["sku_id"], view["avg_daily_sales"], view["demand_std"], days=30,
+                                 workers=2, chunk_skus=100)
+    np.testing.assert_array_equal(view_paths, paths[view.index])
+    single = simulate_daily_demand(view["sku_id"].iloc[0], view["avg_daily_sales"].iloc[0],
+                                   view["demand_std"].iloc[0], days=30)
+    np.testing.assert_array_equal(single["demand"].to_numpy(), paths[view.index[0]])
+
+
+def test_key_normals_are_standard_and_keyed():
+    states = key_states(DEMAND_SEED, 1, [f"SKU-{i}" for i in range(20_000)])
+    z = key_normals(states, 7)
+    assert abs(z.mean()) < 0.01 and abs(z.std() - 1) < 0.01
+    assert abs(np.corrcoef(z[:, 0], z[:, 1])[0, 1]) < 0.03
+    np.testing.assert_array_equal(key_normals(states[::-1], 4), z[::-1, :4])  # per row, a prefix per day
+    assert len(np.unique(states)) == len(states)
+
+
+def test_sku_index_lookup_and_prefix_search():
+    df = pd.DataFrame({"sku_id": ["SKU-12", "sku-101", "Sku-13", "ABC-1", "SKU-120", "sku-12"]})
+    index = build_sku_index(df)
+    assert index["pos"].get_loc("sku-101") == 1
+    assert [sku_position(index, sku) for sku in ["SKU-12", "sku-12", "ABC-1"]] == [0, 5, 3]
+    with pytest.raises(KeyError):
+        sku_position(index, "Sku-12")
+    assert index["sorted_ids"].type == pa.large_string()  # variable-width, not fixed-width <U
+    df = df.iloc[:5]
+    index = build_sku_index(df)
+    in_view = np.ones(len(df), dtype=bool)
+    assert search_sku_prefix(index, " sku-1", in_view) == ["sku-101", "SKU-12", "SKU-120", "Sku-13"]
+    assert search_sku_prefix(index, "Sku-12", in_view) == ["SKU-12", "SKU-120"]
+    in_view[4] = False
+    assert search_sku_prefix(index, "sku-12", in_view) == ["SKU-12"]
+    assert search_sku_prefix(index, "SKU-1", np.ones(len(df), dtype=bool), limit=2) == ["sku-101", "SKU-12"]
+    assert search_sku_prefix(index, "X", in_view) == []
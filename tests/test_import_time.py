@@ -0,0 +1,34 @@
+"""Startup budget for the core package: `python -m pytest tests`.
+
+Each check imports in a fresh interpreter, so nothing is already in sys.modules.
+Override the budget with INVENTORY_IMPORT_BUDGET (seconds) on slow machines.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_IMPORT_BUDGET = float(os.environ.get("INVENTORY_IMPORT_BUDGET", "1.0"))
+HEAVY_MODULES = {"streamlit", "plotly", "matplotlib", "seaborn", "sklearn", "statsmodels", "numba", "duckdb"}
+
+
+def cold_import(module: str) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps({'seconds': time.perf_counter() - t, 'modules': sorted(sys.modules)}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_core_import_within_budget():
+    seconds = min(cold_import("inventory_core")["seconds"] for _ in range(3))
+    assert seconds < CORE_IMPORT_BUDGET, f"import inventory_core took {seconds:.2f}s (budget {CORE_IMPORT_BUDGET}s)"
+
+
+def test_core_import_skips_heavy_libraries():
+    loaded = {name.split(".")[0] for name in cold_import("inventory_core")["modules"]}
+    assert not loaded & HEAVY_MODULES, f"heavy modules imported at startup: {sorted(loaded & HEAVY_MODULES)}"
@@ -0,0 +1,14 @@
+"""Load-test harness: concurrent AppTest sessions with random sidebar changes."""
+from inventory_loadtest import run_load_test
+
+
+def test_concurrent_sessions_report(tmp_path):
+    result = run_load_test(sessions=2, reruns=2, workdir=str(tmp_path))
+
+    latency = result["latency"].set_index("phase")
+    assert list(latency["runs"]) == [2, 4]
+    assert result["summary"]["errors"] == 0, result["samples"]["error"].dropna().tolist()
+    assert (latency["p50"] <= latency["p95"]).all() and (latency["p95"] <= latency["p99"]).all()
+    assert result["samples"].loc[result["samples"]["phase"] == "rerun", "action"].notna().all()
+    assert (result["sessions"]["state_mb"] > 0).all()
+    assert (tmp_path / "inventory_policy_data.csv").exists()  # app files stay in the scratch dir
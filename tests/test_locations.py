@@ -0,0 +1,34 @@
+"""SKU x location split: CSR layout, stock conservation, expanded base frame."""
+import numpy as np
+
+from inventory_core import load_base_inventory, location_base_frame, split_locations
+
+
+def test_split_conserves_network_stock():
+    base = load_base_inventory(2000)
+    loc = split_locations(base)
+    indptr = loc["indptr"]
+
+    assert indptr[0] == 0 and indptr[-1] == len(loc["sku_pos"]) == len(loc["loc_idx"])
+    np.testing.assert_array_equal(loc["sku_pos"], np.repeat(np.arange(len(base)), np.diff(indptr)))
+    assert (loc["loc_idx"][indptr[:-1]] == 0).all()  # every SKU starts at the DC
+    assert (np.diff(loc["loc_idx"])[np.diff(loc["sku_pos"]) == 0] > 0).all()  # sorted, no repeats in a row
+    assert (loc["current_stock"] >= 0).all()
+    np.testing.assert_array_equal(np.add.reduceat(loc["current_stock"], indptr[:-1]), base["current_stock"])
+    demand = np.add.reduceat(loc["avg_daily_sales"], indptr[:-1])
+    np.testing.assert_allclose(demand, base["avg_daily_sales"], atol=0.02)  # up to 4 pairs rounded to cents
+
+
+def test_location_base_frame_expands_pairs():
+    base = load_base_inventory(500)
+    loc = split_locations(base)
+    df = location_base_frame(base, loc)
+    assert len(df) == len(loc["sku_pos"])
+    np.testing.assert_array_equal(df["sku_id"], base["sku_id"].to_numpy()[loc["sku_pos"]])
+    np.testing.assert_array_equal(df["location"], loc["locations"][loc["loc_idx"]])
+    np.testing.assert_allclose(df["stock_value"], np.round(df["current_stock"] * df["unit_cost"], 2))
+
+    stores = location_base_frame(base, loc, ["North Store", "East Store"])
+    assert set(stores["location"]) == {"North Store", "East Store"}
+    assert len(stores) == np.isin(loc["loc_idx"], [1, 3]).sum()
+    assert (stores["lead_time_days"].to_numpy() > base["lead_time_days"].to_numpy()[stores["sku_pos"]]).all()
@@ -0,0 +1,88 @@
+"""Order planning: budget optimizer constraints and rounding, joint replenishment POs."""
+import numpy as np
+import pytest
+
+from inventory_core import (
+    apply_policy,
+    joint_replenishment,
+    load_base_inventory,
+    optimize_orders,
+    replenishment_plan,
+)
+
+
+@pytest.fixture(scope="module")
+def lines():
+    df_policy = apply_policy(load_base_inventory(3000), 1.65, 1.0)
+    return df_policy.loc[replenishment_plan(df_policy).index]
+
+
+def test_budget_and_supplier_caps_hold(lines):
+    full = optimize_orders(lines, budget=np.inf)
+    budget = 0.3 * full["line_cost"].sum()
+    caps = {"Sano": 0.05 * budget, "P&G": 0.1 * budget}
+    opt = optimize_orders(lines, budget=budget, supplier_caps=caps)
+
+    assert opt["line_cost"].sum() <= budget
+    assert opt["line_cost"].sum() > 0.99 * budget  # back-fill uses what is left
+    spend = opt.groupby("supplier")["line_cost"].sum()
+    for sup, cap in caps.items():
+        assert spend[sup] <= cap
+    assert (opt["order_qty"] <= full["order_qty"]).all()
+    # partial quantities: cheaper than funding whole lines for the same avoided cost
+    assert (opt["order_qty"].between(1, full["order_qty"] - 1)).any()
+    assert opt["avoided_stockout_cost"].sum() > 0.5 * full["avoided_stockout_cost"].sum()
+
+
+def test_quantities_round_to_moq_and_case_pack(lines):
+    opt = optimize_orders(lines, budget=50_000.0, moq=40, case_pack=12)
+    ordered = opt.loc[opt["funded"], "order_qty"]
+    assert len(ordered) > 0
+    assert (ordered % 12 == 0).all()
+    assert (ordered >= 48).all()  # MOQ 40 rounded up to whole packs
+    assert (opt.loc[~opt["funded"], "order_qty"] == 0).all()
+    np.testing.assert_allclose(opt["line_cost"], opt["order_qty"] * opt["unit_cost"])
+
+    full = optimize_orders(lines, budget=np.inf, moq=40, case_pack=12)
+    rec = lines["recommended_order_qty"].to_numpy()
+    expected = np.where(rec > 0, np.ceil(np.maximum(rec, 40) / 12) * 12, 0)
+    np.testing.assert_array_equal(full["order_qty"], expected)
+
+
+def test_zero_budget_orders_nothing(lines):
+    opt = optimize_orders(lines, budget=0.0)
+    assert opt["order_qty"].sum() == 0
+    assert (opt["avoided_stockout_cost"] == 0).all()
+
+
+def test_joint_replenishment_pos():
+    df_policy = apply_policy(load_base_inventory(3000), 1.65, 1.0)
+    po_lines, po_summary = joint_replenishment(df_policy, po_cost=150.0)
+    below = df_policy[df_policy["current_stock"] < df_policy["rop"]]
+
+    assert sorted(po_lines["sku_id"]) == sorted(below["sku_id"])
+    assert (po_lines["po_qty"] >= po_lines["rop"] - po_lines["current_stock"]).all()
+    assert (po_lines.groupby("supplier")["cycle_days"].nunique() == 1).all()  # one cycle per supplier PO
+
+    summary = po_summary.set_index("supplier")
+    by_supplier = po_lines.groupby("supplier")
+    np.testing.assert_array_equal(summary["po_lines"], by_supplier.size()[summary.index])
+    np.testing.assert_array_equal(summary["po_qty"], by_supplier["po_qty"].sum()[summary.index])
+    np.testing.assert_allclose(summary["po_value"], by_supplier["po_value"].sum()[summary.index], atol=0.05)
+
+    # Cycle of one supplier from the joint replenishment formula
+    sup = summary.index[0]
+    lines = below[below["supplier"] == sup]
+    dh = (lines["avg_daily_sales"] * 365 * lines["holding_cost_adj"]).sum()
+    cycle = np.sqrt(2 * (150.0 + lines["order_cost"].sum()) / dh)
+    assert summary.loc[sup, "cycle_days"] == round(cycle * 365, 1)
+    assert summary.loc[sup, "annual_cost_joint"] == round(np.sqrt(2 * (150.0 + lines["order_cost"].sum()) * dh), 2)
+
+
+def test_joint_replenishment_single_line_saves_nothing():
+    df_policy = apply_policy(load_base_inventory(3000), 1.65, 1.0)
+    one = df_policy[df_policy["current_stock"] < df_policy["rop"]].head(1)
+    _, po_summary = joint_replenishment(one, po_cost=150.0)
+    assert len(po_summary) == 1
+    assert abs(po_summary["annual_savings"].iloc[0]) <= 0.01
+    assert joint_replenishment(df_policy.iloc[:0], po_cost=150.0)[1].empty
@@ -0,0 +1,109 @@
+"""Policy prefetcher: byte-bounded cache, per-session cancellation, shared requests."""
+import threading
+
+import numpy as np
+
+from inventory_core import (
+    Z_MAP,
+    cached_policy,
+    cancel_prefetch,
+    load_base_inventory,
+    neighbour_policies,
+    new_policy_prefetcher,
+    policy_kernel,
+    schedule_prefetch,
+)
+
+POLICY_BYTES_PER_ROW = 8 * 5 + 1  # four float64 / int64 outputs, eoq, one int8 risk code
+
+
+def block_worker(prefetcher: dict) -> threading.Event:
+    """Hold the single worker thread until the returned event is set."""
+    release = threading.Event()
+    prefetcher["executor"].submit(release.wait)
+    return release
+
+
+def drain(prefetcher: dict):
+    prefetcher["executor"].submit(lambda: None).result(timeout=60)
+
+
+def test_neighbours():
+    assert neighbour_policies(0.95, 1.0) == [(0.9, 1.0), (0.98, 1.0), (0.95, 0.95), (0.95, 1.05)]
+    assert neighbour_policies(0.99, 1.2) == [(0.98, 1.2), (0.99, 1.15)]
+
+
+def test_cache_is_bounded_by_bytes():
+    df = load_base_inventory(10_000)
+    prefetcher = new_policy_prefetcher(max_bytes=int(2.5 * POLICY_BYTES_PER_ROW * len(df)))
+    schedule_prefetch(prefetcher, {"network": df}, 0.95, 1.0, "a")  # four neighbours, two fit
+    assert len(prefetcher["pending"]) == 2
+    drain(prefetcher)
+
+    cache = prefetcher["cache"]
+    assert len(cache) == 2
+    assert prefetcher["cache_bytes"] == sum(v.nbytes for b in cache.values() for v in b.values())
+    assert prefetcher["cache_bytes"] <= prefetcher["max_bytes"]
+    assert prefetcher["pending"] == {}
+    for (_, _, z, mult), b in cache.items():
+        expected = policy_kernel(df, z, mult, engine="numpy")
+        np.testing.assert_array_equal(b["rop"], expected["rop"])
+        np.testing.assert_array_equal(b["risk_code"], expected["risk_code"])
+
+    too_small = new_policy_prefetcher(max_bytes=1000)
+    schedule_prefetch(too_small, {"network": df}, 0.95, 1.0, "a")
+    assert too_small["pending"] == {}
+    drain(too_small)
+    assert len(too_small["cache"]) == 0
+
+
+def test_scopes_are_queued_only_while_they_fit_together():
+    network, locations = load_base_inventory(2000), load_base_inventory(6000)
+    bases = {"network": network, "locations": locations}
+    # Room for the four network states and one locations state
+    prefetcher = new_policy_prefetcher(max_bytes=POLICY_BYTES_PER_ROW * (4 * 2000 + 6000 + 2000))
+    release = block_worker(prefetcher)
+    schedule_prefetch(prefetcher, bases, 0.95, 1.0, "a")
+    assert sorted((scope, mult) for scope, _, _, mult in prefetcher["pending"]) == [
+        ("locations", 1.0)] + [("network", m) for m in (0.95, 1.0, 1.0, 1.05)]
+    release.set()
+    drain(prefetcher)
+    assert len(prefetcher["cache"]) == 5  # nothing queued was evicted by its siblings
+
+    # Cached neighbours keep their share of the budget on the next rerun
+    schedule_prefetch(prefetcher, bases, 0.95, 1.0, "a")
+    assert prefetcher["pending"] == {}
+
+
+def test_cancel_only_withdraws_own_session():
+    df = load_base_inventory(2000)
+    prefetcher = new_policy_prefetcher()
+    release = block_worker(prefetcher)
+    schedule_prefetch(prefetcher, {"network": df}, 0.95, 1.0, "a")  # 0.9 / 0.98 / 0.95 x 0.95, 1.05
+    schedule_prefetch(prefetcher, {"network": df}, 0.98, 1.0, "b")  # 0.95 / 0.99 / 0.98 x 0.95, 1.05
+    cancel_prefetch(prefetcher, "a")
+    release.set()
+    drain(prefetcher)
+
+    n = len(df)
+    cached = set(prefetcher["cache"])
+    assert ("network", n, Z_MAP[0.95], 1.0) in cached  # asked for by b only
+    assert ("network", n, Z_MAP[0.99], 1.0) in cached
+    assert ("network", n, Z_MAP[0.98], 1.05) in cached
+    assert ("network", n, Z_MAP[0.9], 1.0) not in cached  # asked for by a only
+    assert ("network", n, Z_MAP[0.95], 1.05) not in cached
+    assert cached_policy(prefetcher, ("network", n, Z_MAP[0.99], 1.0)) is not None
+    assert prefetcher["pending"] == {}
+
+
+def test_shared_request_survives_one_session_cancelling():
+    df = load_base_inventory(2000)
+    prefetcher = new_policy_prefetcher()
+    release = block_worker(prefetcher)
+    schedule_prefetch(prefetcher, {"network": df}, 0.95, 1.0, "a")
+    schedule_prefetch(prefetcher, {"network": df}, 0.95, 1.0, "b")
+    assert all(job["sessions"] == {"a", "b"} for job in prefetcher["pending"].values())
+    cancel_prefetch(prefetcher, "a")
+    release.set()
+    drain(prefetcher)
+    assert len(prefetcher["cache"]) == 4
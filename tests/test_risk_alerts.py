@@ -0,0 +1,101 @@
+"""Risk-flag transitions: raised by catalog changes under one policy state, never by policy changes."""
+import numpy as np
+import pandas as pd
+
+from inventory_core import (
+    RISK_FLAGS,
+    load_base_inventory,
+    log_risk_alerts,
+    new_risk_monitor,
+    policy_kernel,
+    risk_transitions,
+    update_risk_codes,
+    update_risk_monitor,
+)
+
+
+def codes(df: pd.DataFrame, z: float = 1.65, holding_mult: float = 1.0) -> np.ndarray:
+    return policy_kernel(df, z, holding_mult, engine="numpy")["risk_code"].copy()
+
+
+def test_policy_change_alone_raises_no_alerts(tmp_path):
+    df = load_base_inventory(3000)
+    monitor = new_risk_monitor()
+    log_path = str(tmp_path / "alerts.csv")
+    assert (codes(df, 2.33, 1.0) != codes(df)).sum() > 0  # the flags do move with the policy
+    for z, h, mode in [(1.65, 1.0, "Fixed"), (2.33, 1.0, "Fixed"), (2.33, 1.2, "Supplier variability"),
+                       (1.65, 1.0, "Fixed"), (1.28, 0.8, "Fixed")]:
+        transitions = update_risk_monitor(monitor, (z, h, mode), None, df["sku_id"], codes(df, z, h))
+        assert transitions.empty
+        log_risk_alerts(transitions, log_path)
+    assert monitor["alerts"] == {}
+    assert not (tmp_path / "alerts.csv").exists()
+
+
+def test_catalog_change_alerts_once_by_sku(tmp_path):
+    v1 = load_base_inventory(3000)
+    monitor, state = new_risk_monitor(), (1.65, 1.0, "Fixed")
+    assert update_risk_monitor(monitor, state, 1, v1["sku_id"], codes(v1)).empty
+
+    # v2: stock-outs on 10 SKUs, one SKU dropped, one added, rows shuffled
+    v2 = v1.copy()
+    hit = v2.index[:10]
+    v2.loc[hit, "current_stock"] = 0
+    v2.loc[hit, "days_of_cover"] = 0.0
+    v2 = pd.concat([v2.iloc[1:], v1.iloc[[0]].assign(sku_id="SKU-NEW", current_stock=0)])
+    v2 = v2.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    transitions = update_risk_monitor(monitor, state, 2, v2["sku_id"], codes(v2))
+    old = pd.Series(RISK_FLAGS[codes(v1)], index=v1["sku_id"])
+    expected = set(v1["sku_id"][1:10][old[v1["sku_id"][1:10]].to_numpy() != "Stock-out"])
+    assert set(transitions["sku_id"]) == expected
+    assert (transitions["new_flag"] == "Stock-out").all()
+    np.testing.assert_array_equal(transitions["old_flag"], old[transitions["sku_id"]].to_numpy())
+
+    # Every other session on v2 under the same state: already reported
+    assert update_risk_monitor(monitor, state, 2, v2["sku_id"], codes(v2)).empty
+    n_alerts, alerts = monitor["alerts"][state]
+    assert n_alerts == len(alerts) == len(expected)
+
+
+def test_stock_update_compares_only_touched_rows():
+    df = load_base_inventory(3000)
+    monitor, state = new_risk_monitor(), (1.65, 1.0, "Fixed")
+    assert update_risk_codes(monitor, state, 2, [0], codes(df)[:1]).empty  # untracked: nothing to compare
+    before = codes(df)
+    update_risk_monitor(monitor, state, 1, df["sku_id"], before)
+
+    positions = np.array([5, 17, 42, 99])
+    df = df.copy()
+    df.loc[positions, "current_stock"] = 0
+    df.loc[positions, "days_of_cover"] = 0.0
+    new = codes(df.iloc[positions])
+    transitions = update_risk_codes(monitor, state, 2, positions, new)
+    moved = before[positions] != new
+    assert moved.any()
+    assert list(transitions["sku_id"]) == list(df["sku_id"].to_numpy()[positions[moved]])
+    assert (transitions["new_flag"] == "Stock-out").all()
+    np.testing.assert_array_equal(transitions["old_flag"], RISK_FLAGS[before[positions[moved]]])
+    assert monitor["alerts"][state][0] == moved.sum()
+
+    # The monitor now holds version 2's codes: replays and the full path see no change
+    assert update_risk_codes(monitor, state, 2, positions, new).empty
+    assert update_risk_monitor(monitor, state, 3, df["sku_id"], codes(df)).empty
+
+
+def test_monitor_keeps_bounded_states():
+    df = load_base_inventory(200)
+    monitor = new_risk_monitor(max_states=2)
+    for z in [1.28, 1.65, 2.05]:
+        update_risk_monitor(monitor, (z, 1.0, "Fixed"), 1, df["sku_id"], codes(df, z))
+    assert list(monitor["states"]) == [(1.65, 1.0, "Fixed"), (2.05, 1.0, "Fixed")]
+
+
+def test_risk_transitions_with_positions():
+    sku_ids = np.array(["A", "B", "C", "D"], dtype=object)
+    old = np.array([3, 1], dtype=np.int8)
+    new = np.array([1, 1], dtype=np.int8)
+    t = risk_transitions(sku_ids, old, new, positions=np.array([2, 3]), at=pd.Timestamp("2024-01-01"))
+    assert t.to_dict("records") == [
+        {"sku_id": "C", "old_flag": "Healthy", "new_flag": "Below ROP", "timestamp": pd.Timestamp("2024-01-01")}
+    ]
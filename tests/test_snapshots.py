@@ -0,0 +1,94 @@
+"""Snapshot store: delta round trips, reconstruction order, per-policy chains."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import inventory_snapshots
+from inventory_core import apply_policy, load_base_inventory, supplier_lead_time_profile, with_lead_time_stats
+from inventory_snapshots import REFERENCE_POLICY, kpi_history, load_manifest, load_snapshot, save_snapshot
+
+HIGH = dict(REFERENCE_POLICY, service_level=0.99)
+
+
+def policy(df_base: pd.DataFrame, z: float = 1.65) -> pd.DataFrame:
+    return apply_policy(df_base, z, 1.0).copy()
+
+
+def day2(day1: pd.DataFrame) -> pd.DataFrame:
+    """Restocked SKUs, one SKU dropped and two added (appended)."""
+    df = day1.copy()
+    df.loc[df.index[5:25], "current_stock"] += 100
+    df = df.drop(index=df.index[40])
+    new = day1.iloc[:2].assign(sku_id=["SKU-N1", "SKU-N2"])
+    return pd.concat([df, new], ignore_index=True)
+
+
+def test_delta_round_trip_keeps_order_and_dtypes(tmp_path):
+    store = str(tmp_path)
+    d1 = policy(load_base_inventory(1000))
+    d2 = policy(day2(d1).loc[:, d1.columns[:14]])  # recompute the policy on the new stock
+    d3 = d2.drop(index=d2.index[[0, 500]]).reset_index(drop=True)
+
+    save_snapshot(store, d1, at="2026-03-01 08:00")
+    e2 = save_snapshot(store, d2, at="2026-03-02 08:00")
+    e3 = save_snapshot(store, d3, at="2026-03-03 08:00")
+
+    assert e2["file"].startswith("delta-") and e3["file"].startswith("delta-")
+    assert e2["rows_written"] < 40  # the changed and new SKUs plus a tombstone
+    assert e3["rows_written"] == 2
+    for at, expected in [("2026-03-01", d1), ("2026-03-02", d2), ("2026-03-03 09:00", d3), (None, d3)]:
+        pd.testing.assert_frame_equal(load_snapshot(store, at=at), expected, check_dtype=True)
+    with pytest.raises(LookupError):
+        load_snapshot(store, at="2026-02-28")
+
+
+def test_reorder_and_schema_change_write_a_full_base(tmp_path):
+    store = str(tmp_path)
+    d1 = policy(load_base_inventory(500))
+    save_snapshot(store, d1, at="2026-03-01")
+    shuffled = d1.sample(frac=1, random_state=1).reset_index(drop=True)
+    assert save_snapshot(store, shuffled, at="2026-03-02")["file"].startswith("base-")
+    pd.testing.assert_frame_equal(load_snapshot(store), shuffled)
+
+    stochastic = policy(with_lead_time_stats(load_base_inventory(500), supplier_lead_time_profile()))
+    assert save_snapshot(store, stochastic, at="2026-03-03")["file"].startswith("base-")
+    pd.testing.assert_frame_equal(load_snapshot(store), stochastic)
+    pd.testing.assert_frame_equal(load_snapshot(store, at="2026-03-02"), shuffled)
+
+
+def test_policies_keep_separate_chains(tmp_path):
+    store = str(tmp_path)
+    base = load_base_inventory(500)
+    save_snapshot(store, policy(base), at="2026-03-01 08:00", per_day=True)
+    save_snapshot(store, policy(base, 2.33), at="2026-03-01 09:00", per_day=True, policy=HIGH)
+    assert not inventory_snapshots.snapshot_due(store, at="2026-03-01 10:00")
+    assert inventory_snapshots.snapshot_due(store, at="2026-03-02 10:00")
+    # a second save of the day is skipped per policy
+    save_snapshot(store, policy(base, 1.28), at="2026-03-01 11:00", per_day=True)
+    assert len(load_manifest(store)) == 2
+
+    save_snapshot(store, policy(base), at="2026-03-02 08:00", per_day=True)
+    history = kpi_history(store)
+    assert list(history["at"].dt.day) == [1, 2]
+    assert history["items_at_risk"].nunique() == 1  # same policy, same catalog
+    assert len(kpi_history(store, HIGH)) == 1
+    assert kpi_history(store, HIGH)["items_at_risk"].iloc[0] > history["items_at_risk"].iloc[0]
+    pd.testing.assert_frame_equal(load_snapshot(store, policy=HIGH), policy(base, 2.33))
+
+
+def save_in_worker(store: str, service_level: float):
+    policy_params = dict(REFERENCE_POLICY, service_level=service_level)
+    save_snapshot(store, policy(load_base_inventory(500)), at="2026-03-01 08:00", per_day=True,
+                  policy=policy_params)
+
+
+def test_worker_processes_never_drop_each_others_entries(tmp_path):
+    store = str(tmp_path)
+    levels = [0.9, 0.95, 0.98, 0.99] * 2  # every policy saved by two processes at once
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(save_in_worker, [store] * len(levels), levels))
+    manifest = load_manifest(store)
+    assert sorted(m["policy"]["service_level"] for m in manifest) == sorted(set(levels))
+    assert all((tmp_path / m["file"]).exists() for m in manifest)
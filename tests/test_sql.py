@@ -0,0 +1,78 @@
+"""DuckDB catalog backend: same policy rows, KPIs and Overview groupbys as the pandas path."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import inventory_sql  # imports DuckDB lazily
+from inventory_core import Z_MAP, apply_policy, filter_view, kpi_values, load_base_inventory, overview_aggregates
+
+pytest.importorskip("duckdb")
+
+FILTERS = dict(
+    category_filter=["Home Cleaning", "Paper", "Kitchen"],
+    supplier_filter=[],
+    risk_filter=["Stock-out", "Below ROP", "Overstock"],
+    min_cov=0,
+    max_cov=120,
+)
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    base = load_base_inventory(5000)
+    db_path = str(tmp_path_factory.mktemp("sql") / "catalog.duckdb")
+    assert inventory_sql.build_catalog_db(db_path, base) == len(base)
+    con = inventory_sql.connect(db_path)
+    yield base, con
+    con.close()
+
+
+@pytest.mark.parametrize("service_level, holding_mult", [(0.95, 1.0), (0.99, 1.2), (0.9, 0.8)])
+def test_sql_rows_match_pandas(backends, service_level, holding_mult):
+    base, con = backends
+    z = Z_MAP[service_level]
+    expected = filter_view(apply_policy(base, z=z, holding_multiplier=holding_mult), **FILTERS)
+    rows = inventory_sql.sql_rows(con, z=z, holding_mult=holding_mult, **FILTERS)
+    rows = rows.set_index("sku_id").loc[expected["sku_id"]]
+
+    assert len(rows) == len(expected)
+    for col in ["safety_stock", "rop", "recommended_order_qty", "risk_flag"]:
+        np.testing.assert_array_equal(rows[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+    np.testing.assert_allclose(rows["eoq"], expected["eoq"], rtol=1e-12)
+
+
+def test_sql_kpis_and_groupbys_match_pandas(backends):
+    base, con = backends
+    df_f = filter_view(apply_policy(base, z=Z_MAP[0.95], holding_multiplier=1.0), **FILTERS)
+    args = dict(z=Z_MAP[0.95], holding_mult=1.0, **FILTERS)
+
+    kpis, expected = inventory_sql.sql_kpi_values(con, **args), kpi_values(df_f)
+    for key, value in expected.items():
+        assert np.isclose(kpis[key], value, rtol=1e-12), key
+
+    aggs, expected = inventory_sql.sql_overview_aggregates(con, **args), overview_aggregates(df_f)
+    assert aggs["rows"] == expected["rows"] == len(df_f)
+    for key in ["by_category", "by_supplier", "by_risk"]:
+        pd.testing.assert_frame_equal(aggs[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+                                      check_dtype=False, check_exact=False, rtol=1e-12)
+    assert len(aggs["scatter"]) == min(5000, len(df_f))
+
+
+def test_sql_risk_only_rows(backends):
+    base, con = backends
+    rows = inventory_sql.sql_rows(con, risk_only=True, z=Z_MAP[0.95], holding_mult=1.0, **FILTERS)
+    assert set(rows["risk_flag"]) <= {"Stock-out", "Below ROP"}
+    assert inventory_sql.sql_distinct(con, "supplier") == sorted(base["supplier"].unique())
+
+
+def test_build_rejects_rows_the_other_readers_quarantine(tmp_path):
+    base = load_base_inventory(300)
+    bad = base.astype({"current_stock": object})
+    bad.loc[10, "holding_cost"] = 0.0
+    bad.loc[20, "current_stock"] = "abc"
+    bad.to_csv(tmp_path / "catalog.csv", index=False)
+
+    db_path, quarantine = str(tmp_path / "catalog.duckdb"), str(tmp_path / "rejected.csv")
+    assert inventory_sql.build_catalog_db(db_path, str(tmp_path / "catalog.csv"), quarantine) == 298
+    assert list(pd.read_csv(quarantine)["sku_id"]) == list(base["sku_id"].iloc[[10, 20]])
+    assert inventory_sql.build_catalog_db(db_path, base.assign(holding_cost=0.0)) == 0
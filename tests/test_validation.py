@@ -0,0 +1,114 @@
+"""Ingest validation: rule masks, quarantine table, error report and the SKU key shortcut."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory_core import load_base_inventory, parquet_column_stats, read_catalog, validate_catalog
+from inventory_core.validation import _duplicated_strings
+from inventory_stream import finalize_aggregates, stream_policy
+
+
+def test_clean_catalog_passes_unchanged():
+    df_base = load_base_inventory(300)
+    result = validate_catalog(df_base)
+    pd.testing.assert_frame_equal(result["clean"], df_base)
+    assert result["quarantine"].empty and result["report"].empty
+
+
+def test_bad_rows_are_quarantined_with_their_rules():
+    df = load_base_inventory(300)
+    df["lead_time_days"] = df["lead_time_days"].astype(object)
+    df.loc[3, "holding_cost"] = 0.0
+    df.loc[5, ["avg_daily_sales", "days_of_cover"]] = [0.0, np.nan]
+    df.loc[7, "current_stock"] = -4
+    df.loc[9, "sku_id"] = df.loc[10, "sku_id"]
+    df.loc[11, "category"] = ""
+    df.loc[12, "lead_time_days"] = "7 days"
+    df.loc[13, "lead_time_days"] = 4.5
+    df.loc[14, "unit_cost"] = np.inf
+
+    result = validate_catalog(df)
+    quarantine = result["quarantine"]
+    assert list(quarantine.index) == [3, 5, 7, 9, 10, 11, 12, 13, 14]
+    assert quarantine.loc[5, "errors"] == "avg_daily_sales: not > 0; days_of_cover: missing"
+    assert quarantine.loc[12, "errors"] == "lead_time_days: not a number"
+    assert quarantine.loc[13, "errors"] == "lead_time_days: not an integer"
+
+    report = result["report"].set_index(["column", "rule"])["rows"]
+    assert report[("sku_id", "duplicate")] == 2
+    assert report[("holding_cost", "not > 0")] == 1
+    assert report[("unit_cost", "not finite")] == 1
+
+    clean = result["clean"]
+    assert len(clean) == len(df) - 9
+    assert clean["lead_time_days"].dtype == np.int64
+    assert clean["days_of_cover"].notna().all() and clean["sku_id"].is_unique
+
+
+def test_missing_column_raises():
+    with pytest.raises(ValueError, match="holding_cost"):
+        validate_catalog(load_base_inventory(10).drop(columns="holding_cost"))
+
+
+def test_duplicate_keys_match_pandas():
+    values = pd.Series(
+        ["", "a", "bb", "a", None, None, "SKU-123456789", "SKU-123456789", "ünïcode", "ünïcode",
+         "ABCDEFGH-1-ZYXWVUTS", "ABCDEFGH-2-ZYXWVUTS", "ABCDEFGH-1-ZYXWVUTS", "x" * 7, "x" * 8, ""],
+        dtype="str",
+    )
+    expected = values.duplicated(keep=False).to_numpy() & values.notna().to_numpy()
+    np.testing.assert_array_equal(_duplicated_strings(values), expected)
+    sliced = values.iloc[3:]
+    np.testing.assert_array_equal(
+        _duplicated_strings(sliced), sliced.duplicated(keep=False).to_numpy() & sliced.notna().to_numpy()
+    )
+    for tiny in (["a", "b", "a"], ["", ""], ["abc", None, "abcd", "abc"]):  # data buffer under 8 bytes
+        tiny = pd.Series(tiny, dtype="str")
+        np.testing.assert_array_equal(
+            _duplicated_strings(tiny), tiny.duplicated(keep=False).to_numpy() & tiny.notna().to_numpy()
+        )
+
+
+def test_parquet_statistics_do_not_hide_bad_rows(tmp_path):
+    df = load_base_inventory(300)
+    df.to_parquet(tmp_path / "clean.parquet")
+    stats = parquet_column_stats(str(tmp_path / "clean.parquet"))
+    assert stats["current_stock"]["min"] == df["current_stock"].min() and stats["sku_id"]["null_count"] == 0
+    clean = read_catalog(str(tmp_path / "clean.parquet"))
+    pd.testing.assert_frame_equal(clean["clean"], df)
+
+    df.loc[3, "unit_cost"] = np.nan  # Parquet min / max statistics skip NaN
+    df.loc[5, "category"] = ""
+    df.loc[7, "sku_id"] = df.loc[8, "sku_id"]
+    df.loc[9, "lead_time_days"] = -1
+    df.to_parquet(tmp_path / "bad.parquet")
+    result = read_catalog(str(tmp_path / "bad.parquet"))
+    assert list(result["quarantine"].index) == [3, 5, 7, 8, 9]
+    assert result["quarantine"].loc[3, "errors"] == "unit_cost: missing"
+
+
+def test_stream_quarantines_rejected_rows(tmp_path):
+    df = load_base_inventory(500).drop(columns="days_of_cover")
+    df.loc[[4, 250], "holding_cost"] = 0.0
+    df.to_csv(tmp_path / "catalog.csv", index=False)
+
+    aggs = stream_policy(str(tmp_path / "catalog.csv"), str(tmp_path / "plan.csv"), 1.65, 1.0,
+                         chunk_rows=200, quarantine=str(tmp_path / "rejected.csv"))
+    assert aggs["quarantined"] == 2 and finalize_aggregates(aggs)[1]["rows"] == 498
+    assert list(pd.read_csv(tmp_path / "rejected.csv")["errors"]) == ["holding_cost: not > 0"] * 2
+
+
+def test_stream_parquet_quarantine_keeps_one_schema(tmp_path):
+    df = load_base_inventory(5000).drop(columns="days_of_cover")
+    df["current_stock"] = df["current_stock"].astype(object)
+    df.loc[1500, "current_stock"] = "abc"  # a text column in that chunk only
+    df.loc[3200, "holding_cost"] = 0.0  # an int / float row in a later chunk
+    df.to_csv(tmp_path / "catalog.csv", index=False)
+
+    aggs = stream_policy(str(tmp_path / "catalog.csv"), str(tmp_path / "plan.parquet"), 1.65, 1.0,
+                         chunk_rows=1000, quarantine=str(tmp_path / "rejected.parquet"))
+    rejected = pd.read_parquet(tmp_path / "rejected.parquet")
+    assert aggs["quarantined"] == 2
+    assert list(rejected["sku_id"]) == list(df["sku_id"].iloc[[1500, 3200]])
+    assert list(rejected["current_stock"]) == ["abc", str(df["current_stock"].iloc[3200])]
+    assert list(rejected["errors"]) == ["current_stock: not a number", "holding_cost: not > 0"]